@@ -0,0 +1,87 @@
+"""
+Сравнение скорости загрузки вакансий: построчные INSERT против COPY FROM STDIN и execute_values.
+
+Запуск (нужна отдельная база данных в settings.ini: её таблицы будут очищены, поэтому требуется
+флаг --destructive):
+    python -m benchmarks.bench_insert_vacancies --count 100000 --destructive
+"""
+
+import argparse
+import time
+
+from src.db import connection
+from src.utils import (create_tables, clear_tables, insert_companies_into_db, insert_vacancies_into_db,
+                       normalize_vacancy, VACANCY_COLUMNS)
+
+
+COMPANY_ID = 1
+ROW_INSERT_QUERY = f"INSERT INTO vacancies ({VACANCY_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+
+
+def generate_vacancies(count: int) -> list[dict]:
+    """
+    Генерирует вакансии в формате ответа API hh.ru.
+
+    :param count: Количество вакансий.
+    :return: Список словарей вакансий.
+    """
+
+    return [{"id": str(i), "name": f"Python-разработчик O'Neil #{i}",
+             "salary": {"from": 50000 + i % 1000, "to": 150000 + i % 1000, "currency": "RUR"} if i % 3 else None,
+             "url": f"https://api.hh.ru/vacancies/{i}"} for i in range(count)]
+
+
+def insert_row_by_row(company_id: int, vacancies: list[dict]) -> None:
+    """
+    Прежний способ загрузки: отдельный INSERT на каждую вакансию.
+    """
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            for item in vacancies:
+                cur.execute(ROW_INSERT_QUERY, normalize_vacancy(company_id, item))
+
+
+def measure(loader, vacancies: list[dict]) -> float:
+    """
+    Загружает вакансии в пустые таблицы и возвращает затраченное время в секундах.
+    """
+
+    clear_tables()
+    insert_companies_into_db(COMPANY_ID, {"company_name": "Benchmark", "company_description": ""})
+
+    start = time.perf_counter()
+    loader(COMPANY_ID, vacancies)
+
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100_000, help="количество синтетических вакансий")
+    parser.add_argument("--destructive", action="store_true",
+                        help="подтвердить очистку таблиц базы данных из settings.ini")
+    args = parser.parse_args()
+
+    if not args.destructive:
+        parser.error("бенчмарк очищает таблицы базы данных из settings.ini; запускайте его на отдельной базе "
+                     "с флагом --destructive")
+
+    vacancies = generate_vacancies(args.count)
+    create_tables()
+
+    loaders = {
+        "row-by-row INSERT": insert_row_by_row,
+        "COPY FROM STDIN": insert_vacancies_into_db,
+        "execute_values": lambda company_id, items: insert_vacancies_into_db(company_id, items, method="values"),
+    }
+
+    for name, loader in loaders.items():
+        elapsed = measure(loader, vacancies)
+        print(f"{name:<20} {elapsed:8.2f} s  {args.count / elapsed:12.0f} rows/s")
+
+    clear_tables()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Сравнение задержки поиска по названию вакансии: ILIKE '%...%' без индекса против полнотекстового поиска по GIN-индексу.
+
+Запуск (нужна отдельная база данных в settings.ini: её таблицы будут очищены, поэтому требуется
+флаг --destructive):
+    python -m benchmarks.bench_keyword_search --count 1000000 --destructive
+"""
+
+import argparse
+import statistics
+import time
+
+from src.db import connection
+from src.dbmanager import DBManager
+from src.utils import create_tables, clear_tables, insert_companies_into_db
+
+
+COMPANY_ID = 1
+KEYWORDS = ["python", "разработчик", "java senior", "аналитик данных", "менеджер"]
+ILIKE_QUERY = "SELECT vacancy_name, url FROM vacancies WHERE vacancy_name ILIKE %s"
+GENERATE_QUERY = (
+    "INSERT INTO vacancies (vacancy_id, company_id, vacancy_name, salary_min, salary_max, currency, url) "
+    "SELECT i, %s, (ARRAY['Python', 'Java', 'Go', 'Frontend', 'QA'])[i %% 5 + 1] || ' ' || "
+    "(ARRAY['разработчик', 'аналитик данных', 'инженер', 'менеджер', 'тестировщик'])[i / 5 %% 5 + 1] || ' ' || "
+    "(ARRAY['junior', 'middle', 'senior'])[i %% 3 + 1] || ' #' || i, "
+    "50000 + i %% 1000, 150000 + i %% 1000, 'RUR', 'https://hh.ru/vacancy/' || i FROM generate_series(1, %s) AS i"
+)
+
+
+def fill_vacancies(count: int) -> None:
+    """
+    Заполняет таблицу 'vacancies' синтетическими вакансиями средствами сервера.
+    """
+
+    clear_tables()
+    insert_companies_into_db(COMPANY_ID, {"company_name": "Benchmark", "company_description": ""})
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(GENERATE_QUERY, (COMPANY_ID, count))
+            cur.execute("ANALYZE vacancies;")
+
+
+def measure(search, repeat: int) -> list[float]:
+    """
+    Выполняет поиск по всем ключевым словам repeat раз и возвращает задержки в миллисекундах.
+    """
+
+    latencies = []
+
+    for _ in range(repeat):
+        for keyword in KEYWORDS:
+            start = time.perf_counter()
+            search(keyword)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="количество синтетических вакансий")
+    parser.add_argument("--repeat", type=int, default=5, help="количество повторов каждого запроса")
+    parser.add_argument("--limit", type=int, default=50, help="размер страницы результатов полнотекстового поиска")
+    parser.add_argument("--destructive", action="store_true",
+                        help="подтвердить очистку таблиц базы данных из settings.ini")
+    args = parser.parse_args()
+
+    if not args.destructive:
+        parser.error("бенчмарк очищает таблицы базы данных из settings.ini; запускайте его на отдельной базе "
+                     "с флагом --destructive")
+
+    create_tables()
+    fill_vacancies(args.count)
+    db_manager = DBManager()
+
+    def ilike(keyword: str) -> list:
+        with db_manager.conn.cursor() as cur:
+            cur.execute(ILIKE_QUERY, (f"%{keyword}%",))
+
+            return cur.fetchall()
+
+    searches = {
+        "ILIKE seq scan": ilike,
+        "tsvector GIN": lambda keyword: db_manager.get_vacancies_with_keyword(keyword, limit=args.limit),
+    }
+
+    for name, search in searches.items():
+        latencies = sorted(measure(search, args.repeat))
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{name:<16} median {statistics.median(latencies):9.2f} ms  p95 {p95:9.2f} ms")
+
+    db_manager.release_db()
+    clear_tables()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Сравнение скорости очистки описаний работодателей: прежнее регулярное выражение re.sub('<.*?>', '', text) против
+однопроходного remove_html_tags с декодированием сущностей и схлопыванием пробелов.
+
+Описания берутся из tests/fixtures/employer_descriptions и повторяются до нужного размера; дополнительно измеряется
+состязательный ввод из незакрытых '<', на котором регулярное выражение работает за квадратичное время.
+
+Запуск:
+    python -m benchmarks.bench_remove_html_tags --size 4000000
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+from src.utils import remove_html_tags
+
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "employer_descriptions"
+
+
+def regex_remove_html_tags(text: str) -> str:
+    """
+    Прежняя реализация remove_html_tags.
+    """
+
+    return re.sub('<.*?>', '', text)
+
+
+def measure(clean, text: str, repeat: int) -> float:
+    """
+    Возвращает минимальное время очистки текста в миллисекундах из repeat запусков.
+    """
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clean(text)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4_000_000, help="размер описания в символах")
+    parser.add_argument("--adversarial-size", type=int, default=20_000,
+                        help="размер состязательного ввода в символах")
+    parser.add_argument("--repeat", type=int, default=5, help="количество повторов каждого измерения")
+    args = parser.parse_args()
+
+    inputs = {}
+
+    for path in sorted(FIXTURES.glob("*.html")):
+        text = path.read_text(encoding="utf-8")
+        inputs[path.stem] = text * (args.size // len(text) + 1)
+
+    inputs["adversarial"] = "<a" * (args.adversarial_size // 2)
+
+    print(f"{'ввод':<14}{'размер':>12}{'regex, мс':>14}{'sanitiser, мс':>16}")
+
+    for name, text in inputs.items():
+        regex_ms = measure(regex_remove_html_tags, text, args.repeat)
+        sanitiser_ms = measure(remove_html_tags, text, args.repeat)
+        print(f"{name:<14}{len(text):>12}{regex_ms:>14.1f}{sanitiser_ms:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
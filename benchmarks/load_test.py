@@ -0,0 +1,205 @@
+"""
+Нагрузочный тест HTTP API запросов (src.api).
+
+Запускает --concurrency клиентов, каждый из которых по одному постоянному (keep-alive) соединению выполняет запросы
+к эндпоинтам по кругу в течение --duration секунд (или --requests запросов на клиента). Выводит в JSON пропускную
+способность и задержки (медиана, p90, p99, максимум) по каждому эндпоинту и в целом.
+
+Без --url сервер запускается в том же процессе и использует базу данных из settings.ini; загрузите её заранее
+(python main.py или python -m benchmarks.run --stages load --destructive на отдельной базе).
+
+Запуск:
+    python -m benchmarks.load_test --concurrency 64 --duration 30
+    python -m benchmarks.load_test --url http://127.0.0.1:8080/ --concurrency 200 --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from itertools import cycle
+from urllib.parse import urlsplit, urlencode
+
+from src.api import QueryServer
+from src.db import get_config, close_pool
+
+
+DEFAULT_PATHS = [
+    "/companies",
+    "/vacancies?limit=100",
+    "/vacancies?after_id=1000&limit=100",
+    "/vacancies/higher-salary?limit=100",
+    "/vacancies/search?" + urlencode({"keyword": "python", "limit": 50}),
+    "/vacancies/search?" + urlencode({"keyword": "аналитик данных", "limit": 50}),
+    "/salary/average",
+    "/salary/statistics",
+]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Возвращает перцентиль отсортированного списка (метод ближайшего ранга).
+    """
+
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def summary(timings: list[float], errors: int, seconds: float) -> dict:
+    """
+    Формирует результат по задержкам успешных запросов в секундах.
+    """
+
+    timings = sorted(timings)
+    result = {"requests": len(timings), "errors": errors, "requests_per_second": round(len(timings) / seconds, 1)}
+
+    if timings:
+        result.update({name: round(percentile(timings, fraction) * 1000, 3)
+                       for name, fraction in (("p50_ms", 0.5), ("p90_ms", 0.9), ("p99_ms", 0.99))})
+        result["max_ms"] = round(timings[-1] * 1000, 3)
+
+    return result
+
+
+async def read_response(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    """
+    Читает ответ HTTP/1.1 с телом фиксированной длины или фрагментами (chunked).
+
+    :return: Код ответа и тело.
+    """
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding") == "chunked":
+        chunks = []
+
+        while size := int((await reader.readline()).split(b";")[0], 16):
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+        await reader.readexactly(2)
+
+        return status, b"".join(chunks)
+
+    return status, await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+async def client(host: str, port: int, paths: list[str], deadline: float, requests: int | None,
+                 timings: dict, errors: dict) -> None:
+    """
+    Выполняет запросы по кругу через одно постоянное соединение.
+    """
+
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = 0
+
+    try:
+        for path in cycle(paths):
+            if (requests is not None and sent >= requests) or (requests is None and time.perf_counter() >= deadline):
+                break
+
+            start = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            status, _ = await read_response(reader)
+            elapsed = time.perf_counter() - start
+            sent += 1
+
+            if status == 200:
+                timings[path].append(elapsed)
+            else:
+                errors[path] += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def load_test(url: str, paths: list[str], concurrency: int, duration: float, requests: int | None) -> dict:
+    """
+    Выполняет нагрузочный тест.
+
+    :param url: Адрес API.
+    :param paths: Пути запросов (с параметрами), выполняемые по кругу.
+    :param concurrency: Количество одновременных клиентов (соединений).
+    :param duration: Длительность теста в секундах (если requests не задан).
+    :param requests: Количество запросов на клиента или None.
+    :return: Отчёт с результатами по эндпоинтам и в целом.
+    """
+
+    parsed = urlsplit(url)
+    timings = {path: [] for path in paths}
+    errors = dict.fromkeys(paths, 0)
+
+    # Клиенты начинают с разных путей, чтобы запросы к эндпоинтам шли вперемешку.
+    orders = [paths[index % len(paths):] + paths[:index % len(paths)] for index in range(concurrency)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(parsed.hostname, parsed.port, order, start + duration, requests, timings, errors)
+                           for order in orders))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "meta": {"url": url, "concurrency": concurrency, "seconds": round(elapsed, 3)},
+        "total": summary([value for values in timings.values() for value in values], sum(errors.values()), elapsed),
+        "endpoints": {path: summary(timings[path], errors[path], elapsed) for path in paths},
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    """
+    Выполняет тест против сервера по --url или запущенного в том же процессе.
+    """
+
+    if args.url:
+        return await load_test(args.url, args.paths, args.concurrency, args.duration, args.requests)
+
+    server = QueryServer.from_config(get_config())
+    server.port = 0
+
+    if args.workers:
+        server.workers = args.workers
+
+    await server.start()
+
+    try:
+        return await load_test(f"http://{server.host}:{server.port}/", args.paths, args.concurrency, args.duration,
+                               args.requests)
+    finally:
+        await server.close()
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="адрес запущенного API (по умолчанию сервер запускается в этом процессе)")
+    parser.add_argument("--concurrency", type=int, default=32, help="количество одновременных соединений")
+    parser.add_argument("--duration", type=float, default=10.0, help="длительность теста в секундах")
+    parser.add_argument("--requests", type=int, help="количество запросов на соединение вместо --duration")
+    parser.add_argument("--workers", type=int, help="количество потоков встроенного сервера")
+    parser.add_argument("--paths", type=lambda value: value.split(","), default=DEFAULT_PATHS,
+                        help="пути запросов через запятую")
+    parser.add_argument("--output", help="файл для сохранения результатов (по умолчанию - стандартный вывод)")
+    args = parser.parse_args(argv)
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        close_pool()
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    return 0 if report["total"]["errors"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+"""
+Набор бенчмарков путей загрузки и запросов на синтетических данных в формате API hh.ru.
+
+Стадии:
+    fetch     - постраничная загрузка вакансий и работодателей с локального mock-сервера;
+    transform - очистка описаний от HTML и нормализация вакансий с пересчётом валют;
+    load      - запись вакансий в базу через COPY и пересчёт материализованных представлений;
+    pipeline  - полная загрузка конвейером (src.pipeline.Pipeline) с mock-сервера в базу;
+    queries   - задержка каждого запроса DBManager;
+    snapshot  - экспорт загруженных таблиц в столбцовый снимок и обратный импорт снимка в очищенные таблицы.
+
+По умолчанию выполняются только стадии fetch и transform, не обращающиеся к базе данных. Стадии load, pipeline,
+queries и snapshot используют базу данных из settings.ini, а load, pipeline и snapshot очищают её таблицы, поэтому
+они запускаются только с явным флагом --destructive и только на отдельной (одноразовой) базе. Результаты выводятся
+в формате JSON; при передаче --compare они сравниваются с результатами предыдущего запуска, и при замедлении больше
+--threshold код возврата равен 1.
+
+Запуск:
+    python -m benchmarks.run --vacancies 100000 --companies 100 --output results.json
+    python -m benchmarks.run --stages fetch,transform,load,queries --destructive --compare results.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks import synthetic
+from benchmarks.server import SyntheticHHServer
+from src.client import HHClient
+from src.currency import rates_from_dictionaries
+from src.dbmanager import DBManager
+from src.fetcher import iter_vacancies, PER_PAGE
+from src.pipeline import Pipeline, FETCH_WORKERS
+from src.snapshot import export_snapshot, import_snapshot
+from src.utils import (create_tables, clear_tables, insert_companies_into_db, insert_vacancy_rows, normalize_vacancy,
+                       refresh_statistics, remove_html_tags, COPY_BATCH_SIZE)
+
+
+STAGES = ["fetch", "transform", "load", "pipeline", "queries", "snapshot"]
+DEFAULT_STAGES = ["fetch", "transform"]
+DESTRUCTIVE_STAGES = {"load", "pipeline", "snapshot"}
+QUERY_REPEAT = 5
+KEYWORDS = ["python", "разработчик", "аналитик данных"]
+
+
+def throughput(seconds: float, items: int) -> dict:
+    """
+    Формирует результат стадии обработки потока элементов.
+    """
+
+    return {"seconds": round(seconds, 4), "items": items, "items_per_second": round(items / seconds, 1)}
+
+
+def latency(timings: list[float]) -> dict:
+    """
+    Формирует результат многократно выполненного запроса по задержкам в секундах.
+    """
+
+    return {"repeat": len(timings), "median_ms": round(statistics.median(timings) * 1000, 3),
+            "min_ms": round(min(timings) * 1000, 3), "max_ms": round(max(timings) * 1000, 3)}
+
+
+def bench_fetch(args: argparse.Namespace) -> dict:
+    """
+    Загружает все страницы вакансий и описания работодателей с mock-сервера в fetch_workers потоков.
+    """
+
+    client = HHClient(pool_size=args.fetch_workers)
+
+    def fetch_company(company_id: int) -> int:
+        client.get_json(f"{args.base_url}employers/{company_id}")
+
+        return sum(1 for _ in iter_vacancies(company_id, args.base_url, args.per_page, client=client))
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(args.fetch_workers) as executor:
+        items = sum(executor.map(fetch_company, range(1, args.companies + 1)))
+
+    elapsed = time.perf_counter() - start
+    client.close()
+
+    return {"fetch": throughput(elapsed, items)}
+
+
+def bench_transform(args: argparse.Namespace) -> dict:
+    """
+    Нормализует все вакансии и очищает описания всех работодателей.
+    """
+
+    rates = rates_from_dictionaries(synthetic.DICTIONARIES)
+    descriptions = [synthetic.employer(company_id)["description"] for company_id in range(1, args.companies + 1)]
+    elapsed = 0.0
+    items = 0
+
+    for company_id in range(1, args.companies + 1):
+        total = synthetic.company_vacancies_count(company_id, args.vacancies, args.companies)
+
+        for page in range(-(-total // args.per_page)):
+            page_items = synthetic.vacancies_page(company_id, page, args.per_page, total)["items"]
+            start = time.perf_counter()
+
+            for item in page_items:
+                normalize_vacancy(company_id, item, rates)
+
+            elapsed += time.perf_counter() - start
+            items += len(page_items)
+
+    start = time.perf_counter()
+
+    for description in descriptions:
+        remove_html_tags(description)
+
+    return {"transform": throughput(elapsed, items),
+            "transform.descriptions": throughput(time.perf_counter() - start, len(descriptions))}
+
+
+def bench_load(args: argparse.Namespace) -> dict:
+    """
+    Записывает все вакансии в пустые таблицы пачками по batch_size и пересчитывает материализованные представления.
+    """
+
+    rates = rates_from_dictionaries(synthetic.DICTIONARIES)
+    create_tables()
+    clear_tables()
+
+    for company_id in range(1, args.companies + 1):
+        employer = synthetic.employer(company_id)
+        insert_companies_into_db(company_id, {"company_name": employer["name"],
+                                              "company_description": remove_html_tags(employer["description"])})
+
+    elapsed = 0.0
+    items = 0
+    rows = []
+
+    for company_id, item in synthetic.iter_vacancies(args.vacancies, args.companies):
+        rows.append(normalize_vacancy(company_id, item, rates))
+
+        if len(rows) >= args.batch_size:
+            start = time.perf_counter()
+            insert_vacancy_rows(rows, args.batch_size)
+            elapsed += time.perf_counter() - start
+            items += len(rows)
+            rows = []
+
+    start = time.perf_counter()
+    insert_vacancy_rows(rows, args.batch_size)
+    elapsed += time.perf_counter() - start
+    items += len(rows)
+
+    start = time.perf_counter()
+    refresh_statistics()
+
+    refresh_seconds = time.perf_counter() - start
+
+    return {"load": throughput(elapsed, items), "load.refresh_statistics": {"seconds": round(refresh_seconds, 4)}}
+
+
+def bench_pipeline(args: argparse.Namespace) -> dict:
+    """
+    Выполняет полную загрузку конвейером с mock-сервера в очищенные таблицы.
+    """
+
+    create_tables()
+    clear_tables()
+    client = HHClient(pool_size=args.fetch_workers)
+
+    start = time.perf_counter()
+    Pipeline(range(1, args.companies + 1), full=True, rates=rates_from_dictionaries(synthetic.DICTIONARIES),
+             client=client, base_url=args.base_url, per_page=args.per_page, batch_size=args.batch_size,
+             fetch_workers=args.fetch_workers, requests_per_second=1_000_000).run()
+    elapsed = time.perf_counter() - start
+    client.close()
+    refresh_statistics()
+
+    return {"pipeline": throughput(elapsed, args.vacancies)}
+
+
+def bench_queries(args: argparse.Namespace) -> dict:
+    """
+    Измеряет задержку каждого запроса DBManager на загруженных данных (стадия load или pipeline).
+    """
+
+    db_manager = DBManager()
+    queries = {
+        "get_companies_and_vacancies_count": db_manager.get_companies_and_vacancies_count,
+        "iter_all_vacancies": lambda: sum(1 for _ in db_manager.iter_all_vacancies()),
+        "get_vacancies_page": lambda: db_manager.get_vacancies_page(after_id=args.vacancies // 2),
+        "get_avg_salary": db_manager.get_avg_salary,
+        "get_salary_statistics": db_manager.get_salary_statistics,
+        "iter_vacancies_with_higher_salary": lambda: sum(1 for _ in db_manager.iter_vacancies_with_higher_salary()),
+        "get_vacancies_with_keyword": lambda: [db_manager.get_vacancies_with_keyword(keyword, limit=50)
+                                               for keyword in KEYWORDS],
+    }
+    results = {}
+
+    for name, query in queries.items():
+        timings = []
+
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            query()
+            timings.append(time.perf_counter() - start)
+
+        results[f"query.{name}"] = latency(timings)
+
+    db_manager.release_db()
+
+    return results
+
+
+def bench_snapshot(args: argparse.Namespace) -> dict:
+    """
+    Экспортирует загруженные таблицы (стадия load или pipeline) в снимок и загружает его обратно в очищенные таблицы.
+    """
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        manifest = export_snapshot(path)
+        export_seconds = time.perf_counter() - start
+        items = manifest["tables"]["vacancies"]["rows"]
+
+        clear_tables()
+
+        start = time.perf_counter()
+        import_snapshot(path, args.batch_size)
+        import_seconds = time.perf_counter() - start
+
+    refresh_statistics()
+
+    return {"snapshot.export": throughput(export_seconds, items), "snapshot.import": throughput(import_seconds, items)}
+
+
+def git_commit() -> str | None:
+    """
+    Возвращает хеш текущего коммита или None, если он недоступен.
+    """
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> dict:
+    """
+    Выполняет выбранные стадии и возвращает отчёт с метаданными запуска.
+    """
+
+    benches = {"fetch": bench_fetch, "transform": bench_transform, "load": bench_load, "pipeline": bench_pipeline,
+               "queries": bench_queries, "snapshot": bench_snapshot}
+    results = {}
+
+    with SyntheticHHServer(args.vacancies, args.companies) as server:
+        args.base_url = server.base_url
+
+        for stage in args.stages:
+            results.update(benches[stage](args))
+
+    return {
+        "meta": {"commit": git_commit(), "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "vacancies": args.vacancies, "companies": args.companies,
+                 "per_page": args.per_page, "batch_size": args.batch_size, "stages": args.stages},
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Сравнивает результаты с результатами предыдущего запуска.
+
+    Для стадий сравнивается время (seconds), для запросов - медианная задержка (median_ms).
+
+    :param report: Текущий отчёт.
+    :param baseline: Отчёт предыдущего запуска.
+    :param threshold: Допустимое относительное замедление (0.2 - на 20%).
+    :return: Список метрик, замедлившихся больше чем на threshold.
+    """
+
+    regressions = []
+
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        metric = "median_ms" if "median_ms" in result else "seconds"
+
+        if previous is None or not previous.get(metric):
+            continue
+
+        ratio = result[metric] / previous[metric]
+        print(f"{name:<44} {previous[metric]:>12.3f} -> {result[metric]:>12.3f} {metric:<9} x{ratio:.2f}",
+              file=sys.stderr)
+
+        if ratio > 1 + threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vacancies", type=int, default=10_000, help="количество синтетических вакансий")
+    parser.add_argument("--companies", type=int, default=10, help="количество синтетических компаний")
+    parser.add_argument("--stages", type=lambda value: value.split(","), default=DEFAULT_STAGES,
+                        help=f"стадии через запятую из {','.join(STAGES)} (по умолчанию {','.join(DEFAULT_STAGES)})")
+    parser.add_argument("--destructive", action="store_true",
+                        help="разрешить стадии, очищающие таблицы базы данных из settings.ini")
+    parser.add_argument("--per-page", type=int, default=PER_PAGE, help="количество вакансий на странице ответа")
+    parser.add_argument("--batch-size", type=int, default=COPY_BATCH_SIZE, help="размер пачки записи в базу")
+    parser.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS, help="количество потоков загрузки")
+    parser.add_argument("--repeat", type=int, default=QUERY_REPEAT, help="количество повторов каждого запроса")
+    parser.add_argument("--output", help="файл для сохранения результатов (по умолчанию - стандартный вывод)")
+    parser.add_argument("--compare", help="файл с результатами предыдущего запуска для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.2, help="допустимое относительное замедление")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.stages) - set(STAGES)
+
+    if unknown:
+        parser.error(f"неизвестные стадии: {', '.join(sorted(unknown))}")
+
+    destructive = DESTRUCTIVE_STAGES.intersection(args.stages)
+
+    if destructive and not args.destructive:
+        parser.error(f"стадии {', '.join(sorted(destructive))} очищают таблицы базы данных из settings.ini; "
+                     "запускайте их на отдельной базе с флагом --destructive")
+
+    report = run(args)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(report, json.load(file), args.threshold)
+
+        if regressions:
+            print(f"Замедление больше {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
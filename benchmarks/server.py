@@ -0,0 +1,90 @@
+"""
+Локальный HTTP-сервер, отдающий синтетические данные (см. benchmarks.synthetic) в формате API hh.ru.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks import synthetic
+
+
+class SyntheticHHServer:
+    """
+    Сервер с эндпоинтами /vacancies, /employers/{id} и /dictionaries. Страницы формируются при запросе, поэтому
+    объём набора не ограничен памятью.
+    """
+
+    def __init__(self, vacancies: int, companies: int) -> None:
+        """
+        :param vacancies: Общее количество вакансий.
+        :param companies: Количество компаний (идентификаторы от 1 до companies).
+        """
+
+        self.vacancies = vacancies
+        self.companies = companies
+        self.requests = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                status, body = server.handle(self.path)
+                payload = json.dumps(body, ensure_ascii=False).encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def handle(self, path: str) -> tuple[int, dict]:
+        """
+        Формирует ответ на запрос по его пути.
+        """
+
+        parsed = urlparse(path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        with self.lock:
+            self.requests += 1
+
+        if parsed.path == "/vacancies":
+            company_id = int(params["employer_id"])
+            total = synthetic.company_vacancies_count(company_id, self.vacancies, self.companies)
+
+            return 200, synthetic.vacancies_page(company_id, int(params.get("page", 0)),
+                                                 int(params.get("per_page", 20)), total)
+
+        if parsed.path.startswith("/employers/"):
+            company_id = int(parsed.path.rsplit("/", 1)[1])
+
+            if not 1 <= company_id <= self.companies:
+                return 404, {"errors": [{"type": "not_found"}]}
+
+            return 200, synthetic.employer(company_id)
+
+        if parsed.path == "/dictionaries":
+            return 200, synthetic.DICTIONARIES
+
+        return 404, {}
+
+    def __enter__(self) -> 'SyntheticHHServer':
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,128 @@
+"""
+Генератор синтетических данных в формате ответов API hh.ru (/vacancies, /employers/{id}, /dictionaries).
+
+Все значения вычисляются детерминированно из идентификатора компании и номера вакансии, поэтому данные любой
+страницы можно получить без хранения всего набора в памяти, а повторные запуски работают с одинаковыми данными.
+"""
+
+from typing import Iterator
+
+
+PROFESSIONS = ["Python-разработчик", "Java-разработчик", "Go-разработчик", "Frontend-разработчик", "Аналитик данных",
+               "Инженер по тестированию", "DevOps-инженер", "Менеджер проектов", "Дизайнер интерфейсов",
+               "Специалист поддержки"]
+LEVELS = ["junior", "middle", "senior", "lead"]
+CURRENCIES = ["RUR"] * 7 + ["USD", "EUR", "KZT"]
+SALARY_BASE = {"RUR": 60000, "USD": 900, "EUR": 800, "KZT": 350000}
+
+DICTIONARIES = {"currency": [
+    {"code": "RUR", "abbr": "₽", "name": "Рубли", "default": True, "rate": 1.0},
+    {"code": "USD", "abbr": "$", "name": "Доллары", "default": False, "rate": 0.0125},
+    {"code": "EUR", "abbr": "€", "name": "Евро", "default": False, "rate": 0.0115},
+    {"code": "KZT", "abbr": "₸", "name": "Тенге", "default": False, "rate": 5.0},
+]}
+
+DESCRIPTION = (
+    "<p><strong>{name}</strong>&nbsp;&mdash; одна из крупнейших компаний в своей отрасли.</p>"
+    "<ul><li>&laquo;ДМС&raquo; с первого дня;</li><li>гибкий график;</li><li>обучение за счёт компании.</li></ul>"
+    "<!-- tracking --><script>window.dataLayer = [];</script><p>Офис: м.&nbsp;Белорусская &amp; удалённо.</p>"
+)
+
+
+def _mix(company_id: int, index: int) -> int:
+    """
+    Возвращает псевдослучайное 32-битное число для пары (компания, вакансия).
+    """
+
+    return (company_id * 1_000_003 + index) * 2_654_435_761 % 2 ** 32
+
+
+def company_vacancies_count(company_id: int, vacancies: int, companies: int) -> int:
+    """
+    Количество вакансий компании при равномерном распределении vacancies вакансий между companies компаниями.
+
+    :param company_id: Идентификатор компании (от 1 до companies).
+    :param vacancies: Общее количество вакансий.
+    :param companies: Количество компаний.
+    :return: Количество вакансий компании.
+    """
+
+    return vacancies // companies + (1 if company_id <= vacancies % companies else 0)
+
+
+def vacancy(company_id: int, index: int) -> dict:
+    """
+    Формирует вакансию в формате элемента 'items' ответа /vacancies.
+
+    Примерно у каждой пятой вакансии зарплата не указана, у части указана только одна граница вилки.
+
+    :param company_id: Идентификатор компании.
+    :param index: Номер вакансии внутри компании.
+    :return: Словарь вакансии.
+    """
+
+    mix = _mix(company_id, index)
+    vacancy_id = str(company_id * 10_000_000 + index)
+    salary = None
+
+    if mix % 5:
+        currency = CURRENCIES[mix % len(CURRENCIES)]
+        base = SALARY_BASE[currency] * (1 + mix % 7)
+        salary = {"from": base if mix % 4 else None, "to": base * 2 if mix % 3 else None, "currency": currency,
+                  "gross": bool(mix % 2)}
+
+    return {
+        "id": vacancy_id,
+        "name": f"{PROFESSIONS[mix % len(PROFESSIONS)]} ({LEVELS[mix // 16 % len(LEVELS)]})",
+        "salary": salary,
+        "url": f"https://api.hh.ru/vacancies/{vacancy_id}?host=hh.ru",
+        "alternate_url": f"https://hh.ru/vacancy/{vacancy_id}",
+        "employer": {"id": str(company_id), "name": f"Компания {company_id}"},
+        "area": {"id": "1", "name": "Москва"},
+        "published_at": "2024-01-01T10:00:00+0300",
+    }
+
+
+def vacancies_page(company_id: int, page: int, per_page: int, total: int) -> dict:
+    """
+    Формирует ответ /vacancies для одной страницы вакансий компании.
+
+    :param company_id: Идентификатор компании.
+    :param page: Номер страницы (с нуля).
+    :param per_page: Количество вакансий на странице.
+    :param total: Общее количество вакансий компании.
+    :return: Словарь с ключами 'items', 'found', 'pages', 'page' и 'per_page'.
+    """
+
+    start = page * per_page
+
+    return {"items": [vacancy(company_id, index) for index in range(start, min(start + per_page, total))],
+            "found": total, "pages": max(1, -(-total // per_page)), "page": page, "per_page": per_page}
+
+
+def employer(company_id: int) -> dict:
+    """
+    Формирует ответ /employers/{id}.
+
+    :param company_id: Идентификатор компании.
+    :return: Словарь работодателя с HTML-описанием.
+    """
+
+    name = f"Компания {company_id}"
+
+    return {"id": str(company_id), "name": name, "description": DESCRIPTION.format(name=name),
+            "site_url": f"https://company{company_id}.example"}
+
+
+def iter_vacancies(vacancies: int, companies: int) -> Iterator[tuple[int, dict]]:
+    """
+    Последовательно выдаёт все вакансии набора, компания за компанией.
+
+    :param vacancies: Общее количество вакансий.
+    :param companies: Количество компаний.
+    :return: Итератор по кортежам (идентификатор компании, вакансия).
+    """
+
+    for company_id in range(1, companies + 1):
+        for index in range(company_vacancies_count(company_id, vacancies, companies)):
+            yield company_id, vacancy(company_id, index)
@@ -1,21 +1,124 @@
+import argparse
 from pprint import pprint
 
-from src.utils import get_data_from_hh, insert_vacancies_into_db, insert_companies_into_db, clear_tables, create_tables
+from src.utils import clear_tables, create_tables, refresh_statistics
+from src import metrics
+from src.cache import ResponseCache
+from src.client import HHClient
+from src.currency import load_rates, store_rates, BASE_CURRENCY
+from src.db import get_config, transaction, close_pool
 from src.dbmanager import DBManager
+from src.snapshot import export_snapshot, import_snapshot
+from src.pipeline import Pipeline, FETCH_WORKERS, TRANSFORM_WORKERS, QUEUE_SIZE
+from src.sync import remove_missing_companies, SYNC_COUNTERS
+from src.crawl import read_employer_ids
 
 
-def main():
-    emp_ids = [
-        1942330, 49357, 78638, 2748, 1648566, 2180, 3529, 1942336, 196621, 4352
-    ]
+EMPLOYER_IDS = [
+    1942330, 49357, 78638, 2748, 1648566, 2180, 3529, 1942336, 196621, 4352
+]
 
-    received_data = get_data_from_hh(emp_ids)
-    create_tables()
-    clear_tables()
 
-    for company_id, company_data in received_data.items():
-        insert_companies_into_db(company_id, company_data)
-        insert_vacancies_into_db(company_id, company_data.get("items"))
+def load_from_api(args: argparse.Namespace) -> None:
+    """
+    Загружает данные компаний из API hh.ru в базу данных (полностью или инкрементально) и выводит отчёт.
+    """
+
+    # Повторы убираются с сохранением порядка, как в src.crawl: компания, загруженная дважды, нарушила бы
+    # уникальность при --full, а повторы её вакансий на разных страницах перестали бы отбрасываться.
+    emp_ids = list(dict.fromkeys(read_employer_ids(args.employers_file))) if args.employers_file else EMPLOYER_IDS
+
+    config = get_config()
+    cache = ResponseCache.from_config(config, offline=args.offline)
+    client = HHClient.from_config(config)
+    rates = load_rates(config.get("Currency", "rates_file", fallback=None), cache=cache,
+                       base=config.get("Currency", "base", fallback=BASE_CURRENCY), client=client)
+
+    # Схема и курсы обновляются отдельной короткой транзакцией: ALTER TABLE в create_tables берёт исключительную
+    # блокировку таблиц, которая иначе не пускала бы читателей всё время загрузки из сети.
+    with transaction():
+        create_tables()
+        store_rates(rates)
+
+    with transaction():
+        if args.full:
+            clear_tables()
+
+        pipeline = Pipeline(
+            emp_ids, full=args.full, rates=rates, cache=cache, client=client,
+            fetch_workers=config.getint("Pipeline", "fetch_workers", fallback=FETCH_WORKERS),
+            transform_workers=config.getint("Pipeline", "transform_workers", fallback=TRANSFORM_WORKERS),
+            queue_size=config.getint("Pipeline", "queue_size", fallback=QUEUE_SIZE)
+        )
+        stats = pipeline.run()
+
+        if not args.full:
+            # Компании, загруженные другими командами (например, python -m src.crawl), удаляются только по явному
+            # запросу: список этой команды не обязан содержать всех работодателей в базе.
+            if args.prune:
+                stats["vacancies"].update(remove_missing_companies(emp_ids))
+
+            for title, key in (("Компании", "companies"), ("Вакансии", "vacancies")):
+                print(f"{title}: " + ", ".join(f"{name} - {stats[key][name]}" for name in SYNC_COUNTERS))
+
+        refresh_statistics()
+
+    for company_id, error in pipeline.failures.items():
+        print(f"Не удалось загрузить компанию {company_id}: {error}")
+
+    client.close()
+    cache.close()
+
+
+def main(argv: list | None = None):
+    parser = argparse.ArgumentParser(description="Загрузка вакансий компаний с hh.ru в базу данных.")
+    parser.add_argument("--full", action="store_true",
+                        help="полная перезагрузка (очистка таблиц) вместо инкрементального обновления")
+    parser.add_argument("--offline", action="store_true",
+                        help="брать ответы API только из локального кэша, не обращаясь к сети")
+    parser.add_argument("--employers-file", metavar="PATH",
+                        help="загрузить работодателей из файла (по одному идентификатору в строке) вместо списка "
+                             "по умолчанию; для тысяч работодателей используйте python -m src.crawl")
+    parser.add_argument("--prune", action="store_true",
+                        help="удалить из базы компании, которых нет в загружаемом списке, вместе с их вакансиями")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="собирать метрики и сохранить их в файл в формате Prometheus по завершении работы")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="собирать метрики и отдавать их по HTTP на http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--profile", metavar="PATH", help="профилировать загрузку cProfile и сохранить статистику")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="отследить выделения памяти при загрузке (tracemalloc) и вывести крупнейшие")
+    parser.add_argument("--import-snapshot", metavar="DIR",
+                        help="заменить данные в базе снимком из каталога DIR вместо загрузки из API")
+    parser.add_argument("--export-snapshot", metavar="DIR",
+                        help="после загрузки сохранить таблицы в столбцовый снимок в каталоге DIR")
+    args = parser.parse_args(argv)
+
+    metrics_server = None
+
+    if args.metrics_file or args.metrics_port is not None:
+        metrics.enable()
+
+    if args.metrics_port is not None:
+        metrics_server = metrics.serve(args.metrics_port)
+
+    if args.import_snapshot:
+        with transaction():
+            create_tables()
+
+        with metrics.profiling(args.profile, args.trace_memory), transaction():
+            clear_tables()
+            counts = import_snapshot(args.import_snapshot)
+            refresh_statistics()
+
+        print(f"Из снимка загружено: компаний - {counts['companies']}, вакансий - {counts['vacancies']}")
+    else:
+        with metrics.profiling(args.profile, args.trace_memory):
+            load_from_api(args)
+
+    if args.export_snapshot:
+        manifest = export_snapshot(args.export_snapshot)
+        print(f"Снимок сохранён в {args.export_snapshot}: вакансий - {manifest['tables']['vacancies']['rows']}")
 
     vacancies_db = DBManager()
 
@@ -25,25 +128,38 @@ def main():
                           "и зарплаты и ссылки на вакансию.\n3. Получить среднюю зарплату по вакансиям.\n4. Получить "
                           "список всех вакансий, у которых зарплата выше средней по всем вакансиям.\n5. получает "
                           "список всех вакансий, в названии которых содержатся переданные в метод слова, например "
-                          "python.\nЛюбой символ для завершения.\n")
+                          "python.\n6. Получить статистику зарплат (средняя и перцентили) по валютам.\n"
+                          "Любой символ для завершения.\n")
 
         match user_mode:
             case '1':
                 pprint(vacancies_db.get_companies_and_vacancies_count())
             case '2':
-                pprint(vacancies_db.get_all_vacancies())
+                for vacancy in vacancies_db.iter_all_vacancies():
+                    pprint(vacancy)
             case '3':
                 pprint(vacancies_db.get_avg_salary())
             case '4':
-                pprint(vacancies_db.get_vacancies_with_higher_salary())
+                for vacancy in vacancies_db.iter_vacancies_with_higher_salary():
+                    pprint(vacancy)
             case '5':
-                pprint(vacancies_db.get_vacancies_with_keyword(input("Введите строку поиска: ")))
+                for vacancy in vacancies_db.iter_vacancies_with_keyword(input("Введите строку поиска: ")):
+                    pprint(vacancy)
+            case '6':
+                pprint(vacancies_db.get_salary_statistics())
             case _:
                 print("Завершение работы")
 
                 break
 
     vacancies_db.release_db()
+    close_pool()
+
+    if args.metrics_file:
+        metrics.dump(args.metrics_file)
+
+    if metrics_server is not None:
+        metrics_server.shutdown()
 
 
 if __name__ == "__main__":
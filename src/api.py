@@ -0,0 +1,516 @@
+"""
+Асинхронный HTTP API для запросов к базе данных вакансий (поверх DBManager).
+
+Эндпоинты (только GET, ответы в JSON):
+    /companies                 - компании и количество вакансий;
+    /vacancies                 - страница вакансий по ключу: ?after_id=&limit=, в ответе next_after_id;
+    /vacancies/higher-salary   - вакансии с зарплатой выше средней по ключу: ?after_id=&limit=, в ответе next_after_id;
+    /vacancies/search          - поиск по словам в названии: ?keyword=&limit=&offset=;
+    /salary/average            - средняя зарплата;
+    /salary/statistics         - статистика зарплат по валютам.
+
+Эндпоинты списков при параметре ?stream=1 отдают весь результат построчно (JSON Lines, Transfer-Encoding: chunked),
+читая его с сервера базы данных пачками через серверный курсор.
+
+Запуск:
+    python -m src.api --port 8080 --workers 10
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from configparser import ConfigParser
+from decimal import Decimal
+from http import HTTPStatus
+from itertools import islice
+from typing import Iterator
+from urllib.parse import urlsplit, parse_qs
+
+from src import metrics
+from src.db import get_config, close_pool, POOL_MAXCONN
+from src.dbmanager import DBManager, ITERSIZE, PAGE_SIZE
+
+
+HOST = "127.0.0.1"
+PORT = 8080
+WORKERS = 10
+MAX_LIMIT = 1000
+MAX_LINE_SIZE = 8192
+MAX_HEADERS = 100
+MAX_BODY_SIZE = 64 * 1024
+KEEP_ALIVE_TIMEOUT = 15.0
+READ_TIMEOUT = 10.0
+
+COMPANY_FIELDS = ("company_name", "vacancies_count")
+VACANCY_FIELDS = ("company_name", "vacancy_name", "salary_min", "salary_max", "currency", "url")
+VACANCY_PAGE_FIELDS = ("id",) + VACANCY_FIELDS
+HIGHER_SALARY_FIELDS = ("vacancy_name", "average_salary")
+HIGHER_SALARY_PAGE_FIELDS = ("id",) + HIGHER_SALARY_FIELDS
+KEYWORD_FIELDS = ("vacancy_name", "url")
+STATISTICS_FIELDS = ("currency", "vacancies_count", "avg_salary", "p25", "median", "p75", "p90")
+
+
+class HTTPError(Exception):
+    """
+    Ошибка обработки запроса, возвращаемая клиенту с заданным кодом ответа.
+    """
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+
+    raise TypeError(f"Объект типа {type(value).__name__} не сериализуется в JSON")
+
+
+def dumps(value) -> bytes:
+    """
+    Сериализует значение в JSON (Decimal - как число).
+    """
+
+    return json.dumps(value, ensure_ascii=False, default=_json_default).encode()
+
+
+def int_param(params: dict, name: str, default: int, maximum: int | None = None) -> int:
+    """
+    Разбирает неотрицательный целочисленный параметр строки запроса.
+
+    :param params: Параметры строки запроса.
+    :param name: Имя параметра.
+    :param default: Значение, если параметр не передан.
+    :param maximum: Максимальное допустимое значение или None.
+    :return: Значение параметра.
+    :raises HTTPError: Параметр не является неотрицательным целым числом или больше maximum.
+    """
+
+    if name not in params:
+        return default
+
+    try:
+        value = int(params[name])
+    except ValueError:
+        raise HTTPError(400, f"Параметр {name} должен быть целым числом") from None
+
+    if value < 0 or (maximum is not None and value > maximum):
+        raise HTTPError(400, f"Параметр {name} должен быть в диапазоне от 0 до {maximum}")
+
+    return value
+
+
+class _RowStream:
+    """
+    Результат запроса DBManager.iter_*, читаемый пачками; держит подключение из пула до вызова close().
+    """
+
+    __slots__ = ['db', 'rows']
+
+    def __init__(self, db: DBManager, rows: Iterator[tuple]) -> None:
+        self.db = db
+        self.rows = rows
+
+    def next_batch(self, size: int) -> list[tuple]:
+        return list(islice(self.rows, size))
+
+    def close(self) -> None:
+        try:
+            close = getattr(self.rows, "close", None)
+
+            if close is not None:
+                close()
+        finally:
+            self.db.release_db()
+
+
+def pool_size(config: ConfigParser) -> int:
+    """
+    Возвращает размер общего пула подключений (параметр maxconn секции 'Pool') - наибольшее допустимое количество
+    потоков запросов.
+    """
+
+    return config.getint("Pool", "maxconn", fallback=POOL_MAXCONN)
+
+
+class QueryServer:
+    """
+    HTTP-сервер на asyncio, выполняющий запросы DBManager для многих клиентов одновременно.
+
+    Соединения обслуживаются в цикле событий (HTTP/1.1 с keep-alive), а блокирующие запросы psycopg2 - в пуле
+    из workers потоков. Одновременно используется не больше workers подключений из общего пула (src.db.get_pool),
+    поэтому workers не должен превышать размер пула (параметр maxconn секции 'Pool'): from_config и запуск из
+    командной строки уменьшают его до размера пула.
+    """
+
+    __slots__ = ['host', 'port', 'workers', 'itersize', 'executor', 'connections', 'server', 'routes']
+
+    def __init__(self, host: str = HOST, port: int = PORT, workers: int = WORKERS, itersize: int = ITERSIZE) -> None:
+        """
+        :param host: Адрес, на котором принимаются соединения.
+        :param port: Порт (0 - любой свободный; фактический порт доступен в атрибуте port после start()).
+        :param workers: Количество потоков и одновременно используемых подключений к базе данных.
+        :param itersize: Количество строк, получаемых с сервера базы данных за одно обращение при потоковой выдаче.
+        """
+
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.itersize = itersize
+        self.executor = None
+        self.connections = None
+        self.server = None
+        self.routes = {
+            "/companies": self._companies,
+            "/vacancies": self._vacancies,
+            "/vacancies/higher-salary": self._higher_salary,
+            "/vacancies/search": self._search,
+            "/salary/average": self._average_salary,
+            "/salary/statistics": self._salary_statistics,
+        }
+
+    @classmethod
+    def from_config(cls, config: ConfigParser) -> 'QueryServer':
+        """
+        Создаёт сервер по параметрам секции 'Api' файла настроек; по умолчанию количество потоков равно размеру пула,
+        а большее значение уменьшается до него, иначе лишние потоки получали бы ошибку пула вместо подключения.
+
+        :param config: Разобранный файл настроек.
+        :return: HTTP-сервер запросов.
+        """
+
+        max_workers = pool_size(config)
+
+        return cls(
+            host=config.get("Api", "host", fallback=HOST),
+            port=config.getint("Api", "port", fallback=PORT),
+            workers=min(config.getint("Api", "workers", fallback=max_workers), max_workers),
+            itersize=config.getint("Api", "itersize", fallback=ITERSIZE)
+        )
+
+    async def start(self) -> None:
+        """
+        Начинает принимать соединения.
+        """
+
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="api")
+        self.connections = asyncio.Semaphore(self.workers)
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=MAX_LINE_SIZE)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """
+        Обслуживает соединения до отмены задачи.
+        """
+
+        await self.server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Прекращает приём соединений и останавливает потоки запросов.
+        """
+
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    @staticmethod
+    def _query(method: str, *args):
+        db = DBManager()
+
+        try:
+            return getattr(db, method)(*args)
+        finally:
+            db.release_db()
+
+    def _open_stream(self, method: str, *args) -> _RowStream:
+        db = DBManager(self.itersize)
+
+        try:
+            return _RowStream(db, getattr(db, method)(*args))
+        except BaseException:
+            db.release_db()
+
+            raise
+
+    async def query(self, method: str, *args):
+        """
+        Выполняет метод DBManager в потоке пула с подключением из общего пула.
+
+        :param method: Имя метода DBManager.
+        :param args: Аргументы метода.
+        :return: Результат метода.
+        """
+
+        async with self.connections:
+            return await self._run(self._query, method, *args)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await self._handle_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """
+        Читает и обрабатывает один запрос.
+
+        Простаивающее соединение закрывается через KEEP_ALIVE_TIMEOUT, а запрос, заголовки и тело которого не пришли
+        за READ_TIMEOUT, обрывается без ответа.
+
+        :return: Можно ли читать следующий запрос из того же соединения.
+        """
+
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+
+            if not request_line:
+                return False
+
+            method, target, version, headers = await asyncio.wait_for(self._read_request(reader, request_line),
+                                                                      READ_TIMEOUT)
+        except asyncio.TimeoutError:
+            return False
+        except HTTPError as error:
+            await self._send(writer, error.status, {"error": str(error)}, keep_alive=False)
+
+            return False
+        except ValueError:
+            await self._send(writer, 400, {"error": "Некорректный запрос"}, keep_alive=False)
+
+            return False
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        url = urlsplit(target)
+        handler = self.routes.get(url.path)
+        endpoint = url.path if handler is not None else "unknown"
+
+        with metrics.timer("hh_api_request_seconds", endpoint=endpoint):
+            try:
+                if handler is None:
+                    raise HTTPError(404, "Неизвестный эндпоинт")
+
+                if method != "GET":
+                    raise HTTPError(405, "Поддерживаются только запросы GET")
+
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                status = await handler(writer, params, keep_alive)
+            except HTTPError as error:
+                status = error.status
+                await self._send(writer, status, {"error": str(error)}, keep_alive)
+            except ConnectionError:
+                raise
+            except Exception as error:
+                status = 500
+                print(f"Ошибка обработки запроса {target}: {error!r}", file=sys.stderr)
+                await self._send(writer, status, {"error": "Внутренняя ошибка сервера"}, keep_alive)
+
+        metrics.inc("hh_api_responses_total", endpoint=endpoint, status=status)
+
+        return keep_alive
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader, request_line: bytes) -> tuple[str, str, str, dict]:
+        """
+        Читает заголовки и тело запроса после стартовой строки.
+
+        Количество заголовков ограничено MAX_HEADERS, размер тела - MAX_BODY_SIZE; тело читается и отбрасывается.
+
+        :param reader: Поток чтения соединения.
+        :param request_line: Прочитанная стартовая строка запроса.
+        :return: Метод, цель, версия протокола и заголовки (имена в нижнем регистре).
+        """
+
+        method, target, version = request_line.decode("latin-1").split()
+        headers = {}
+        count = 0
+
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            count += 1
+
+            if count > MAX_HEADERS:
+                raise HTTPError(431, "Слишком много заголовков")
+
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+
+        if length < 0:
+            raise ValueError(f"Некорректная длина тела: {length}")
+
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "Слишком большое тело запроса")
+
+        await reader.readexactly(length)
+
+        return method, target, version, headers
+
+    @staticmethod
+    def _head(status: int, headers: dict, keep_alive: bool) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, body, keep_alive: bool) -> int:
+        payload = dumps(body)
+        writer.write(self._head(status, {"Content-Type": "application/json; charset=utf-8",
+                                         "Content-Length": len(payload)}, keep_alive) + payload)
+        await writer.drain()
+
+        return status
+
+    async def _stream(self, writer: asyncio.StreamWriter, keep_alive: bool, fields: tuple, method: str,
+                      *args) -> int:
+        """
+        Отдаёт результат метода DBManager.iter_* построчно в формате JSON Lines.
+
+        Заголовок ответа отправляется после получения первой пачки строк, поэтому ошибка запроса возвращается
+        клиенту кодом 500; ошибка посреди выдачи обрывает соединение без завершающего фрагмента.
+        """
+
+        async with self.connections:
+            stream = await self._run(self._open_stream, method, *args)
+
+            try:
+                rows = await self._run(stream.next_batch, self.itersize)
+                writer.write(self._head(200, {"Content-Type": "application/x-ndjson; charset=utf-8",
+                                              "Transfer-Encoding": "chunked"}, keep_alive))
+
+                try:
+                    while rows:
+                        chunk = b"".join(dumps(dict(zip(fields, row))) + b"\n" for row in rows)
+                        writer.write(b"%x\r\n%b\r\n" % (len(chunk), chunk))
+                        await writer.drain()
+                        rows = await self._run(stream.next_batch, self.itersize)
+                except ConnectionError:
+                    raise
+                except Exception as error:
+                    print(f"Ошибка потоковой выдачи {method}: {error!r}", file=sys.stderr)
+
+                    raise ConnectionAbortedError(f"Выдача {method} прервана") from error
+
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+            finally:
+                await self._run(stream.close)
+
+        return 200
+
+    async def _companies(self, writer: asyncio.StreamWriter, params: dict, keep_alive: bool) -> int:
+        if params.get("stream") == "1":
+            return await self._stream(writer, keep_alive, COMPANY_FIELDS, "iter_companies_and_vacancies_count")
+
+        rows = await self.query("get_companies_and_vacancies_count")
+
+        return await self._send(writer, 200, {"items": [dict(zip(COMPANY_FIELDS, row)) for row in rows]}, keep_alive)
+
+    async def _vacancies(self, writer: asyncio.StreamWriter, params: dict, keep_alive: bool) -> int:
+        if params.get("stream") == "1":
+            return await self._stream(writer, keep_alive, VACANCY_FIELDS, "iter_all_vacancies")
+
+        limit = int_param(params, "limit", PAGE_SIZE, MAX_LIMIT)
+        rows = await self.query("get_vacancies_page", limit, int_param(params, "after_id", 0))
+        next_after_id = rows[-1][0] if rows and len(rows) == limit else None
+
+        return await self._send(writer, 200, {"items": [dict(zip(VACANCY_PAGE_FIELDS, row)) for row in rows],
+                                              "next_after_id": next_after_id}, keep_alive)
+
+    async def _higher_salary(self, writer: asyncio.StreamWriter, params: dict, keep_alive: bool) -> int:
+        if params.get("stream") == "1":
+            return await self._stream(writer, keep_alive, HIGHER_SALARY_FIELDS, "iter_vacancies_with_higher_salary")
+
+        limit = int_param(params, "limit", PAGE_SIZE, MAX_LIMIT)
+        rows = await self.query("get_vacancies_with_higher_salary", limit, int_param(params, "after_id", 0))
+        next_after_id = rows[-1][0] if rows and len(rows) == limit else None
+
+        return await self._send(writer, 200, {"items": [dict(zip(HIGHER_SALARY_PAGE_FIELDS, row)) for row in rows],
+                                              "next_after_id": next_after_id}, keep_alive)
+
+    async def _search(self, writer: asyncio.StreamWriter, params: dict, keep_alive: bool) -> int:
+        keyword = params.get("keyword", "").strip()
+
+        if not keyword:
+            raise HTTPError(400, "Не указан параметр keyword")
+
+        if params.get("stream") == "1":
+            return await self._stream(writer, keep_alive, KEYWORD_FIELDS, "iter_vacancies_with_keyword", keyword)
+
+        rows = await self.query("get_vacancies_with_keyword", keyword,
+                                int_param(params, "limit", PAGE_SIZE, MAX_LIMIT), int_param(params, "offset", 0))
+
+        return await self._send(writer, 200, {"items": [dict(zip(KEYWORD_FIELDS, row)) for row in rows]}, keep_alive)
+
+    async def _average_salary(self, writer: asyncio.StreamWriter, params: dict, keep_alive: bool) -> int:
+        return await self._send(writer, 200, {"avg_salary": await self.query("get_avg_salary")}, keep_alive)
+
+    async def _salary_statistics(self, writer: asyncio.StreamWriter, params: dict, keep_alive: bool) -> int:
+        rows = await self.query("get_salary_statistics")
+
+        return await self._send(writer, 200, {"items": [dict(zip(STATISTICS_FIELDS, row)) for row in rows]},
+                                keep_alive)
+
+
+async def serve(server: QueryServer) -> None:
+    """
+    Запускает сервер и обслуживает соединения до отмены задачи.
+    """
+
+    await server.start()
+    print(f"API запросов доступно на http://{server.host}:{server.port}/", file=sys.stderr)
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: list | None = None) -> None:
+    config = get_config()
+    defaults = QueryServer.from_config(config)
+
+    parser = argparse.ArgumentParser(description="HTTP API запросов к базе данных вакансий.")
+    parser.add_argument("--host", default=defaults.host, help="адрес, на котором принимаются соединения")
+    parser.add_argument("--port", type=int, default=defaults.port, help="порт")
+    parser.add_argument("--workers", type=int, default=defaults.workers,
+                        help="количество потоков и подключений к базе данных (не больше maxconn секции [Pool])")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="собирать метрики и отдавать их по HTTP на http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args(argv)
+
+    if args.workers > pool_size(config):
+        print(f"--workers {args.workers} больше размера пула подключений, используется {pool_size(config)}",
+              file=sys.stderr)
+        args.workers = pool_size(config)
+
+    if args.metrics_port is not None:
+        metrics.enable()
+        metrics.serve(args.metrics_port)
+
+    try:
+        asyncio.run(serve(QueryServer(args.host, args.port, args.workers, defaults.itersize)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
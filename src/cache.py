@@ -0,0 +1,304 @@
+import json
+import sqlite3
+import threading
+import time
+from configparser import ConfigParser
+from urllib.parse import urlencode
+
+from src import metrics
+from src.client import HHAPIError, HHClient, default_client
+
+
+CACHE_PATH = "hh_cache.sqlite3"
+CACHE_TTL = 3600.0
+CACHE_MAX_AGE = 30 * 24 * 3600.0
+CACHE_MAX_SIZE = 256 * 1024 * 1024
+EVICT_BATCH = 256
+
+
+class CacheMissError(LookupError):
+    """
+    Ответа нет в кэше, а запросы к сети запрещены (автономный режим).
+    """
+
+
+class ResponseCache:
+    """
+    Постоянный кэш HTTP-ответов в SQLite.
+
+    Ответ считается свежим в течение ttl секунд и отдаётся без обращения к сети. Устаревший ответ перепроверяется
+    условным запросом (If-None-Match / If-Modified-Since): если ресурс не изменился, сервер отвечает 304 без тела.
+    Записи старше max_age удаляются, а при превышении max_size байт вытесняются давно не использованные (LRU).
+    Суммарный размер записей поддерживается триггерами в таблице cache_size, поэтому запись и вытеснение не
+    сканируют весь кэш, а время обращения к записям копится в памяти и сохраняется вместе со следующей записью,
+    чтобы чтение из кэша не требовало фиксации транзакции. В автономном режиме (offline) ответы отдаются только
+    из кэша.
+    """
+
+    __slots__ = ['conn', 'lock', 'ttl', 'max_age', 'max_size', 'offline', 'accessed']
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_age: float = CACHE_MAX_AGE,
+                 max_size: int = CACHE_MAX_SIZE, offline: bool = False) -> None:
+        """
+        :param path: Путь к файлу базы SQLite (':memory:' - кэш в памяти).
+        :param ttl: Время в секундах, в течение которого ответ используется без перепроверки.
+        :param max_age: Время в секундах, после которого запись удаляется.
+        :param max_size: Максимальный суммарный размер тел ответов в байтах.
+        :param offline: Отдавать ответы только из кэша, не обращаясь к сети.
+        """
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_size = max_size
+        self.offline = offline
+        self.accessed = {}
+
+        with self.lock, self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body BLOB NOT NULL, "
+                              "etag TEXT, last_modified TEXT, stored_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                              "size INTEGER NOT NULL);")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at);")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), "
+                              "total INTEGER NOT NULL);")
+            self.conn.execute("INSERT OR IGNORE INTO cache_size SELECT 0, COALESCE(SUM(size), 0) FROM responses;")
+            self.conn.execute("CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses BEGIN "
+                              "UPDATE cache_size SET total = total + NEW.size; END;")
+            self.conn.execute("CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses "
+                              "BEGIN UPDATE cache_size SET total = total - OLD.size + NEW.size; END;")
+            self.conn.execute("CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses BEGIN "
+                              "UPDATE cache_size SET total = total - OLD.size; END;")
+
+    @classmethod
+    def from_config(cls, config: ConfigParser, offline: bool = False) -> 'ResponseCache':
+        """
+        Создаёт кэш по параметрам секции 'Cache' файла настроек.
+
+        :param config: Разобранный файл настроек.
+        :param offline: Включить автономный режим.
+        :return: Кэш HTTP-ответов.
+        """
+
+        return cls(
+            path=config.get("Cache", "path", fallback=CACHE_PATH),
+            ttl=config.getfloat("Cache", "ttl", fallback=CACHE_TTL),
+            max_age=config.getfloat("Cache", "max_age", fallback=CACHE_MAX_AGE),
+            max_size=config.getint("Cache", "max_size", fallback=CACHE_MAX_SIZE),
+            offline=offline
+        )
+
+    @staticmethod
+    def make_key(url: str, params: dict | None = None) -> str:
+        """
+        Формирует ключ кэша из адреса и отсортированных параметров запроса.
+        """
+
+        if not params:
+            return url
+
+        return f"{url}?{urlencode(sorted((str(key), str(value)) for key, value in params.items()))}"
+
+    def get(self, key: str) -> tuple | None:
+        """
+        Возвращает запись кэша и отмечает время обращения к ней (сохраняется в базе при следующей записи).
+
+        :param key: Ключ кэша.
+        :return: Кортеж (body, etag, last_modified, stored_at) или None.
+        """
+
+        with self.lock:
+            row = self.conn.execute("SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?;",
+                                    (key,)).fetchone()
+
+            if row is not None:
+                self.accessed[key] = time.time()
+
+        return row
+
+    def lookup(self, url: str, params: dict | None = None) -> tuple[dict | None, tuple | None]:
+        """
+        Ищет ответ в кэше.
+
+        :param url: Адрес запроса.
+        :param params: Параметры строки запроса.
+        :return: Кортеж (разобранный JSON ответа, если его можно использовать без обращения к сети, иначе None;
+            запись кэша для условного запроса (см. revalidate) или None).
+        :raises CacheMissError: Записи нет, а кэш работает в автономном режиме.
+        """
+
+        key = self.make_key(url, params)
+        entry = self.get(key)
+
+        if entry is not None and (self.offline or time.time() - entry[3] < self.ttl):
+            metrics.inc("hh_cache_requests_total", result="hit")
+
+            with metrics.timer("hh_json_decode_seconds"):
+                return json.loads(entry[0]), entry
+
+        if self.offline:
+            metrics.inc("hh_cache_requests_total", result="miss")
+
+            raise CacheMissError(key)
+
+        return None, entry
+
+    def put(self, key: str, body: bytes, etag: str | None = None, last_modified: str | None = None) -> None:
+        """
+        Сохраняет ответ в кэш и при необходимости вытесняет старые записи.
+        """
+
+        now = time.time()
+
+        with self.lock, self.conn:
+            self._flush_accessed()
+            self.conn.execute("INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                              "body = excluded.body, etag = excluded.etag, last_modified = excluded.last_modified, "
+                              "stored_at = excluded.stored_at, accessed_at = excluded.accessed_at, "
+                              "size = excluded.size;", (key, body, etag, last_modified, now, now, len(body)))
+            self._evict(now)
+
+    def touch(self, key: str) -> None:
+        """
+        Продлевает свежесть записи после ответа 304 Not Modified.
+        """
+
+        now = time.time()
+
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?;", (now, now, key))
+
+    def _flush_accessed(self) -> None:
+        """
+        Сохраняет накопленные времена обращения к записям (вызывается под блокировкой в транзакции).
+        """
+
+        if self.accessed:
+            self.conn.executemany("UPDATE responses SET accessed_at = ? WHERE key = ?;",
+                                  [(accessed_at, key) for key, accessed_at in self.accessed.items()])
+            self.accessed.clear()
+
+    def _evict(self, now: float) -> None:
+        """
+        Удаляет записи старше max_age и вытесняет давно не использованные, пока размер кэша превышает max_size.
+
+        Обе операции идут по индексам и затрагивают только удаляемые записи.
+        """
+
+        self.conn.execute("DELETE FROM responses WHERE stored_at < ?;", (now - self.max_age,))
+
+        excess = self.conn.execute("SELECT total FROM cache_size;").fetchone()[0] - self.max_size
+
+        while excess > 0:
+            victims = self.conn.execute("SELECT size FROM responses ORDER BY accessed_at LIMIT ?;",
+                                        (EVICT_BATCH,)).fetchall()
+
+            if not victims:
+                return
+
+            count = 0
+
+            for (size,) in victims:
+                if excess <= 0:
+                    break
+
+                excess -= size
+                count += 1
+
+            self.conn.execute("DELETE FROM responses WHERE key IN "
+                              "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?);", (count,))
+
+    def close(self) -> None:
+        """
+        Сохраняет времена обращения к записям и закрывает файл кэша.
+        """
+
+        with self.lock, self.conn:
+            self._flush_accessed()
+
+        self.conn.close()
+
+
+def cached_get(url: str, params: dict | None = None, cache: ResponseCache | None = None,
+               client: HHClient | None = None) -> dict:
+    """
+    Выполняет GET-запрос с использованием кэша ответов и возвращает разобранный JSON.
+
+    Без кэша запрос выполняется напрямую. Свежий ответ из кэша возвращается без обращения к сети, устаревший
+    перепроверяется условным запросом. В автономном режиме при отсутствии записи возбуждается CacheMissError.
+
+    :param url: Адрес запроса.
+    :param params: Параметры строки запроса.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента (src.client.default_client).
+    :return: Тело ответа, разобранное из JSON.
+    :raises src.client.HHAPIError: Запрос завершился ошибкой.
+    """
+
+    if client is None:
+        client = default_client()
+
+    if cache is None:
+        return client.get_json(url, params)
+
+    cached, entry = cache.lookup(url, params)
+
+    if cached is not None:
+        return cached
+
+    return revalidate(url, params, cache, client, entry)
+
+
+def revalidate(url: str, params: dict | None, cache: ResponseCache, client: HHClient | None = None,
+               entry: tuple | None = None) -> dict:
+    """
+    Запрашивает ответ у сервера (условным запросом, если есть устаревшая запись) и сохраняет его в кэше.
+
+    Используется после ResponseCache.lookup, чтобы не искать запись в кэше повторно.
+
+    :param url: Адрес запроса.
+    :param params: Параметры строки запроса.
+    :param cache: Кэш ответов.
+    :param client: HTTP-клиент или None для общего клиента.
+    :param entry: Запись кэша, возвращённая lookup, или None.
+    :return: Тело ответа, разобранное из JSON.
+    :raises src.client.HHAPIError: Запрос завершился ошибкой.
+    """
+
+    if client is None:
+        client = default_client()
+
+    key = cache.make_key(url, params)
+    headers = {}
+
+    if entry is not None:
+        if entry[1]:
+            headers["If-None-Match"] = entry[1]
+
+        if entry[2]:
+            headers["If-Modified-Since"] = entry[2]
+
+    response = client.get(url, params, headers)
+
+    if response.status_code == 304:
+        if entry is not None:
+            metrics.inc("hh_cache_requests_total", result="not_modified")
+            cache.touch(key)
+
+            with metrics.timer("hh_json_decode_seconds"):
+                return json.loads(entry[0])
+
+        # 304 без сохранённого тела (например, от промежуточного кэша): повторяем запрос безусловно.
+        response = client.get(url, params, {"Cache-Control": "no-cache"})
+
+        if response.status_code == 304:
+            raise HHAPIError(f"{url}: HTTP 304 на безусловный запрос", 304)
+
+    metrics.inc("hh_cache_requests_total", result="stale" if entry is not None else "miss")
+
+    if response.status_code == 200:
+        cache.put(key, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    with metrics.timer("hh_json_decode_seconds"):
+        return response.json()
@@ -0,0 +1,327 @@
+import random
+import threading
+import time
+from configparser import ConfigParser
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src import metrics
+
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10.0
+RETRIES = 4
+BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+POOL_SIZE = 20
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 30.0
+USER_AGENT = "hh_information_db/1.0"
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HHAPIError(Exception):
+    """
+    Запрос к API hh.ru завершился ошибкой: код ответа 4xx/5xx или сетевая ошибка после исчерпания повторов.
+    """
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(HHAPIError):
+    """
+    Автомат размыкания разомкнут: запросы к API не выполняются до истечения времени восстановления.
+    """
+
+
+class CircuitBreaker:
+    """
+    Автомат размыкания цепи (circuit breaker).
+
+    После failure_threshold неудачных попыток подряд цепь размыкается, и запросы сразу завершаются ошибкой
+    CircuitOpenError, не нагружая недоступный сервер. Через reset_timeout секунд пропускается одна пробная
+    попытка: успех замыкает цепь, неудача снова размыкает её и учитывается в failed_probes (число неудачных пробных
+    попыток подряд). Ответ 429 неудачей не считается: сервер доступен, а ограничение частоты учитывается через
+    Retry-After.
+    """
+
+    __slots__ = ['failure_threshold', 'reset_timeout', 'failures', 'opened_at', 'probing', 'failed_probes', 'lock']
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT) -> None:
+        """
+        :param failure_threshold: Количество неудачных попыток подряд, после которого цепь размыкается.
+        :param reset_timeout: Время в секундах до пробной попытки после размыкания.
+        """
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.failed_probes = 0
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Разомкнута ли цепь в данный момент.
+        """
+
+        with self.lock:
+            return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    @property
+    def retry_in(self) -> float:
+        """
+        Время в секундах до пробной попытки (0, если цепь замкнута или пробную попытку можно выполнить сейчас).
+        """
+
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+
+            return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> None:
+        """
+        Проверяет, можно ли выполнить попытку запроса.
+
+        :raises CircuitOpenError: Цепь разомкнута.
+        """
+
+        with self.lock:
+            if self.opened_at is None:
+                return
+
+            now = time.monotonic()
+
+            if now - self.opened_at < self.reset_timeout:
+                raise CircuitOpenError("API hh.ru недоступен: автомат размыкания разомкнут")
+
+            # Пробная попытка: остальные запросы ждут её результата ещё reset_timeout секунд.
+            self.opened_at = now
+            self.probing = True
+
+    def record_success(self) -> None:
+        """
+        Замыкает цепь после успешной попытки.
+        """
+
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+            self.failed_probes = 0
+
+    def record_failure(self) -> None:
+        """
+        Учитывает неудачную попытку и размыкает цепь при достижении порога.
+        """
+
+        with self.lock:
+            self.failures += 1
+
+            if self.probing:
+                self.probing = False
+                self.failed_probes += 1
+
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Возвращает название эндпоинта API по адресу запроса (первый сегмент пути, без идентификаторов) для меток метрик.
+    """
+
+    return urlparse(url).path.strip("/").split("/", 1)[0] or "/"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Разбирает заголовок Retry-After (число секунд или HTTP-дата).
+
+    :param value: Значение заголовка.
+    :return: Время ожидания в секундах или None, если заголовок отсутствует или некорректен.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HHClient:
+    """
+    HTTP-клиент API hh.ru.
+
+    Использует одну сессию requests с пулом постоянных (keep-alive) соединений, ограничивает время установки
+    соединения и чтения ответа, повторяет запросы при сетевых ошибках и ответах 429/5xx с экспоненциальной
+    задержкой со случайным разбросом (или через время из заголовка Retry-After) и прекращает обращения к API
+    через автомат размыкания, если сервер долго не отвечает. Клиент можно использовать из нескольких потоков.
+    """
+
+    __slots__ = ['session', 'timeout', 'retries', 'backoff', 'max_backoff', 'breaker']
+
+    def __init__(self, connect_timeout: float = CONNECT_TIMEOUT, read_timeout: float = READ_TIMEOUT,
+                 retries: int = RETRIES, backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF,
+                 pool_size: int = POOL_SIZE, breaker: CircuitBreaker | None = None,
+                 user_agent: str = USER_AGENT) -> None:
+        """
+        :param connect_timeout: Время ожидания установки соединения в секундах.
+        :param read_timeout: Время ожидания ответа сервера в секундах.
+        :param retries: Количество повторов после неудачной попытки.
+        :param backoff: Базовая задержка перед повтором в секундах (удваивается с каждой попыткой).
+        :param max_backoff: Максимальная задержка перед повтором; если Retry-After требует ждать дольше,
+            запрос завершается ошибкой.
+        :param pool_size: Количество постоянных соединений с одним хостом.
+        :param breaker: Автомат размыкания или None для автомата с параметрами по умолчанию.
+        :param user_agent: Значение заголовка User-Agent (API hh.ru требует его указывать).
+        """
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = user_agent
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+
+    @classmethod
+    def from_config(cls, config: ConfigParser) -> 'HHClient':
+        """
+        Создаёт клиента по параметрам секции 'Client' файла настроек.
+
+        :param config: Разобранный файл настроек.
+        :return: HTTP-клиент API hh.ru.
+        """
+
+        return cls(
+            connect_timeout=config.getfloat("Client", "connect_timeout", fallback=CONNECT_TIMEOUT),
+            read_timeout=config.getfloat("Client", "read_timeout", fallback=READ_TIMEOUT),
+            retries=config.getint("Client", "retries", fallback=RETRIES),
+            backoff=config.getfloat("Client", "backoff", fallback=BACKOFF),
+            max_backoff=config.getfloat("Client", "max_backoff", fallback=MAX_BACKOFF),
+            pool_size=config.getint("Client", "pool_size", fallback=POOL_SIZE),
+            breaker=CircuitBreaker(config.getint("Client", "failure_threshold", fallback=FAILURE_THRESHOLD),
+                                   config.getfloat("Client", "reset_timeout", fallback=RESET_TIMEOUT)),
+            user_agent=config.get("Client", "user_agent", fallback=USER_AGENT)
+        )
+
+    def _delay(self, attempt: int, retry_after: float | None) -> float:
+        """
+        Вычисляет задержку перед повтором: Retry-After, если он задан, иначе экспоненциальную задержку
+        со случайным разбросом ("full jitter").
+        """
+
+        if retry_after is not None:
+            return retry_after
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def get(self, url: str, params: dict | None = None, headers: dict | None = None) -> requests.Response:
+        """
+        Выполняет GET-запрос с повторами.
+
+        :param url: Адрес запроса.
+        :param params: Параметры строки запроса.
+        :param headers: Дополнительные заголовки запроса.
+        :return: Ответ с кодом 2xx или 3xx.
+        :raises HHAPIError: Ответ 4xx (кроме 429) или неудача всех попыток.
+        :raises CircuitOpenError: Цепь разомкнута; если до размыкания запрос успел выполнить неудачные попытки,
+            последняя из ошибок передаётся как __cause__.
+        """
+
+        attempt = 0
+        endpoint = endpoint_name(url)
+        failure = None
+
+        while True:
+            try:
+                self.breaker.allow()
+            except CircuitOpenError as error:
+                metrics.inc("hh_http_circuit_open_total", endpoint=endpoint)
+
+                raise error from failure
+
+            retry_after = None
+
+            try:
+                with metrics.timer("hh_http_request_seconds", endpoint=endpoint):
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except requests.RequestException as error:
+                self.breaker.record_failure()
+                failure = HHAPIError(f"{url}: {error}")
+                failure.__cause__ = error
+                reason = type(error).__name__
+            else:
+                metrics.inc("hh_http_responses_total", endpoint=endpoint, status=response.status_code)
+                metrics.inc("hh_http_response_bytes_total", len(response.content), endpoint=endpoint)
+
+                # 429 означает, что сервер доступен: для автомата размыкания это успешная попытка.
+                if response.status_code in RETRY_STATUSES and response.status_code != 429:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code >= 400:
+                        raise HHAPIError(f"{url}: HTTP {response.status_code}", response.status_code)
+
+                    return response
+
+                failure = HHAPIError(f"{url}: HTTP {response.status_code}", response.status_code)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                reason = str(response.status_code)
+
+            if attempt >= self.retries or (retry_after is not None and retry_after > self.max_backoff):
+                raise failure
+
+            metrics.inc("hh_http_retries_total", endpoint=endpoint, reason=reason)
+
+            time.sleep(self._delay(attempt, retry_after))
+            attempt += 1
+
+    def get_json(self, url: str, params: dict | None = None) -> dict:
+        """
+        Выполняет GET-запрос с повторами и возвращает разобранный JSON.
+        """
+
+        response = self.get(url, params)
+
+        with metrics.timer("hh_json_decode_seconds"):
+            return response.json()
+
+    def close(self) -> None:
+        """
+        Закрывает соединения сессии.
+        """
+
+        self.session.close()
+
+
+@lru_cache(maxsize=None)
+def default_client() -> HHClient:
+    """
+    Возвращает общий клиент с параметрами по умолчанию для вызовов, которым клиент не передан явно.
+    """
+
+    return HHClient()
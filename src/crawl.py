@@ -0,0 +1,399 @@
+"""
+Обход большого числа работодателей с разбиением на шарды и продолжением после прерывания.
+
+Идентификаторы работодателей читаются лениво из файла (--employers-file) или из поиска /employers API hh.ru
+(--search). Шард i/N обрабатывает работодателей с company_id % N == i; шарды можно запускать отдельными командами
+(на разных машинах) или в нескольких процессах одной команды (--processes), делящих шард дальше. Запросы поиска
+расходуют тот же лимит --requests-per-second, что и загрузка компаний; при нескольких процессах поиск выполняется
+один раз в родительском процессе, а найденные идентификаторы шарда сохраняются в каталог состояния и читаются
+процессами из файла.
+
+Компании загружаются конвейером (src.pipeline.Pipeline) в режиме инкрементальной синхронизации пачками
+по --chunk-size; каждая пачка записывается в отдельной транзакции, после фиксации которой идентификаторы успешно
+загруженных компаний дописываются в файл состояния шарда. Повторный запуск с теми же параметрами пропускает
+компании из файла состояния и продолжает с места остановки; компании с ошибками загрузки повторяются.
+
+Запуск:
+    python -m src.crawl --employers-file employers.txt --processes 4
+    python -m src.crawl --search банк --area 1 --shard 0/2
+"""
+
+import argparse
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from multiprocessing import get_context
+from typing import Iterable, Iterator
+
+from src.cache import ResponseCache
+from src.client import HHClient
+from src.currency import load_rates, store_rates, BASE_CURRENCY
+from src.db import get_config, transaction, close_pool
+from src.fetcher import RateLimiter, iter_employer_ids, BASE_URL, REQUESTS_PER_SECOND
+from src.pipeline import Pipeline, FETCH_WORKERS, TRANSFORM_WORKERS, QUEUE_SIZE
+from src.sync import SYNC_COUNTERS
+from src.utils import create_tables, refresh_statistics
+
+
+CHUNK_SIZE = 100
+STATE_DIR = "crawl_state"
+
+
+class Shard:
+    """
+    Часть множества работодателей: компании с company_id % count == index.
+    """
+
+    __slots__ = ['index', 'count']
+
+    def __init__(self, index: int = 0, count: int = 1) -> None:
+        """
+        :param index: Номер шарда (с нуля).
+        :param count: Общее количество шардов.
+        """
+
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Некорректный шард {index}/{count}: ожидается 0 <= i < N")
+
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Shard':
+        """
+        Разбирает шард в виде 'i/N'.
+
+        :raises ValueError: Строка не соответствует формату или номер шарда вне диапазона.
+        """
+
+        index, separator, count = spec.partition("/")
+
+        if not separator:
+            raise ValueError(f"Некорректный шард {spec!r}: ожидается формат i/N")
+
+        return cls(int(index), int(count))
+
+    def __contains__(self, company_id: int) -> bool:
+        return company_id % self.count == self.index
+
+    def __str__(self) -> str:
+        return f"{self.index}/{self.count}"
+
+    def __repr__(self) -> str:
+        return f"Shard({self.index}, {self.count})"
+
+    def split(self, parts: int) -> list['Shard']:
+        """
+        Делит шард на parts шардов, вместе содержащих те же компании (шард i/N делится на (i + N * j)/(N * parts)).
+        """
+
+        return [Shard(self.index + self.count * part, self.count * parts) for part in range(parts)]
+
+
+def read_employer_ids(path: str) -> Iterator[int]:
+    """
+    Лениво читает идентификаторы работодателей из файла: по одному в строке (первое поле до пробела или запятой),
+    пустые строки и строки, начинающиеся с '#', пропускаются.
+
+    :param path: Путь к файлу.
+    :return: Итератор по идентификаторам.
+    """
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            field = line.replace(",", " ").split(None, 1)
+
+            if field and not field[0].startswith("#"):
+                yield int(field[0])
+
+
+class CrawlState:
+    """
+    Файл состояния шарда: идентификаторы полностью загруженных компаний, по одному в строке.
+
+    Файл только дописывается, и каждая запись сбрасывается на диск, поэтому после аварийного завершения теряется
+    не больше последней незавершённой строки (она отбрасывается при открытии файла).
+    """
+
+    __slots__ = ['path', 'done', 'file']
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Путь к файлу состояния (каталог создаётся при необходимости).
+        """
+
+        self.path = path
+        self.done = set()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "a+", encoding="utf-8")
+        self.file.seek(0)
+        content = self.file.read()
+
+        # Незавершённая последняя строка отбрасывается, чтобы следующая запись не склеилась с ней.
+        if not content.endswith("\n") and content:
+            content = content[:content.rfind("\n") + 1]
+            self.file.truncate(len(content.encode()))
+
+        self.done.update(int(line) for line in content.split())
+
+    @classmethod
+    def for_shard(cls, directory: str, shard: Shard) -> 'CrawlState':
+        """
+        Открывает файл состояния шарда в каталоге directory.
+        """
+
+        return cls(os.path.join(directory, f"shard-{shard.index}-of-{shard.count}.txt"))
+
+    def __contains__(self, company_id: int) -> bool:
+        return company_id in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def mark_done(self, company_ids: Iterable[int]) -> None:
+        """
+        Записывает компании как полностью загруженные.
+        """
+
+        company_ids = [company_id for company_id in company_ids if company_id not in self.done]
+
+        if not company_ids:
+            return
+
+        self.file.write("".join(f"{company_id}\n" for company_id in company_ids))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.done.update(company_ids)
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> 'CrawlState':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def crawl(company_ids: Iterable[int], state: CrawlState, chunk_size: int = CHUNK_SIZE, **pipeline_options) -> dict:
+    """
+    Загружает компании пачками по chunk_size, пропуская уже загруженные, и отмечает их в файле состояния.
+
+    Каждая пачка загружается конвейером в режиме синхронизации в отдельной транзакции; в файл состояния компании
+    попадают только после фиксации транзакции, поэтому при прерывании незавершённая пачка будет загружена заново.
+
+    :param company_ids: Идентификаторы компаний (читаются лениво).
+    :param state: Файл состояния.
+    :param chunk_size: Количество компаний в одной транзакции.
+    :param pipeline_options: Параметры конвейера (rates, cache, client, base_url, fetch_workers и т.д.).
+    :return: Отчёт: счётчики изменений 'companies' и 'vacancies', количество загруженных ('done') и пропущенных
+        ('skipped') компаний и ошибки 'failures' {идентификатор компании: текст ошибки}.
+    :raises ValueError: chunk_size меньше 1.
+    """
+
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size должен быть не меньше 1, получено {chunk_size}")
+
+    report = {"companies": Counter(), "vacancies": Counter(), "done": 0, "skipped": 0, "failures": {}}
+
+    def pending() -> Iterator[int]:
+        seen = set()
+
+        for company_id in company_ids:
+            if company_id in state:
+                report["skipped"] += 1
+            elif company_id not in seen:
+                seen.add(company_id)
+
+                yield company_id
+
+    company_ids_left = pending()
+
+    while chunk := list(islice(company_ids_left, chunk_size)):
+        with transaction():
+            pipeline = Pipeline(chunk, full=False, **pipeline_options)
+            stats = pipeline.run()
+
+        completed = [company_id for company_id in chunk if company_id not in pipeline.failures]
+        state.mark_done(completed)
+
+        report["companies"].update(stats["companies"])
+        report["vacancies"].update(stats["vacancies"])
+        report["done"] += len(completed)
+        report["failures"].update((company_id, str(error)) for company_id, error in pipeline.failures.items())
+
+    return report
+
+
+def iter_source(args: argparse.Namespace, cache: ResponseCache | None = None, client: HHClient | None = None,
+                limiter: RateLimiter | None = None) -> Iterator[int]:
+    """
+    Возвращает ленивый источник идентификаторов работодателей по параметрам командной строки.
+
+    :param limiter: Ограничитель частоты запросов поиска (общий с загрузкой компаний) или None.
+    """
+
+    if args.employers_file:
+        return read_employer_ids(args.employers_file)
+
+    params = {"text": args.search, "only_with_vacancies": "true"}
+
+    if args.area:
+        params["area"] = args.area
+
+    return iter_employer_ids(params, args.base_url, cache=cache, client=client, limiter=limiter)
+
+
+def discover_employers(args: argparse.Namespace, shard: Shard, path: str, cache: ResponseCache | None = None,
+                       client: HHClient | None = None) -> str:
+    """
+    Один раз выполняет поиск работодателей (--search) и сохраняет идентификаторы компаний шарда в файл.
+
+    Вызывается в родительском процессе перед запуском процессов обхода, которые затем читают файл: иначе каждый
+    процесс заново постранично обходил бы весь поиск. Файл заменяется целиком только после завершения поиска.
+
+    :param args: Параметры командной строки.
+    :param shard: Шард, идентификаторы которого сохраняются.
+    :param path: Путь к файлу идентификаторов.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :return: Путь к файлу идентификаторов.
+    """
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    limiter = RateLimiter(args.requests_per_second)
+
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        for company_id in iter_source(args, cache, client, limiter):
+            if company_id in shard:
+                file.write(f"{company_id}\n")
+
+    os.replace(f"{path}.tmp", path)
+
+    return path
+
+
+def crawl_shard(shard: Shard, args: argparse.Namespace, rates: dict[str, float], requests_per_second: float) -> dict:
+    """
+    Обходит один шард; вызывается в отдельном процессе при --processes больше 1.
+
+    :return: Отчёт crawl с добавленным ключом 'shard'.
+    """
+
+    config = get_config()
+    cache = ResponseCache.from_config(config, offline=args.offline)
+    client = HHClient.from_config(config)
+    # Один ограничитель на процесс: запросы поиска и загрузка всех пачек делят лимит частоты.
+    limiter = RateLimiter(requests_per_second)
+
+    try:
+        with CrawlState.for_shard(args.state_dir, shard) as state:
+            company_ids = (company_id for company_id in iter_source(args, cache, client, limiter)
+                           if company_id in shard)
+            report = crawl(
+                company_ids, state, args.chunk_size, rates=rates, cache=cache, client=client, base_url=args.base_url,
+                limiter=limiter,
+                fetch_workers=config.getint("Pipeline", "fetch_workers", fallback=FETCH_WORKERS),
+                transform_workers=config.getint("Pipeline", "transform_workers", fallback=TRANSFORM_WORKERS),
+                queue_size=config.getint("Pipeline", "queue_size", fallback=QUEUE_SIZE)
+            )
+    finally:
+        client.close()
+        cache.close()
+        close_pool()
+
+    report["shard"] = str(shard)
+
+    return report
+
+
+def _shard_argument(spec: str) -> Shard:
+    try:
+        return Shard.parse(spec)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"ожидается целое число не меньше 1, получено {value}")
+
+    return number
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--employers-file", metavar="PATH", help="файл с идентификаторами работодателей")
+    source.add_argument("--search", metavar="TEXT", help="найти работодателей через /employers по строке TEXT")
+    parser.add_argument("--area", help="регион поиска работодателей (идентификатор из справочника /areas)")
+    parser.add_argument("--shard", type=_shard_argument, default=Shard(), metavar="i/N",
+                        help="обработать только шард i из N (company_id %% N == i)")
+    parser.add_argument("--processes", type=_positive_int, default=1, help="количество процессов, делящих шард")
+    parser.add_argument("--chunk-size", type=_positive_int, default=CHUNK_SIZE,
+                        help="количество компаний в одной транзакции и контрольной точке")
+    parser.add_argument("--state-dir", default=STATE_DIR, help="каталог файлов состояния шардов")
+    parser.add_argument("--requests-per-second", type=float, default=REQUESTS_PER_SECOND,
+                        help="общая частота запросов к API для всех процессов команды")
+    parser.add_argument("--offline", action="store_true", help="брать ответы API только из локального кэша")
+    parser.add_argument("--base-url", default=BASE_URL, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    config = get_config()
+    cache = ResponseCache.from_config(config, offline=args.offline)
+    client = HHClient.from_config(config)
+
+    shards = args.shard.split(args.processes)
+    requests_per_second = args.requests_per_second / len(shards)
+
+    try:
+        rates = load_rates(config.get("Currency", "rates_file", fallback=None), cache=cache,
+                           base=config.get("Currency", "base", fallback=BASE_CURRENCY), base_url=args.base_url,
+                           client=client)
+
+        if args.search and len(shards) > 1:
+            path = os.path.join(args.state_dir, f"employers-{args.shard.index}-of-{args.shard.count}.txt")
+            discover_employers(args, args.shard, path, cache, client)
+            args = argparse.Namespace(**{**vars(args), "employers_file": path, "search": None})
+    finally:
+        client.close()
+        cache.close()
+
+    with transaction():
+        create_tables()
+        store_rates(rates)
+
+    try:
+        if len(shards) == 1:
+            reports = [crawl_shard(shards[0], args, rates, requests_per_second)]
+        else:
+            # spawn: дочерние процессы не должны наследовать подключения к базе и HTTP-сессии родителя.
+            with ProcessPoolExecutor(len(shards), mp_context=get_context("spawn")) as executor:
+                reports = list(executor.map(crawl_shard, shards, repeat(args), repeat(rates),
+                                            repeat(requests_per_second)))
+
+        with transaction():
+            refresh_statistics()
+    finally:
+        close_pool()
+
+    for report in reports:
+        print(f"Шард {report['shard']}: загружено компаний - {report['done']}, пропущено (уже загружены) - "
+              f"{report['skipped']}, ошибок - {len(report['failures'])}")
+
+        for title, key in (("Компании", "companies"), ("Вакансии", "vacancies")):
+            print(f"  {title}: " + ", ".join(f"{name} - {report[key][name]}" for name in SYNC_COUNTERS))
+
+        for company_id, error in report["failures"].items():
+            print(f"  Не удалось загрузить компанию {company_id}: {error}")
+
+    return 1 if any(report["failures"] for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import json
+from decimal import Decimal
+
+from src.cache import ResponseCache, cached_get
+from src.client import HHClient
+from src.db import connection
+from src.fetcher import BASE_URL
+
+
+BASE_CURRENCY = "RUR"
+
+
+def rates_from_dictionaries(payload: dict | list, base: str = BASE_CURRENCY) -> dict[str, float]:
+    """
+    Строит таблицу коэффициентов пересчёта в базовую валюту из справочника валют hh.ru.
+
+    В справочнике /dictionaries поле 'rate' означает количество единиц валюты за один рубль, поэтому коэффициент
+    пересчёта суммы в базовую валюту равен rate(base) / rate(currency).
+
+    :param payload: Ответ /dictionaries или его список 'currency'.
+    :param base: Код базовой валюты.
+    :return: Словарь {код валюты: коэффициент пересчёта в базовую валюту}.
+    """
+
+    currencies = payload["currency"] if isinstance(payload, dict) else payload
+    per_rub = {currency["code"]: float(currency["rate"]) for currency in currencies if currency.get("rate")}
+
+    if base not in per_rub:
+        raise ValueError(f"В справочнике нет курса базовой валюты {base}")
+
+    return {code: per_rub[base] / rate for code, rate in per_rub.items()}
+
+
+def load_rates(path: str | None = None, cache: ResponseCache | None = None, base: str = BASE_CURRENCY,
+               base_url: str = BASE_URL, client: HHClient | None = None) -> dict[str, float]:
+    """
+    Загружает курсы валют из файла или из справочника /dictionaries API hh.ru.
+
+    Файл должен содержать сохранённый ответ /dictionaries (или его список 'currency'). При загрузке из API ответ
+    сохраняется в кэше ответов, поэтому справочник не запрашивается при каждом запуске.
+
+    :param path: Путь к JSON-файлу со справочником или None для загрузки из API.
+    :param cache: Кэш ответов или None.
+    :param base: Код базовой валюты.
+    :param base_url: Базовый адрес API.
+    :param client: HTTP-клиент или None для общего клиента.
+    :return: Словарь {код валюты: коэффициент пересчёта в базовую валюту}.
+    """
+
+    if path:
+        with open(path, encoding="utf-8") as file:
+            payload = json.load(file)
+    else:
+        payload = cached_get(f"{base_url}dictionaries", cache=cache, client=client)
+
+    return rates_from_dictionaries(payload, base)
+
+
+def salary_midpoint(salary_min: int | None, salary_max: int | None, currency: str | None,
+                    rates: dict[str, float] | None) -> Decimal | None:
+    """
+    Вычисляет середину вилки зарплаты в базовой валюте.
+
+    Если указана только одна граница, используется она. Если зарплата не указана или курс валюты неизвестен,
+    возвращается None.
+
+    :param salary_min: Нижняя граница вилки.
+    :param salary_max: Верхняя граница вилки.
+    :param currency: Код валюты.
+    :param rates: Коэффициенты пересчёта в базовую валюту.
+    :return: Середина вилки в базовой валюте, округлённая до копеек, или None.
+    """
+
+    bounds = [bound for bound in (salary_min, salary_max) if bound is not None]
+    factor = (rates or {BASE_CURRENCY: 1.0}).get(currency)
+
+    if not bounds or factor is None:
+        return None
+
+    return round(Decimal(sum(bounds) / len(bounds) * factor), 2)
+
+
+def store_rates(rates: dict[str, float]) -> None:
+    """
+    Сохраняет использованные при загрузке курсы в таблицу 'currency_rates'.
+
+    :param rates: Коэффициенты пересчёта в базовую валюту.
+    """
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.executemany("INSERT INTO currency_rates (currency, rate) VALUES (%s, %s) ON CONFLICT (currency) "
+                            "DO UPDATE SET rate = EXCLUDED.rate, updated_at = now();", list(rates.items()))
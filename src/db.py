@@ -0,0 +1,173 @@
+import configparser
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+from psycopg2.extensions import connection as Connection, cursor as Cursor
+from psycopg2.pool import ThreadedConnectionPool
+
+from src import metrics
+
+
+SETTINGS_FILE = "settings.ini"
+POOL_MAXCONN = 10
+
+_pool = None
+_pool_lock = threading.Lock()
+_local = threading.local()
+
+
+class InstrumentedCursor(Cursor):
+    """
+    Курсор, учитывающий обращения к серверу (execute, executemany, copy_expert) и их длительность в метриках
+    hh_db_round_trips_total и hh_db_query_seconds с метками стадии (см. src.metrics.stage) и типа команды.
+    При выключенном сборе метрик ведёт себя как обычный курсор.
+    """
+
+    @staticmethod
+    def _operation(query) -> str:
+        text = query.decode(errors="replace") if isinstance(query, bytes) else str(query)
+        words = text.split(None, 1)
+
+        return words[0].upper() if words else "EMPTY"
+
+    def execute(self, query, vars=None):
+        if not metrics.is_enabled():
+            return super().execute(query, vars)
+
+        labels = {"stage": metrics.current_stage(), "operation": self._operation(query)}
+        metrics.inc("hh_db_round_trips_total", **labels)
+
+        with metrics.timer("hh_db_query_seconds", **labels):
+            return super().execute(query, vars)
+
+    def executemany(self, query, vars_list):
+        if not metrics.is_enabled():
+            return super().executemany(query, vars_list)
+
+        vars_list = list(vars_list)
+        labels = {"stage": metrics.current_stage(), "operation": self._operation(query)}
+        metrics.inc("hh_db_round_trips_total", len(vars_list), **labels)
+
+        with metrics.timer("hh_db_query_seconds", **labels):
+            return super().executemany(query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        if not metrics.is_enabled():
+            return super().copy_expert(sql, file, size)
+
+        labels = {"stage": metrics.current_stage(), "operation": "COPY"}
+        metrics.inc("hh_db_round_trips_total", **labels)
+
+        with metrics.timer("hh_db_query_seconds", **labels):
+            return super().copy_expert(sql, file, size)
+
+
+@lru_cache(maxsize=None)
+def get_config(path: str = SETTINGS_FILE) -> configparser.ConfigParser:
+    """
+    Читает файл настроек один раз и кэширует результат.
+
+    :param path: Путь к файлу настроек.
+    :return: Разобранный файл настроек.
+    """
+
+    config = configparser.ConfigParser()
+    config.read(path)
+
+    return config
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """
+    Возвращает общий для всего приложения пул подключений, создавая его при первом обращении.
+
+    Параметры подключения берутся из секции 'Open_db' файла 'settings.ini', размер пула - из секции 'Pool'.
+    Курсоры подключений учитывают обращения к серверу в метриках (см. InstrumentedCursor).
+
+    :return: Пул подключений к базе данных.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            config = get_config()
+
+            _pool = ThreadedConnectionPool(
+                config.getint("Pool", "minconn", fallback=1),
+                config.getint("Pool", "maxconn", fallback=POOL_MAXCONN),
+                host=config.get("Open_db", "host"),
+                database=config.get("Open_db", "database"),
+                user=config.get("Open_db", "user"),
+                password=config.get("Open_db", "password"),
+                cursor_factory=InstrumentedCursor
+            )
+
+    return _pool
+
+
+def close_pool() -> None:
+    """
+    Закрывает все подключения пула.
+    """
+
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+@contextmanager
+def connection() -> Iterator[Connection]:
+    """
+    Выдаёт подключение из пула на время блока with.
+
+    Если в текущем потоке открыта транзакция transaction(), возвращается её подключение, и фиксация откладывается
+    до конца транзакции. Иначе изменения фиксируются при выходе из блока (или откатываются при ошибке), а подключение
+    возвращается в пул.
+    """
+
+    conn = getattr(_local, "conn", None)
+
+    if conn is not None:
+        yield conn
+
+        return
+
+    pool = get_pool()
+    conn = pool.getconn()
+
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
+
+
+@contextmanager
+def transaction() -> Iterator[Connection]:
+    """
+    Объединяет все обращения к базе данных внутри блока with в одну транзакцию.
+
+    Все функции, использующие connection(), в том же потоке работают через одно подключение. Изменения фиксируются
+    одним COMMIT при выходе из блока, поэтому читатели не видят промежуточных состояний (например, пустых таблиц между
+    очисткой и загрузкой).
+    """
+
+    if getattr(_local, "conn", None) is not None:
+        raise RuntimeError("Транзакция уже открыта в текущем потоке")
+
+    pool = get_pool()
+    conn = pool.getconn()
+    _local.conn = conn
+
+    try:
+        with conn:
+            yield conn
+    finally:
+        _local.conn = None
+        pool.putconn(conn)
@@ -1,7 +1,33 @@
+import re
 from decimal import Decimal
+from itertools import count
+from typing import Iterator
 
-import psycopg2
-import configparser
+from src import metrics
+from src.db import get_pool
+
+
+ITERSIZE = 2000
+PAGE_SIZE = 100
+
+COMPANIES_COUNT_QUERY = "SELECT company_name, vacancies_count FROM company_vacancy_counts"
+ALL_VACANCIES_QUERY = ("SELECT companies.company_name, vacancies.vacancy_name, vacancies.salary_min, "
+                       "vacancies.salary_max, vacancies.currency, vacancies.url FROM vacancies JOIN companies "
+                       "ON vacancies.company_id = companies.company_id")
+VACANCIES_PAGE_QUERY = ("SELECT vacancies.id, companies.company_name, vacancies.vacancy_name, vacancies.salary_min, "
+                        "vacancies.salary_max, vacancies.currency, vacancies.url FROM vacancies JOIN companies "
+                        "ON vacancies.company_id = companies.company_id WHERE vacancies.id > %s "
+                        "ORDER BY vacancies.id LIMIT %s")
+HIGHER_SALARY_QUERY = ("SELECT vacancy_name, salary_mid AS average_salary FROM vacancies "
+                       "WHERE salary_mid > (SELECT avg_salary FROM salary_stats WHERE is_total)")
+HIGHER_SALARY_PAGE_QUERY = ("SELECT id, vacancy_name, salary_mid AS average_salary FROM vacancies "
+                            "WHERE salary_mid > (SELECT avg_salary FROM salary_stats WHERE is_total) "
+                            "AND id > %(after_id)s ORDER BY id LIMIT %(limit)s")
+KEYWORD_QUERY = ("SELECT vacancy_name, url FROM vacancies, to_tsquery('russian', %(query)s) AS query "
+                 "WHERE vacancy_name_tsv @@ query ORDER BY ts_rank(vacancy_name_tsv, query) DESC, id "
+                 "LIMIT %(limit)s OFFSET %(offset)s")
+
+_cursor_names = count()
 
 
 class DBManager:
@@ -10,93 +36,162 @@ class DBManager:
     информации о компаниях, вакансиях, а также для выполнения специфических запросов.
     """
 
-    __slots__= ['conn']
+    __slots__= ['conn', 'itersize']
+
+    def __init__(self, itersize: int = ITERSIZE) -> None:
+        """
+        Берёт подключение к базе данных из общего пула (см. src.db.get_pool).
+
+        Параметры:
+            itersize (int): Количество строк, получаемых с сервера за одно обращение в методах iter_*.
+        """
+
+        self.conn = get_pool().getconn()
+        self.itersize = itersize
 
-    def __init__(self) -> None:
+    def _iter_query(self, query: str, params: tuple | dict | None = None) -> Iterator[tuple]:
         """
-        Инициализирует подключение к базе данных с помощью учетных данных указанных в settings.ini.
+        Выполняет запрос через именованный (серверный) курсор и выдаёт строки по одной.
+
+        Строки передаются с сервера пачками по itersize, поэтому потребление памяти не зависит от размера результата.
+
+        Параметры:
+            query (str): Текст запроса.
+            params (tuple | dict | None): Параметры запроса.
+
+        Returns:
+            Iterator[tuple]: Итератор по строкам результата.
         """
 
-        config = configparser.ConfigParser()
-        config.read("settings.ini")
+        cur = self.conn.cursor(name=f"dbmanager_cursor_{next(_cursor_names)}")
+        cur.itersize = self.itersize
 
-        self.conn = psycopg2.connect(
-            host=config.get("Open_db", "host"),
-            database=config.get("Open_db", "database"),
-            user=config.get("Open_db", "user"),
-            password=config.get("Open_db", "password")
-        )
+        try:
+            cur.execute(query, params)
 
+            yield from cur
+        finally:
+            cur.close()
+
+    @metrics.timed("hh_dbmanager_query_seconds")
     def get_companies_and_vacancies_count(self) -> list[tuple]:
         """
-        Подсчитывает количество вакансий для каждой компании.
+        Возвращает количество вакансий для каждой компании.
+
+        Значения берутся из материализованного представления company_vacancy_counts, пересчитываемого при загрузке,
+        поэтому запрос не сканирует таблицу 'vacancies'.
 
         Returns:
             list of tuple: Список кортежей, где каждый кортеж содержит название компании и количество вакансий.
         """
 
         cur = self.conn.cursor()
-
-        query = ("SELECT companies.company_name, COUNT(vacancies.id) FROM companies JOIN vacancies "
-                 "ON companies.company_id = vacancies.company_id GROUP BY companies.company_name")
-        cur.execute(query)
+        cur.execute(COMPANIES_COUNT_QUERY)
 
         results = cur.fetchall()
         cur.close()
 
         return results
 
+    def iter_companies_and_vacancies_count(self) -> Iterator[tuple]:
+        """
+        Потоково выдаёт количество вакансий для каждой компании через серверный курсор.
+
+        Returns:
+            Iterator[tuple]: Итератор по кортежам (название компании, количество вакансий).
+        """
+
+        return self._iter_query(COMPANIES_COUNT_QUERY)
+
+    @metrics.timed("hh_dbmanager_query_seconds")
     def get_all_vacancies(self) -> list[tuple]:
         """
         Получает список всех вакансий с их основной информацией.
 
+        Для больших таблиц используйте iter_all_vacancies или get_vacancies_page.
+
         Returns:
             list of tuple: Список кортежей, содержащий информацию о каждой вакансии.
         """
 
         cur = self.conn.cursor()
+        cur.execute(ALL_VACANCIES_QUERY)
 
-        query = ("SELECT companies.company_name, vacancies.vacancy_name, vacancies.salary_min, vacancies.salary_max, "
-                 "vacancies.currency, vacancies.url FROM vacancies JOIN companies "
-                 "ON vacancies.company_id = companies.company_id")
-        cur.execute(query)
+        vacancies = cur.fetchall()
+        cur.close()
+
+        return vacancies
+
+    def iter_all_vacancies(self) -> Iterator[tuple]:
+        """
+        Потоково выдаёт все вакансии (те же поля, что и get_all_vacancies) через серверный курсор.
+
+        Returns:
+            Iterator[tuple]: Итератор по кортежам с информацией о вакансиях.
+        """
+
+        return self._iter_query(ALL_VACANCIES_QUERY)
+
+    @metrics.timed("hh_dbmanager_query_seconds")
+    def get_vacancies_page(self, limit: int = PAGE_SIZE, after_id: int = 0) -> list[tuple]:
+        """
+        Получает страницу вакансий с постраничной навигацией по ключу (keyset pagination).
+
+        Вакансии упорядочены по id; для получения следующей страницы передайте в after_id id последней вакансии
+        текущей страницы. В отличие от OFFSET, стоимость запроса не растёт с номером страницы.
+
+        Параметры:
+            limit (int): Количество вакансий на странице.
+            after_id (int): id вакансии, после которой начинается страница.
+
+        Returns:
+            list of tuple: Список кортежей (id, название компании, название вакансии, salary_min, salary_max, валюта,
+            URL).
+        """
+
+        cur = self.conn.cursor()
+        cur.execute(VACANCIES_PAGE_QUERY, (after_id, limit))
 
         vacancies = cur.fetchall()
         cur.close()
 
         return vacancies
 
+    @metrics.timed("hh_dbmanager_query_seconds")
     def get_avg_salary(self) -> 'Decimal':
         """
-        Рассчитывает среднюю заработную плату по всем вакансиям.
+        Возвращает среднюю заработную плату по всем вакансиям из материализованного представления salary_stats.
+
+        Зарплаты в разных валютах предварительно пересчитаны в базовую валюту (см. src.currency), вакансии без
+        указанной зарплаты не учитываются.
 
         Returns:
-            Decimal: Средняя заработная плата.
+            Decimal: Средняя заработная плата в базовой валюте.
         """
 
         cur = self.conn.cursor()
 
-        query = ("SELECT AVG((salary_min + salary_max) / 2) FROM vacancies WHERE salary_min IS NOT NULL "
-                 "AND salary_max IS NOT NULL")
+        query = "SELECT avg_salary FROM salary_stats WHERE is_total"
         cur.execute(query)
-        avg_salary = cur.fetchone()[0]
+        row = cur.fetchone()
         cur.close()
 
-        return avg_salary
+        return row[0] if row is not None else None
 
-    def get_vacancies_with_higher_salary(self) -> list[tuple]:
+    @metrics.timed("hh_dbmanager_query_seconds")
+    def get_salary_statistics(self) -> list[tuple]:
         """
-        Получает список вакансий с зарплатой выше средней.
+        Возвращает статистику зарплат по каждой валюте и в целом.
 
         Returns:
-            list of tuple: Список кортежей, содержащий название вакансии и среднюю зарплату.
+            list of tuple: Список кортежей (валюта, количество вакансий, средняя зарплата, 25-й перцентиль, медиана,
+            75-й перцентиль, 90-й перцентиль). Суммы указаны в базовой валюте, для итоговой строки валюта равна None.
         """
 
-        avg_salary = self.get_avg_salary()
         cur = self.conn.cursor()
 
-        query = (f"SELECT vacancy_name, (salary_min + salary_max) / 2 as average_salary FROM vacancies "
-                 f"WHERE (salary_min + salary_max) / 2 > {avg_salary}")
+        query = ("SELECT currency, vacancies_count, avg_salary, p25, median, p75, p90 FROM salary_stats "
+                 "ORDER BY is_total, vacancies_count DESC")
         cur.execute(query)
 
         results = cur.fetchall()
@@ -104,30 +199,112 @@ class DBManager:
 
         return results
 
-    def get_vacancies_with_keyword(self, keyword: str) -> list:
+    @metrics.timed("hh_dbmanager_query_seconds")
+    def get_vacancies_with_higher_salary(self, limit: int | None = None, after_id: int = 0) -> list[tuple]:
         """
-        Ищет вакансии, содержащие заданное ключевое слово в названии.
+        Получает страницу вакансий с зарплатой выше средней с постраничной навигацией по ключу.
+
+        Выполняется одним запросом: средняя зарплата берётся из salary_stats, а отбор идёт по сохранённой середине
+        вилки salary_mid. Вакансии упорядочены по id; для получения следующей страницы передайте в after_id id
+        последней вакансии текущей страницы, как в get_vacancies_page.
 
         Параметры:
-            keyword (str): Ключевое слово для поиска в названиях вакансий.
+            limit (int | None): Максимальное количество результатов (None - без ограничения).
+            after_id (int): id вакансии, после которой начинается страница.
 
         Returns:
-            list of tuple: Список кортежей, содержащий название вакансии и URL.
+            list of tuple: Список кортежей (id, название вакансии, средняя зарплата).
         """
 
         cur = self.conn.cursor()
+        cur.execute(HIGHER_SALARY_PAGE_QUERY, {'limit': limit, 'after_id': after_id})
 
-        query = f"SELECT vacancy_name, url FROM vacancies WHERE vacancy_name ILIKE \'%{keyword}%\'"
-        cur.execute(query)
+        results = cur.fetchall()
+        cur.close()
+
+        return results
+
+    def iter_vacancies_with_higher_salary(self) -> Iterator[tuple]:
+        """
+        Потоково выдаёт вакансии с зарплатой выше средней через серверный курсор.
+
+        Returns:
+            Iterator[tuple]: Итератор по кортежам (название вакансии, средняя зарплата).
+        """
+
+        return self._iter_query(HIGHER_SALARY_QUERY)
+
+    @metrics.timed("hh_dbmanager_query_seconds")
+    def get_vacancies_with_keyword(self, keyword: str, limit: int | None = None, offset: int = 0) -> list:
+        """
+        Ищет вакансии, содержащие заданные слова в названии.
+
+        Поиск выполняется по полнотекстовому индексу названия: каждое слово строки поиска должно встречаться
+        в названии (в том числе как начало слова, например 'разраб' найдёт 'разработчик'). Результаты упорядочены
+        по релевантности.
+
+        Параметры:
+            keyword (str): Строка поиска из одного или нескольких слов.
+            limit (int | None): Максимальное количество результатов (None - без ограничения).
+            offset (int): Количество пропускаемых результатов (для постраничного вывода).
+
+        Returns:
+            list of tuple: Список кортежей, содержащий название вакансии и URL.
+        """
+
+        tsquery = self._build_tsquery(keyword)
+
+        if tsquery is None:
+            return []
+
+        cur = self.conn.cursor()
+        cur.execute(KEYWORD_QUERY, {'query': tsquery, 'limit': limit, 'offset': offset})
 
         results = cur.fetchall()
         cur.close()
 
         return results
 
+    def iter_vacancies_with_keyword(self, keyword: str) -> Iterator[tuple]:
+        """
+        Потоково выдаёт все вакансии, найденные по строке поиска (см. get_vacancies_with_keyword).
+
+        Параметры:
+            keyword (str): Строка поиска из одного или нескольких слов.
+
+        Returns:
+            Iterator[tuple]: Итератор по кортежам (название вакансии, URL).
+        """
+
+        tsquery = self._build_tsquery(keyword)
+
+        if tsquery is None:
+            return iter(())
+
+        return self._iter_query(KEYWORD_QUERY, {'query': tsquery, 'limit': None, 'offset': 0})
+
+    @staticmethod
+    def _build_tsquery(keyword: str) -> str | None:
+        """
+        Строит полнотекстовый запрос из слов строки поиска: все слова обязательны и ищутся по префиксу.
+
+        Параметры:
+            keyword (str): Строка поиска.
+
+        Returns:
+            str | None: Запрос для to_tsquery или None, если в строке нет слов.
+        """
+
+        words = re.findall(r"\w+", keyword)
+
+        if not words:
+            return None
+
+        return " & ".join(f"{word}:*" for word in words)
+
     def release_db(self) -> None:
         """
-        Закрывает подключение к базе данных.
+        Возвращает подключение к базе данных в общий пул.
         """
 
-        self.conn.close()
+        get_pool().putconn(self.conn)
@@ -0,0 +1,344 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
+from src.cache import CacheMissError, ResponseCache, cached_get, revalidate
+from src.client import HHAPIError, HHClient
+
+
+BASE_URL = "https://api.hh.ru/"
+MAX_CONCURRENCY = 10
+REQUESTS_PER_SECOND = 10.0
+PER_PAGE = 100
+MAX_RESULTS = 2000
+
+
+class TruncatedResultsError(HHAPIError):
+    """
+    API вернул не все найденные элементы: выдача /vacancies ограничена MAX_RESULTS элементами на запрос.
+    """
+
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов по алгоритму "token bucket".
+
+    Бакет пополняется со скоростью rate токенов в секунду и вмещает не более capacity токенов. Каждый запрос забирает
+    один токен; если токенов нет, корутина (acquire) или поток (wait) засыпает до момента появления следующего.
+    """
+
+    __slots__ = ['rate', 'capacity', 'tokens', 'updated_at', 'lock']
+
+    def __init__(self, rate: float, capacity: int | None = None) -> None:
+        """
+        :param rate: Количество запросов в секунду.
+        :param capacity: Максимальный размер всплеска запросов (по умолчанию равен rate, но не меньше 1).
+        """
+
+        if rate <= 0:
+            raise ValueError("rate должен быть положительным")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """
+        Пополняет бакет пропорционально времени, прошедшему с последнего обновления.
+        """
+
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _take(self) -> float:
+        """
+        Забирает токен, если он есть.
+
+        :return: 0, если токен получен, иначе время в секундах до появления следующего токена.
+        """
+
+        with self.lock:
+            self._refill()
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+
+                return 0.0
+
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> None:
+        """
+        Ожидает появления свободного токена и забирает его (для корутин).
+        """
+
+        while delay := self._take():
+            await asyncio.sleep(delay)
+
+    def wait(self) -> None:
+        """
+        Ожидает появления свободного токена и забирает его (для потоков).
+        """
+
+        while delay := self._take():
+            time.sleep(delay)
+
+
+async def _get_json(url: str, params: dict | None, semaphore: asyncio.Semaphore, limiter: RateLimiter,
+                    cache: ResponseCache | None = None, client: HHClient | None = None) -> dict:
+    """
+    Выполняет GET-запрос в отдельном потоке с учётом ограничений параллельности и частоты запросов.
+
+    Свежие ответы из кэша возвращаются сразу, не расходуя лимит запросов.
+
+    :param url: Адрес запроса.
+    :param params: Параметры строки запроса.
+    :param semaphore: Семафор, ограничивающий число одновременных запросов.
+    :param limiter: Ограничитель частоты запросов.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :return: Тело ответа, разобранное из JSON.
+    """
+
+    if cache is None:
+        async with semaphore:
+            await limiter.acquire()
+
+            return await asyncio.to_thread(cached_get, url, params, None, client)
+
+    cached, entry = await asyncio.to_thread(cache.lookup, url, params)
+
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        await limiter.acquire()
+
+        return await asyncio.to_thread(revalidate, url, params, cache, client, entry)
+
+
+def get_json(url: str, params: dict | None, limiter: RateLimiter, cache: ResponseCache | None = None,
+             client: HHClient | None = None) -> dict:
+    """
+    Выполняет GET-запрос в текущем потоке с учётом ограничения частоты запросов (синхронный вариант _get_json).
+
+    Свежие ответы из кэша возвращаются сразу, не расходуя лимит запросов.
+
+    :param url: Адрес запроса.
+    :param params: Параметры строки запроса.
+    :param limiter: Ограничитель частоты запросов.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :return: Тело ответа, разобранное из JSON.
+    """
+
+    if cache is None:
+        limiter.wait()
+
+        return cached_get(url, params, None, client)
+
+    cached, entry = cache.lookup(url, params)
+
+    if cached is not None:
+        return cached
+
+    limiter.wait()
+
+    return revalidate(url, params, cache, client, entry)
+
+
+def iter_pages(url: str, params: dict | None, per_page: int, request: Callable[[str, dict], dict]) -> Iterator[dict]:
+    """
+    Генератор, последовательно выдающий страницы постраничного ответа API, следуя полям 'page' и 'pages'.
+
+    Следующая страница запрашивается только после того, как вызывающий код обработал текущую.
+
+    :param url: Адрес запроса.
+    :param params: Параметры строки запроса без 'page' и 'per_page'.
+    :param per_page: Количество элементов на странице.
+    :param request: Функция запроса request(url, params) -> разобранный JSON.
+    :return: Итератор по ответам для страниц.
+    """
+
+    page, pages = 0, 1
+
+    while page < pages:
+        page_data = request(url, {**(params or {}), "per_page": per_page, "page": page})
+
+        yield page_data
+
+        page, pages = page + 1, page_data.get("pages", 1)
+
+
+async def fetch_company(company_id: int, semaphore: asyncio.Semaphore, limiter: RateLimiter,
+                        base_url: str = BASE_URL, cache: ResponseCache | None = None,
+                        client: HHClient | None = None) -> tuple[dict, dict]:
+    """
+    Параллельно запрашивает вакансии и описание работодателя.
+
+    Сначала параллельно запрашиваются первая страница вакансий и описание работодателя, затем - остальные страницы
+    вакансий; их элементы добавляются в 'items' ответа первой страницы.
+
+    :param company_id: Идентификатор компании.
+    :param semaphore: Семафор, ограничивающий число одновременных запросов.
+    :param limiter: Ограничитель частоты запросов.
+    :param base_url: Базовый адрес API.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :return: Кортеж (ответ /vacancies со всеми вакансиями компании, ответ /employers/{id}).
+    """
+
+    url = f"{base_url}vacancies"
+    params = {'employer_id': company_id, "per_page": PER_PAGE}
+
+    vacancies, employer = await asyncio.gather(
+        _get_json(url, params, semaphore, limiter, cache, client),
+        _get_json(f"{base_url}employers/{company_id}", None, semaphore, limiter, cache, client)
+    )
+
+    pages = await asyncio.gather(*(_get_json(url, {**params, "page": page}, semaphore, limiter, cache, client)
+                                   for page in range(1, vacancies.get('pages', 1))))
+
+    for page_data in pages:
+        vacancies.setdefault('items', []).extend(page_data.get('items', []))
+
+    return vacancies, employer
+
+
+async def fetch_companies(company_ids: list, base_url: str = BASE_URL, max_concurrency: int = MAX_CONCURRENCY,
+                          requests_per_second: float = REQUESTS_PER_SECOND, cache: ResponseCache | None = None,
+                          client: HHClient | None = None, failures: dict | None = None) -> dict:
+    """
+    Загружает данные по всем компаниям конкурентно.
+
+    Число одновременных запросов ограничено max_concurrency, а общая частота запросов - requests_per_second.
+    Если передан словарь failures, ошибки загрузки отдельных компаний (HHAPIError, CacheMissError) записываются
+    в него, а сами компании не попадают в результат; иначе первая ошибка прерывает загрузку.
+
+    :param company_ids: Список идентификаторов компаний.
+    :param base_url: Базовый адрес API.
+    :param max_concurrency: Максимальное число одновременных HTTP-запросов.
+    :param requests_per_second: Максимальная частота запросов к API.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :param failures: Словарь для отчёта об ошибках {идентификатор компании: исключение} или None.
+    :return: Словарь, где ключ - идентификатор компании, значение - кортеж (вакансии, работодатель).
+    """
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limiter = RateLimiter(requests_per_second)
+
+    results = await asyncio.gather(
+        *(fetch_company(company_id, semaphore, limiter, base_url, cache, client) for company_id in company_ids),
+        return_exceptions=failures is not None
+    )
+    fetched = {}
+
+    for company_id, result in zip(company_ids, results):
+        if isinstance(result, (HHAPIError, CacheMissError)):
+            failures[company_id] = result
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            fetched[company_id] = result
+
+    return fetched
+
+
+def fetch_vacancies_page(company_id: int, page: int, base_url: str = BASE_URL, per_page: int = PER_PAGE,
+                         cache: ResponseCache | None = None, client: HHClient | None = None) -> dict:
+    """
+    Запрашивает одну страницу вакансий компании.
+
+    :param company_id: Идентификатор компании.
+    :param page: Номер страницы (с нуля).
+    :param base_url: Базовый адрес API.
+    :param per_page: Количество вакансий на странице.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :return: Ответ /vacancies с ключами 'items', 'page' и 'pages'.
+    """
+
+    params = {'employer_id': company_id, "per_page": per_page, "page": page}
+
+    return cached_get(f"{base_url}vacancies", params, cache, client)
+
+
+def iter_vacancies(company_id: int, base_url: str = BASE_URL, per_page: int = PER_PAGE,
+                   first_page: dict | None = None, cache: ResponseCache | None = None,
+                   client: HHClient | None = None) -> Iterator[dict]:
+    """
+    Генератор, последовательно выдающий все вакансии компании постранично.
+
+    Генератор следует полям 'page' и 'pages' ответа /vacancies. Пока вызывающий код обрабатывает вакансии текущей
+    страницы (например, вставляет их в базу данных), следующая страница уже загружается в фоновом потоке. В памяти
+    одновременно находится не более двух страниц, независимо от количества вакансий у работодателя.
+
+    :param company_id: Идентификатор компании.
+    :param base_url: Базовый адрес API.
+    :param per_page: Количество вакансий на странице.
+    :param first_page: Уже полученный ответ для первой страницы (например, из fetch_vacancies_page), чтобы не
+        запрашивать её повторно.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :return: Итератор по словарям вакансий.
+    """
+
+    executor = ThreadPoolExecutor(max_workers=1)
+
+    try:
+        if first_page is None:
+            first_page = fetch_vacancies_page(company_id, 0, base_url, per_page, cache, client)
+
+        page_data = first_page
+
+        while True:
+            next_page = page_data.get('page', 0) + 1
+            future = None
+
+            if next_page < page_data.get('pages', 1):
+                future = executor.submit(fetch_vacancies_page, company_id, next_page, base_url, per_page, cache,
+                                         client)
+
+            yield from page_data.get('items', [])
+
+            if future is None:
+                return
+
+            page_data = future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_employer_ids(params: dict | None = None, base_url: str = BASE_URL, per_page: int = PER_PAGE,
+                      cache: ResponseCache | None = None, client: HHClient | None = None,
+                      limiter: RateLimiter | None = None) -> Iterator[int]:
+    """
+    Генератор, лениво выдающий идентификаторы работодателей из поиска /employers постранично.
+
+    Следующая страница запрашивается только после того, как вызывающий код обработал все идентификаторы текущей,
+    поэтому поиск с тысячами работодателей не загружается в память целиком.
+
+    :param params: Параметры поиска (например, {'text': 'банк', 'area': 1, 'only_with_vacancies': 'true'}).
+    :param base_url: Базовый адрес API.
+    :param per_page: Количество работодателей на странице.
+    :param cache: Кэш ответов или None.
+    :param client: HTTP-клиент или None для общего клиента.
+    :param limiter: Ограничитель частоты запросов (например, общий с загрузкой компаний) или None.
+    :return: Итератор по идентификаторам работодателей.
+    """
+
+    def request(url: str, page_params: dict) -> dict:
+        if limiter is None:
+            return cached_get(url, page_params, cache, client)
+
+        return get_json(url, page_params, limiter, cache, client)
+
+    for page_data in iter_pages(f"{base_url}employers", params, per_page, request):
+        for item in page_data.get("items", []):
+            yield int(item["id"])
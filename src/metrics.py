@@ -0,0 +1,395 @@
+import cProfile
+import functools
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, TextIO
+
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DEFAULT_STAGE = "main"
+MEMORY_TOP = 20
+# С Python 3.12 cProfile работает через sys.monitoring и видит события всех потоков, но активным может быть только
+# один профилировщик; в более ранних версиях он учитывает лишь поток, в котором включён.
+PROFILER_SEES_ALL_THREADS = sys.version_info >= (3, 12)
+
+DESCRIPTIONS = {
+    "hh_http_request_seconds": "Длительность одной попытки HTTP-запроса к API hh.ru.",
+    "hh_http_responses_total": "Ответы API hh.ru по кодам ответа.",
+    "hh_http_response_bytes_total": "Объём тел ответов API hh.ru в байтах.",
+    "hh_http_retries_total": "Повторы HTTP-запросов по причинам.",
+    "hh_http_circuit_open_total": "Запросы, отклонённые разомкнутым автоматом размыкания.",
+    "hh_json_decode_seconds": "Разбор JSON ответов API.",
+    "hh_cache_requests_total": "Обращения к кэшу ответов по результатам.",
+    "hh_function_seconds": "Длительность вызова инструментированных функций.",
+    "hh_db_round_trips_total": "Обращения к серверу базы данных по стадиям и типам команд.",
+    "hh_db_query_seconds": "Длительность команд базы данных по стадиям и типам команд.",
+    "hh_db_rows_total": "Строки, записанные в базу данных.",
+    "hh_db_copy_bytes_total": "Объём данных, переданных командой COPY, в байтах.",
+    "hh_dbmanager_query_seconds": "Длительность методов DBManager.",
+    "hh_pipeline_stage_seconds": "Время обработки одного сообщения стадией конвейера.",
+    "hh_pipeline_company_seconds": "Время загрузки компании из API.",
+    "hh_pipeline_rows_total": "Вакансии, прошедшие стадию конвейера, по компаниям.",
+    "hh_pipeline_failures_total": "Компании, которые не удалось загрузить.",
+    "hh_pipeline_circuit_waits_total": "Ожидания конвейером пробной попытки при разомкнутом автомате размыкания.",
+    "hh_api_request_seconds": "Длительность обработки запросов к HTTP API по эндпоинтам.",
+    "hh_api_responses_total": "Ответы HTTP API по эндпоинтам и кодам ответа.",
+}
+
+_enabled = False
+_lock = threading.Lock()
+_local = threading.local()
+_counters = {}
+_histograms = {}
+
+
+def enable() -> None:
+    """
+    Включает сбор метрик. По умолчанию сбор выключен, и инструментированный код выполняет лишь проверку флага.
+    """
+
+    global _enabled
+
+    _enabled = True
+
+
+def disable() -> None:
+    """
+    Выключает сбор метрик (накопленные значения сохраняются).
+    """
+
+    global _enabled
+
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """
+    Включён ли сбор метрик.
+    """
+
+    return _enabled
+
+
+def reset() -> None:
+    """
+    Удаляет все накопленные значения.
+    """
+
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name: str, value: float = 1, /, **labels) -> None:
+    """
+    Увеличивает счётчик.
+
+    :param name: Имя метрики.
+    :param value: Приращение.
+    :param labels: Метки (например, stage='fetch', company=1).
+    """
+
+    if not _enabled:
+        return
+
+    key = _key(name, labels)
+
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, /, **labels) -> None:
+    """
+    Добавляет наблюдение в гистограмму.
+
+    :param name: Имя метрики.
+    :param value: Наблюдаемое значение (для задержек - в секундах).
+    :param labels: Метки.
+    """
+
+    if not _enabled:
+        return
+
+    key = _key(name, labels)
+
+    with _lock:
+        histogram = _histograms.get(key)
+
+        if histogram is None:
+            histogram = _histograms[key] = [[0] * len(BUCKETS), 0.0, 0]
+
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                histogram[0][index] += 1
+
+        histogram[1] += value
+        histogram[2] += 1
+
+
+class _Timer:
+    """
+    Контекстный менеджер, записывающий время выполнения блока в гистограмму.
+    """
+
+    __slots__ = ['name', 'labels', 'start']
+
+    def __init__(self, name: str, labels: dict) -> None:
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+_NULL_TIMER = nullcontext()
+
+
+def timer(name: str, /, **labels):
+    """
+    Возвращает контекстный менеджер, измеряющий время выполнения блока.
+
+    При выключенном сборе возвращается общий пустой контекстный менеджер.
+
+    :param name: Имя гистограммы.
+    :param labels: Метки.
+    """
+
+    if not _enabled:
+        return _NULL_TIMER
+
+    return _Timer(name, labels)
+
+
+def timed(name: str = "hh_function_seconds", **labels) -> Callable:
+    """
+    Декоратор, измеряющий время вызова функции; имя функции добавляется в метку 'function'.
+
+    :param name: Имя гистограммы.
+    :param labels: Дополнительные метки.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func_labels = {"function": func.__name__, **labels}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+
+            with _Timer(name, func_labels):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Задаёт стадию текущего потока; она используется как метка обращений к базе данных (см. current_stage).
+
+    :param name: Название стадии.
+    """
+
+    previous = getattr(_local, "stage", DEFAULT_STAGE)
+    _local.stage = name
+
+    try:
+        yield
+    finally:
+        _local.stage = previous
+
+
+def current_stage() -> str:
+    """
+    Возвращает стадию текущего потока.
+    """
+
+    return getattr(_local, "stage", DEFAULT_STAGE)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def render() -> str:
+    """
+    Формирует текущие значения метрик в текстовом формате Prometheus.
+
+    :return: Текст в формате exposition format 0.0.4.
+    """
+
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, (list(value[0]), value[1], value[2])) for key, value in _histograms.items())
+
+    lines = []
+    described = set()
+
+    def header(name: str, kind: str) -> None:
+        if name in described:
+            return
+
+        described.add(name)
+
+        if name in DESCRIPTIONS:
+            lines.append(f"# HELP {name} {DESCRIPTIONS[name]}")
+
+        lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), value in counters:
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+    for (name, labels), (buckets, total, count) in histograms:
+        header(name, "histogram")
+
+        for bound, bucket in zip(BUCKETS, buckets):
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {bucket}")
+
+        lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {total:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def dump(path: str) -> None:
+    """
+    Сохраняет метрики в файл в текстовом формате Prometheus (например, для node_exporter textfile collector).
+
+    :param path: Путь к файлу.
+    """
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(render())
+
+
+def serve(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Запускает в фоновом потоке HTTP-сервер, отдающий метрики по адресу /metrics.
+
+    :param port: Порт (0 - любой свободный).
+    :param host: Адрес, на котором принимаются соединения.
+    :return: Сервер; для остановки вызовите shutdown().
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+
+                return
+
+            payload = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    return server
+
+
+@contextmanager
+def profiling(profile_path: str | None = None, trace_memory: bool = False, stream: TextIO | None = None,
+              memory_top: int = MEMORY_TOP) -> Iterator[None]:
+    """
+    Профилирует выполнение блока по запросу.
+
+    С Python 3.12 один профилировщик учитывает все потоки (см. PROFILER_SEES_ALL_THREADS). В более ранних версиях
+    cProfile учитывает только поток, в котором включён, поэтому для каждого потока, запущенного внутри блока (стадии
+    конвейера, пулы потоков), через threading.setprofile включается собственный профилировщик, а по завершении блока
+    статистика всех потоков объединяется в один файл; потоки, запущенные до начала блока, там не профилируются.
+
+    :param profile_path: Файл для статистики cProfile (формат pstats) или None, чтобы не профилировать процессор.
+    :param trace_memory: Отслеживать выделения памяти через tracemalloc и вывести строки кода с наибольшим объёмом.
+    :param stream: Поток для отчёта о памяти (по умолчанию sys.stderr).
+    :param memory_top: Количество строк в отчёте о памяти.
+    """
+
+    profiler = cProfile.Profile() if profile_path else None
+    thread_profilers = []
+    lock = threading.Lock()
+    previous_hook = threading.getprofile()
+
+    def profile_thread(*_) -> None:
+        # Вызывается при первом событии нового потока; включённый профилировщик потока заменяет этот хук.
+        thread_profiler = cProfile.Profile()
+
+        with lock:
+            thread_profilers.append(thread_profiler)
+
+        thread_profiler.enable()
+
+    if trace_memory:
+        tracemalloc.start()
+
+    if profiler is not None:
+        # Второй профилировщик на 3.12+ не включится (ValueError), и поток завершится, не начав работу.
+        if not PROFILER_SEES_ALL_THREADS:
+            threading.setprofile(profile_thread)
+
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+            if not PROFILER_SEES_ALL_THREADS:
+                threading.setprofile(previous_hook)
+
+            stats = pstats.Stats(profiler)
+
+            with lock:
+                for thread_profiler in thread_profilers:
+                    thread_profiler.create_stats()
+
+                    if thread_profiler.stats:
+                        stats.add(thread_profiler)
+
+            stats.dump_stats(profile_path)
+
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            stream = stream or sys.stderr
+
+            print(f"Память: текущая {current / 2 ** 20:.1f} МиБ, пиковая {peak / 2 ** 20:.1f} МиБ", file=stream)
+
+            for statistic in snapshot.statistics("lineno")[:memory_top]:
+                print(statistic, file=stream)
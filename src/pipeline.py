@@ -0,0 +1,361 @@
+import queue
+import threading
+from collections import Counter
+from typing import Iterable
+
+from src import metrics
+from src.cache import CacheMissError, ResponseCache
+from src.client import CircuitOpenError, HHAPIError, HHClient, default_client
+from src.fetcher import (RateLimiter, TruncatedResultsError, get_json, iter_pages, BASE_URL, PER_PAGE,
+                         REQUESTS_PER_SECOND)
+from src.sync import sync_company, begin_stage, stage_vacancy_rows, apply_stage
+from src.utils import (insert_companies_into_db, insert_vacancy_rows, normalize_vacancy, remove_html_tags,
+                       COPY_BATCH_SIZE)
+
+
+FETCH_WORKERS = 4
+TRANSFORM_WORKERS = 2
+QUEUE_SIZE = 32
+POLL_INTERVAL = 0.1
+MAX_FAILED_PROBES = 3
+
+_STOP = object()
+
+
+class _Stopped(Exception):
+    """
+    Конвейер остановлен: стадия должна завершиться, не дожидаясь оставшихся данных.
+    """
+
+
+class Pipeline:
+    """
+    Конвейер загрузки данных с hh.ru в базу данных из трёх параллельно работающих стадий:
+
+        - загрузка (fetch_workers потоков): описание работодателя и постранично вакансии каждой компании;
+        - преобразование (transform_workers потоков): очистка описания от HTML и нормализация вакансий с пересчётом
+          зарплаты в базовую валюту; вакансии, повторно попавшие на следующую страницу ответа (выдача сдвинулась
+          между запросами), отбрасываются;
+        - запись (поток, вызвавший run): пачки строк загружаются в базу через COPY.
+
+    Стадии связаны очередями ограниченного размера (queue_size), поэтому быстрая стадия ждёт медленную, а в памяти
+    находится не более нескольких страниц ответа. Все сообщения одной компании проходят через один и тот же поток
+    преобразования, поэтому компания всегда записывается раньше своих вакансий. Запись выполняется в потоке,
+    вызвавшем run, и использует его транзакцию (см. src.db.transaction).
+
+    Пока автомат размыкания HTTP-клиента разомкнут, потоки загрузки ждут пробной попытки, а после MAX_FAILED_PROBES
+    неудачных пробных попыток подряд перестают ждать. Ошибка загрузки отдельной компании (HHAPIError,
+    CacheMissError, в том числе TruncatedResultsError для выдачи, урезанной до MAX_RESULTS) не прерывает конвейер:
+    компания попадает в отчёт failures, а в режиме синхронизации её вакансии, отсутствующие в полученных ответах,
+    не удаляются из базы. При любой другой ошибке в стадии или прерывании (Ctrl+C) остальные стадии
+    останавливаются, а исключение передаётся вызывающему коду.
+    """
+
+    __slots__ = ['company_ids', 'full', 'rates', 'cache', 'client', 'base_url', 'per_page', 'batch_size', 'limiter',
+                 'fetch_workers', 'transform_queues', 'write_queue', 'stop', 'lock', 'active_fetchers', 'errors',
+                 'stats', 'failures']
+
+    def __init__(self, company_ids: Iterable, full: bool = False, rates: dict[str, float] | None = None,
+                 cache: ResponseCache | None = None, client: HHClient | None = None, base_url: str = BASE_URL,
+                 per_page: int = PER_PAGE,
+                 batch_size: int = COPY_BATCH_SIZE, fetch_workers: int = FETCH_WORKERS,
+                 transform_workers: int = TRANSFORM_WORKERS, queue_size: int = QUEUE_SIZE,
+                 requests_per_second: float = REQUESTS_PER_SECOND, limiter: RateLimiter | None = None) -> None:
+        """
+        :param company_ids: Идентификаторы компаний (читаются лениво).
+        :param full: Полная загрузка в очищенные таблицы (True) или инкрементальная синхронизация (False).
+        :param rates: Коэффициенты пересчёта валют в базовую.
+        :param cache: Кэш ответов или None.
+        :param client: HTTP-клиент или None для общего клиента.
+        :param base_url: Базовый адрес API.
+        :param per_page: Количество вакансий на странице ответа API.
+        :param batch_size: Количество строк в одной пачке записи.
+        :param fetch_workers: Количество потоков загрузки.
+        :param transform_workers: Количество потоков преобразования.
+        :param queue_size: Максимальное количество сообщений в каждой очереди между стадиями.
+        :param requests_per_second: Максимальная частота запросов к API.
+        :param limiter: Общий с другими потребителями ограничитель частоты запросов; если задан, requests_per_second
+            не используется.
+        :raises ValueError: Количество потоков одной из стадий или размер очереди меньше 1.
+        """
+
+        for name, value in (("fetch_workers", fetch_workers), ("transform_workers", transform_workers),
+                            ("queue_size", queue_size), ("batch_size", batch_size)):
+            if value < 1:
+                raise ValueError(f"{name} должен быть не меньше 1, получено {value}")
+
+        self.company_ids = iter(company_ids)
+        self.full = full
+        self.rates = rates
+        self.cache = cache
+        self.client = client
+        self.base_url = base_url
+        self.per_page = per_page
+        self.batch_size = batch_size
+        self.limiter = limiter if limiter is not None else RateLimiter(requests_per_second)
+        self.fetch_workers = fetch_workers
+        self.transform_queues = [queue.Queue(queue_size) for _ in range(transform_workers)]
+        self.write_queue = queue.Queue(queue_size)
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.active_fetchers = fetch_workers
+        self.errors = []
+        self.stats = {"companies": Counter(), "vacancies": Counter()}
+        self.failures = {}
+
+    def run(self) -> dict[str, Counter]:
+        """
+        Запускает конвейер и дожидается его завершения.
+
+        :return: Счётчики изменений для компаний и вакансий (только в режиме инкрементальной синхронизации).
+        """
+
+        threads = [threading.Thread(target=self._fetch_worker, daemon=True) for _ in range(self.fetch_workers)]
+        threads += [threading.Thread(target=self._transform_worker, args=(source,), daemon=True)
+                    for source in self.transform_queues]
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            with metrics.stage("write"):
+                self._write()
+        except _Stopped:
+            pass
+        finally:
+            self.stop.set()
+
+            for thread in threads:
+                thread.join()
+
+        if self.errors:
+            raise self.errors[0]
+
+        return self.stats
+
+    def _fail(self, error: Exception) -> None:
+        """
+        Запоминает ошибку стадии и останавливает конвейер.
+        """
+
+        with self.lock:
+            self.errors.append(error)
+
+        self.stop.set()
+
+    def _put(self, target: queue.Queue, item) -> None:
+        """
+        Помещает сообщение в очередь, ожидая свободного места (обратное давление), пока конвейер не остановлен.
+        """
+
+        while not self.stop.is_set():
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+
+                return
+            except queue.Full:
+                continue
+
+        raise _Stopped
+
+    def _take(self, source: queue.Queue):
+        """
+        Извлекает сообщение из очереди, пока конвейер не остановлен.
+        """
+
+        while not self.stop.is_set():
+            try:
+                return source.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+
+        raise _Stopped
+
+    def _next_company(self):
+        """
+        Возвращает следующий идентификатор компании или None, если компании закончились.
+        """
+
+        with self.lock:
+            return next(self.company_ids, None)
+
+    def _request(self, url: str, params: dict | None = None) -> dict:
+        """
+        Выполняет запрос к API с учётом кэша и ограничения частоты запросов.
+
+        Если запрос отклонён разомкнутым автоматом размыкания, не выполнив ни одной попытки, поток ждёт пробной
+        попытки (reset_timeout) и повторяет запрос, а не записывает компанию в ошибки. Запрос, неудачные попытки
+        которого привели к размыканию, завершается ошибкой как обычно. После MAX_FAILED_PROBES неудачных пробных
+        попыток подряд API считается недоступным: отклонённые запросы сразу завершаются ошибкой, и оставшиеся компании
+        быстро попадают в отчёт failures, пока очередная пробная попытка не окажется успешной.
+        """
+
+        breaker = (self.client or default_client()).breaker
+
+        while True:
+            try:
+                return get_json(url, params, self.limiter, self.cache, self.client)
+            except CircuitOpenError as error:
+                if error.__cause__ is not None or breaker.failed_probes >= MAX_FAILED_PROBES:
+                    raise
+
+                metrics.inc("hh_pipeline_circuit_waits_total")
+
+                if self.stop.wait(max(breaker.retry_in, POLL_INTERVAL)):
+                    raise _Stopped from None
+
+    def _fetch_worker(self) -> None:
+        """
+        Стадия загрузки: для каждой компании передаёт описание работодателя и страницы вакансий на преобразование.
+        """
+
+        try:
+            with metrics.stage("fetch"):
+                while not self.stop.is_set() and (company_id := self._next_company()) is not None:
+                    target = self.transform_queues[hash(company_id) % len(self.transform_queues)]
+
+                    try:
+                        with metrics.timer("hh_pipeline_company_seconds", company=company_id):
+                            self._fetch_company(company_id, target)
+                    except (HHAPIError, CacheMissError) as error:
+                        metrics.inc("hh_pipeline_failures_total", reason=type(error).__name__)
+
+                        with self.lock:
+                            self.failures[company_id] = error
+        except _Stopped:
+            pass
+        except Exception as error:
+            self._fail(error)
+        finally:
+            with self.lock:
+                self.active_fetchers -= 1
+                last = self.active_fetchers == 0
+
+            if last:
+                try:
+                    for target in self.transform_queues:
+                        self._put(target, _STOP)
+                except _Stopped:
+                    pass
+
+    def _fetch_company(self, company_id: int, target: queue.Queue) -> None:
+        """
+        Передаёт на преобразование описание работодателя и все страницы его вакансий.
+
+        Сообщение "done" отправляется только после загрузки последней страницы, поэтому при ошибке вакансии компании
+        не считаются полностью загруженными. Если страницы содержат меньше вакансий, чем указано в поле 'found'
+        (выдача API ограничена MAX_RESULTS элементами), полученные вакансии записываются, но вместо "done"
+        выбрасывается TruncatedResultsError.
+        """
+
+        self._put(target, ("company", company_id, self._request(f"{self.base_url}employers/{company_id}")))
+        found, received = 0, 0
+
+        for page_data in iter_pages(f"{self.base_url}vacancies", {'employer_id': company_id}, self.per_page,
+                                    self._request):
+            items = page_data.get("items", [])
+            found, received = max(found, page_data.get("found", 0)), received + len(items)
+            metrics.inc("hh_pipeline_rows_total", len(items), stage="fetch", company=company_id)
+            self._put(target, ("vacancies", company_id, items))
+
+        if received < found:
+            raise TruncatedResultsError(f"Получено {received} из {found} вакансий компании {company_id}")
+
+        self._put(target, ("done", company_id, None))
+
+    def _transform_worker(self, source: queue.Queue) -> None:
+        """
+        Стадия преобразования: очищает описания компаний и нормализует вакансии.
+
+        Идентификаторы уже переданных вакансий запоминаются до сообщения "done" компании: все сообщения компании
+        проходят через один поток преобразования, поэтому повторы между страницами не доходят до COPY.
+        """
+
+        seen = {}
+
+        try:
+            while (message := self._take(source)) is not _STOP:
+                kind, company_id, payload = message
+
+                with metrics.timer("hh_pipeline_stage_seconds", stage="transform"):
+                    if kind == "company":
+                        seen[company_id] = set()
+                        payload = {"company_name": payload.get("name"),
+                                   "company_description": remove_html_tags(payload.get("description") or "")}
+                    elif kind == "vacancies":
+                        company_seen = seen.setdefault(company_id, set())
+                        rows = []
+
+                        for item in payload:
+                            row = normalize_vacancy(company_id, item, self.rates)
+
+                            if row[0] not in company_seen:
+                                company_seen.add(row[0])
+                                rows.append(row)
+
+                        kind, payload = "rows", rows
+                        metrics.inc("hh_pipeline_rows_total", len(payload), stage="transform", company=company_id)
+                    else:
+                        seen.pop(company_id, None)
+
+                self._put(self.write_queue, (kind, company_id, payload))
+
+            self._put(self.write_queue, _STOP)
+        except _Stopped:
+            pass
+        except Exception as error:
+            self._fail(error)
+
+    def _write(self) -> None:
+        """
+        Стадия записи: записывает компании и накапливает строки вакансий в пачки по batch_size.
+        """
+
+        finished, rows, completed = 0, [], []
+
+        if not self.full:
+            begin_stage()
+
+        while finished < len(self.transform_queues):
+            message = self._take(self.write_queue)
+
+            if message is _STOP:
+                finished += 1
+
+                continue
+
+            kind, company_id, payload = message
+
+            if kind == "company":
+                if self.full:
+                    insert_companies_into_db(company_id, payload)
+                else:
+                    self.stats["companies"].update(sync_company(company_id, payload))
+            elif kind == "rows":
+                metrics.inc("hh_pipeline_rows_total", len(payload), stage="write", company=company_id)
+                rows.extend(payload)
+
+                if len(rows) >= self.batch_size:
+                    self._flush(rows)
+                    rows = []
+            else:
+                completed.append(company_id)
+
+        self._flush(rows)
+
+        if not self.full:
+            self.stats["vacancies"].update(apply_stage(completed))
+
+    def _flush(self, rows: list[tuple]) -> None:
+        """
+        Записывает накопленные строки вакансий: в таблицу 'vacancies' или во временную таблицу синхронизации.
+        """
+
+        if not rows:
+            return
+
+        with metrics.timer("hh_pipeline_stage_seconds", stage="write"):
+            if self.full:
+                insert_vacancy_rows(rows, self.batch_size)
+            else:
+                stage_vacancy_rows(rows, self.batch_size)
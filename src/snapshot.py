@@ -0,0 +1,432 @@
+import ast
+import json
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Iterable, Iterator
+
+from src.db import connection
+from src.dbmanager import ITERSIZE
+from src.sync import content_hash
+from src.utils import rows_to_copy_buffer, VACANCY_COLUMNS, COPY_BATCH_SIZE
+
+
+SNAPSHOT_FORMAT = "hh_information_db.snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+NPY_HEADER_SIZE = 128
+DTYPES = {"int16": ("h", "<i2"), "int32": ("i", "<i4"), "int64": ("q", "<i8"), "float64": ("d", "<f8"),
+          "uint8": ("B", "|u1")}
+TYPECODES = {descr: typecode for typecode, descr in DTYPES.values()}
+
+EXPORT_TRANSACTION_QUERY = "SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY;"
+COMPANIES_EXPORT_QUERY = "SELECT company_id, company_name, description FROM companies ORDER BY company_id"
+VACANCIES_EXPORT_QUERY = f"SELECT {VACANCY_COLUMNS} FROM vacancies ORDER BY id"
+COMPANIES_IMPORT_QUERY = "COPY companies (company_id, company_name, description, content_hash) FROM STDIN"
+VACANCIES_IMPORT_QUERY = f"COPY vacancies ({VACANCY_COLUMNS}, content_hash) FROM STDIN"
+
+CENTS = Decimal("0.01")
+
+
+class _ColumnWriter:
+    """
+    Потоковая запись числового столбца в файл формата .npy (одномерный массив little-endian).
+
+    Размер массива заранее неизвестен, поэтому заголовок фиксированной длины перезаписывается при закрытии.
+    """
+
+    __slots__ = ['file', 'typecode', 'descr', 'count']
+
+    def __init__(self, path: str, dtype: str) -> None:
+        self.file = open(path, "wb")
+        self.typecode, self.descr = DTYPES[dtype]
+        self.count = 0
+        self.file.write(_npy_header(self.descr, 0))
+
+    def append(self, values: Iterable) -> None:
+        data = array(self.typecode, values)
+
+        if sys.byteorder == "big":
+            data.byteswap()
+
+        data.tofile(self.file)
+        self.count += len(data)
+
+    def close(self) -> None:
+        self.file.seek(0)
+        self.file.write(_npy_header(self.descr, self.count))
+        self.file.close()
+
+
+class _StringColumnWriter:
+    """
+    Потоковая запись строкового столбца: байты UTF-8 всех значений подряд (.data), смещения начала каждого значения
+    с завершающим смещением (.offsets, int64) и признак отсутствия значения NULL (.valid, uint8).
+    """
+
+    __slots__ = ['data', 'offsets', 'valid', 'position']
+
+    def __init__(self, path: str) -> None:
+        self.data = _ColumnWriter(f"{path}.data.npy", "uint8")
+        self.offsets = _ColumnWriter(f"{path}.offsets.npy", "int64")
+        self.valid = _ColumnWriter(f"{path}.valid.npy", "uint8")
+        self.position = 0
+        self.offsets.append([0])
+
+    def append(self, values: Iterable[str | None]) -> None:
+        encoded = [b"" if value is None else value.encode() for value in values]
+        offsets = array("q")
+
+        for value in encoded:
+            self.position += len(value)
+            offsets.append(self.position)
+
+        self.data.append(b"".join(encoded))
+        self.offsets.append(offsets)
+        self.valid.append(value is not None for value in values)
+
+    def close(self) -> None:
+        for writer in (self.data, self.offsets, self.valid):
+            writer.close()
+
+
+def _npy_header(descr: str, count: int) -> bytes:
+    """
+    Формирует заголовок файла .npy версии 1.0 фиксированной длины NPY_HEADER_SIZE байт.
+    """
+
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({count},), }}"
+
+    return NPY_MAGIC + (NPY_HEADER_SIZE - 10).to_bytes(2, "little") + \
+        header.ljust(NPY_HEADER_SIZE - 11).encode("latin1") + b"\n"
+
+
+class StringColumn:
+    """
+    Строковый столбец снимка, отображённый в память. Значения декодируются при обращении по индексу.
+    """
+
+    __slots__ = ['data', 'offsets', 'valid']
+
+    def __init__(self, data: memoryview, offsets: memoryview, valid: memoryview) -> None:
+        self.data = data
+        self.offsets = offsets
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, index: int) -> str | None:
+        if not self.valid[index]:
+            return None
+
+        return bytes(self.data[self.offsets[index]:self.offsets[index + 1]]).decode()
+
+    def __iter__(self) -> Iterator[str | None]:
+        return (self[index] for index in range(len(self)))
+
+
+class Snapshot:
+    """
+    Снимок таблиц 'companies' и 'vacancies' в столбцовом формате, открытый для чтения.
+
+    Снимок - это каталог с файлом manifest.json и отдельным файлом .npy на каждый числовой столбец. Строковые столбцы
+    хранятся как байты UTF-8 со смещениями, название компании и валюта вакансии закодированы словарём: столбец
+    vacancies.company содержит номер строки в столбцах companies, а vacancies.currency - номер валюты в списке
+    manifest['dictionaries']['currency'] (-1 - NULL). Пропущенные зарплаты хранятся как NaN.
+
+    Столбцы отображаются в память (mmap) и возвращаются как memoryview без копирования данных; те же файлы можно
+    открыть через numpy.load(path, mmap_mode='r').
+    """
+
+    __slots__ = ['path', 'manifest', 'mmaps', 'views']
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Каталог снимка.
+        """
+
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as file:
+            manifest = json.load(file)
+
+        if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"{path}: неподдерживаемый формат снимка")
+
+        self.path = path
+        self.manifest = manifest
+        self.mmaps = []
+        self.views = []
+
+    def rows(self, table: str) -> int:
+        """
+        Количество строк таблицы в снимке.
+        """
+
+        return self.manifest["tables"][table]["rows"]
+
+    def _load(self, file_name: str) -> memoryview:
+        """
+        Отображает файл .npy в память и возвращает его данные как memoryview нужного типа.
+        """
+
+        with open(os.path.join(self.path, file_name), "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if mapped[:8] != NPY_MAGIC:
+            mapped.close()
+
+            raise ValueError(f"{file_name}: файл не в формате .npy 1.0")
+
+        header_end = 10 + int.from_bytes(mapped[8:10], "little")
+        header = ast.literal_eval(mapped[10:header_end].decode("latin1"))
+        typecode = TYPECODES[header["descr"]]
+        self.mmaps.append(mapped)
+
+        if sys.byteorder == "big" and typecode != "B":
+            data = array(typecode, mapped[header_end:])
+            data.byteswap()
+            view = memoryview(data)
+        else:
+            raw = memoryview(mapped)[header_end:]
+            view = raw.cast(typecode)
+            self.views.append(raw)
+
+        self.views.append(view)
+
+        return view
+
+    def column(self, table: str, name: str) -> memoryview | StringColumn:
+        """
+        Возвращает столбец таблицы снимка.
+
+        :param table: 'companies' или 'vacancies'.
+        :param name: Имя столбца (см. manifest['tables'][table]['columns']).
+        :return: memoryview для числовых столбцов или StringColumn для строковых.
+        """
+
+        dtype = self.manifest["tables"][table]["columns"][name]
+
+        if dtype == "string":
+            return StringColumn(self._load(f"{table}.{name}.data.npy"), self._load(f"{table}.{name}.offsets.npy"),
+                                self._load(f"{table}.{name}.valid.npy"))
+
+        return self._load(f"{table}.{name}.npy")
+
+    def close(self) -> None:
+        """
+        Освобождает отображённые в память файлы. Полученные столбцы после этого использовать нельзя.
+        """
+
+        for view in reversed(self.views):
+            view.release()
+
+        for mapped in self.mmaps:
+            mapped.close()
+
+        self.views.clear()
+        self.mmaps.clear()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _nullable_float(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def _from_float(value: float, cents: bool = False) -> int | Decimal | None:
+    if value != value:
+        return None
+
+    return Decimal(repr(value)).quantize(CENTS) if cents else int(value)
+
+
+def export_snapshot(path: str, batch_size: int = ITERSIZE) -> dict:
+    """
+    Сохраняет таблицы 'companies' и 'vacancies' в столбцовый снимок (см. Snapshot).
+
+    Вакансии читаются через серверный курсор пачками по batch_size и сразу дописываются в файлы столбцов, поэтому
+    потребление памяти не зависит от размера таблицы. Обе таблицы читаются в одной транзакции REPEATABLE READ, READ
+    ONLY, поэтому загрузка, зафиксированная во время выгрузки, не попадает в снимок частично; функция должна
+    вызываться вне transaction().
+
+    Снимок записывается во временный каталог рядом с path, который затем заменяет прежний снимок переименованием,
+    поэтому прерванная выгрузка не оставляет в path смесь старых и новых файлов, а прежний снимок остаётся целым.
+
+    :param path: Каталог снимка (прежний снимок в нём заменяется целиком).
+    :param batch_size: Количество строк вакансий, читаемых за одно обращение к серверу.
+    :return: Описание снимка (содержимое manifest.json).
+    """
+
+    path = os.path.abspath(path)
+    directory = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory)
+
+    try:
+        manifest = _export_tables(directory, batch_size)
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+
+        raise
+
+    if os.path.exists(path):
+        previous = f"{path}.old-{os.getpid()}"
+        os.replace(path, previous)
+        os.replace(directory, path)
+        shutil.rmtree(previous, ignore_errors=True)
+    else:
+        os.replace(directory, path)
+
+    return manifest
+
+
+def _export_tables(path: str, batch_size: int) -> dict:
+    """
+    Выгружает таблицы в файлы столбцов и manifest.json в каталоге path (см. export_snapshot).
+    """
+
+    currencies = {}
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(EXPORT_TRANSACTION_QUERY)
+            cur.execute(COMPANIES_EXPORT_QUERY)
+            companies = cur.fetchall()
+
+        company_index = {company[0]: index for index, company in enumerate(companies)}
+        company_ids = _ColumnWriter(os.path.join(path, "companies.company_id.npy"), "int32")
+        company_names = _StringColumnWriter(os.path.join(path, "companies.company_name"))
+        descriptions = _StringColumnWriter(os.path.join(path, "companies.description"))
+
+        company_ids.append(company[0] for company in companies)
+        company_names.append([company[1] for company in companies])
+        descriptions.append([company[2] for company in companies])
+
+        for writer in (company_ids, company_names, descriptions):
+            writer.close()
+
+        writers = {
+            "vacancy_id": _ColumnWriter(os.path.join(path, "vacancies.vacancy_id.npy"), "int32"),
+            "company": _ColumnWriter(os.path.join(path, "vacancies.company.npy"), "int32"),
+            "vacancy_name": _StringColumnWriter(os.path.join(path, "vacancies.vacancy_name")),
+            "salary_min": _ColumnWriter(os.path.join(path, "vacancies.salary_min.npy"), "float64"),
+            "salary_max": _ColumnWriter(os.path.join(path, "vacancies.salary_max.npy"), "float64"),
+            "currency": _ColumnWriter(os.path.join(path, "vacancies.currency.npy"), "int16"),
+            "url": _StringColumnWriter(os.path.join(path, "vacancies.url")),
+            "salary_mid": _ColumnWriter(os.path.join(path, "vacancies.salary_mid.npy"), "float64"),
+        }
+        vacancies = 0
+        cur = conn.cursor(name="snapshot_export")
+        cur.itersize = batch_size
+
+        try:
+            cur.execute(VACANCIES_EXPORT_QUERY)
+
+            while batch := cur.fetchmany(batch_size):
+                columns = list(zip(*batch))
+                writers["vacancy_id"].append(columns[0])
+                writers["company"].append(company_index[company_id] for company_id in columns[1])
+                writers["vacancy_name"].append(columns[2])
+                writers["salary_min"].append(map(_nullable_float, columns[3]))
+                writers["salary_max"].append(map(_nullable_float, columns[4]))
+                writers["currency"].append(-1 if currency is None else currencies.setdefault(currency, len(currencies))
+                                           for currency in columns[5])
+                writers["url"].append(columns[6])
+                writers["salary_mid"].append(map(_nullable_float, columns[7]))
+                vacancies += len(batch)
+        finally:
+            cur.close()
+
+            for writer in writers.values():
+                writer.close()
+
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "tables": {
+            "companies": {"rows": len(companies),
+                          "columns": {"company_id": "int32", "company_name": "string", "description": "string"}},
+            "vacancies": {"rows": vacancies,
+                          "columns": {"vacancy_id": "int32", "company": "int32", "vacancy_name": "string",
+                                      "salary_min": "float64", "salary_max": "float64", "currency": "int16",
+                                      "url": "string", "salary_mid": "float64"}},
+        },
+        "dictionaries": {"currency": list(currencies)},
+    }
+
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+
+    return manifest
+
+
+def iter_snapshot_vacancies(snapshot: Snapshot) -> Iterator[tuple]:
+    """
+    Восстанавливает строки вакансий снимка в порядке столбцов VACANCY_COLUMNS.
+
+    :param snapshot: Открытый снимок.
+    :return: Итератор по кортежам (vacancy_id, company_id, vacancy_name, salary_min, salary_max, currency, url,
+        salary_mid).
+    """
+
+    company_ids = snapshot.column("companies", "company_id")
+    currencies = snapshot.manifest["dictionaries"]["currency"]
+    columns = [snapshot.column("vacancies", name) for name in ("vacancy_id", "company", "vacancy_name", "salary_min",
+                                                               "salary_max", "currency", "url", "salary_mid")]
+
+    for vacancy_id, company, name, salary_min, salary_max, currency, url, salary_mid in zip(*columns):
+        yield (vacancy_id, company_ids[company], name, _from_float(salary_min), _from_float(salary_max),
+               None if currency < 0 else currencies[currency], url, _from_float(salary_mid, cents=True))
+
+
+def import_snapshot(path: str, batch_size: int = COPY_BATCH_SIZE) -> dict:
+    """
+    Загружает снимок (см. export_snapshot) в пустые таблицы 'companies' и 'vacancies' командой COPY.
+
+    Хэши содержимого строк вычисляются так же, как при синхронизации (см. src.sync), поэтому следующее
+    инкрементальное обновление не переписывает неизменные записи. Материализованные представления после загрузки
+    нужно пересчитать (src.utils.refresh_statistics).
+
+    :param path: Каталог снимка.
+    :param batch_size: Количество строк вакансий в одной пачке COPY.
+    :return: Количество загруженных строк {'companies': ..., 'vacancies': ...}.
+    :raises ValueError: Таблицы не пусты или снимок имеет неподдерживаемый формат.
+    """
+
+    with Snapshot(path) as snapshot, connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM companies) OR EXISTS (SELECT 1 FROM vacancies);")
+
+            if cur.fetchone()[0]:
+                raise ValueError("Снимок можно загрузить только в пустые таблицы")
+
+            companies = [(company_id, name, description) for company_id, name, description in zip(
+                snapshot.column("companies", "company_id"), snapshot.column("companies", "company_name"),
+                snapshot.column("companies", "description"))]
+            cur.copy_expert(COMPANIES_IMPORT_QUERY,
+                            rows_to_copy_buffer([(*company, content_hash(company)) for company in companies]))
+
+            batch = []
+
+            for row in iter_snapshot_vacancies(snapshot):
+                batch.append((*row, content_hash(row)))
+
+                if len(batch) >= batch_size:
+                    cur.copy_expert(VACANCIES_IMPORT_QUERY, rows_to_copy_buffer(batch))
+                    batch = []
+
+            if batch:
+                cur.copy_expert(VACANCIES_IMPORT_QUERY, rows_to_copy_buffer(batch))
+
+        return {"companies": len(companies), "vacancies": snapshot.rows("vacancies")}
@@ -0,0 +1,174 @@
+from collections import Counter
+from itertools import islice
+from typing import Iterable
+
+from src import metrics
+from src.db import connection
+from src.utils import content_hash, normalize_vacancy, rows_to_copy_buffer, VACANCY_COLUMNS, COPY_BATCH_SIZE
+
+
+SYNC_COUNTERS = ("inserted", "updated", "unchanged", "removed")
+
+STAGE_CREATE_QUERY = ("CREATE TEMP TABLE IF NOT EXISTS vacancies_stage (vacancy_id INTEGER, company_id INTEGER, "
+                      "vacancy_name VARCHAR(255), salary_min INTEGER, salary_max INTEGER, currency VARCHAR(50), "
+                      "url VARCHAR(255), salary_mid NUMERIC, content_hash CHAR(32));")
+STAGE_COPY_QUERY = f"COPY vacancies_stage ({VACANCY_COLUMNS}, content_hash) FROM STDIN"
+
+VACANCIES_UPSERT_QUERY = (
+    f"INSERT INTO vacancies ({VACANCY_COLUMNS}, content_hash) "
+    f"SELECT DISTINCT ON (vacancy_id) {VACANCY_COLUMNS}, content_hash FROM vacancies_stage "
+    "ON CONFLICT (vacancy_id) DO UPDATE SET company_id = EXCLUDED.company_id, "
+    "vacancy_name = EXCLUDED.vacancy_name, salary_min = EXCLUDED.salary_min, salary_max = EXCLUDED.salary_max, "
+    "currency = EXCLUDED.currency, url = EXCLUDED.url, salary_mid = EXCLUDED.salary_mid, "
+    "content_hash = EXCLUDED.content_hash "
+    "WHERE vacancies.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+    "RETURNING (xmax = 0) AS inserted;"
+)
+VACANCIES_REMOVE_QUERY = ("DELETE FROM vacancies WHERE company_id = ANY(%s) AND NOT EXISTS "
+                          "(SELECT 1 FROM vacancies_stage WHERE vacancies_stage.vacancy_id = vacancies.vacancy_id);")
+
+COMPANY_UPSERT_QUERY = (
+    "INSERT INTO companies (company_id, company_name, description, content_hash) VALUES (%s, %s, %s, %s) "
+    "ON CONFLICT (company_id) DO UPDATE SET company_name = EXCLUDED.company_name, "
+    "description = EXCLUDED.description, content_hash = EXCLUDED.content_hash "
+    "WHERE companies.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+    "RETURNING (xmax = 0) AS inserted;"
+)
+
+
+def _count_upserted(cur, staged: int) -> Counter:
+    """
+    Разбирает результат RETURNING (xmax = 0) запроса upsert на вставленные, обновлённые и неизменные строки.
+
+    :param cur: Курсор после выполнения upsert.
+    :param staged: Количество строк, переданных в upsert.
+    :return: Счётчики 'inserted', 'updated' и 'unchanged'.
+    """
+
+    stats = Counter(inserted=0, updated=0)
+
+    for (inserted,) in cur.fetchall():
+        stats["inserted" if inserted else "updated"] += 1
+
+    stats["unchanged"] = staged - stats["inserted"] - stats["updated"]
+
+    return stats
+
+
+def sync_company(company_id, company_data: dict) -> Counter:
+    """
+    Добавляет или обновляет запись о компании, не трогая её, если содержимое не изменилось.
+
+    :param company_id: Идентификатор компании.
+    :param company_data: Словарь с ключами 'company_name' и 'company_description'.
+    :return: Счётчики 'inserted', 'updated' и 'unchanged'.
+    """
+
+    values = (company_id, company_data.get('company_name'), company_data.get('company_description'))
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(COMPANY_UPSERT_QUERY, (*values, content_hash(values)))
+
+            return _count_upserted(cur, 1)
+
+
+def sync_vacancies(company_id, company_data: Iterable[dict], batch_size: int = COPY_BATCH_SIZE,
+                   rates: dict[str, float] | None = None) -> Counter:
+    """
+    Инкрементально синхронизирует вакансии компании с таблицей 'vacancies'.
+
+    Вакансии потоком загружаются через COPY во временную таблицу, затем одним запросом INSERT ... ON CONFLICT
+    (vacancy_id) DO UPDATE переносятся в 'vacancies'. Строки, хэш содержимого которых не изменился, не переписываются.
+    Вакансии компании, отсутствующие в переданных данных (снятые с публикации), удаляются.
+
+    :param company_id: Идентификатор компании.
+    :param company_data: Итерируемый объект словарей вакансий (например, src.fetcher.iter_vacancies).
+    :param batch_size: Количество строк в одной пачке COPY.
+    :param rates: Коэффициенты пересчёта валют в базовую для заполнения salary_mid.
+    :return: Счётчики 'inserted', 'updated', 'unchanged' и 'removed'.
+    """
+
+    begin_stage()
+    stage_vacancy_rows((normalize_vacancy(company_id, item, rates) for item in company_data), batch_size)
+
+    return apply_stage([company_id])
+
+
+def begin_stage() -> None:
+    """
+    Создаёт (при необходимости) и очищает временную таблицу 'vacancies_stage' для инкрементальной синхронизации.
+    """
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(STAGE_CREATE_QUERY)
+            cur.execute("TRUNCATE vacancies_stage;")
+
+
+def stage_vacancy_rows(rows: Iterable[tuple], batch_size: int = COPY_BATCH_SIZE) -> None:
+    """
+    Добавляет нормализованные строки вакансий (см. src.utils.normalize_vacancy) во временную таблицу вместе
+    с хэшем содержимого.
+
+    Может вызываться многократно, в том числе для строк разных компаний вперемешку.
+
+    :param rows: Итерируемый объект кортежей в порядке столбцов VACANCY_COLUMNS.
+    :param batch_size: Количество строк в одной пачке COPY.
+    """
+
+    rows = ((*row, content_hash(row)) for row in rows)
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            for batch in iter(lambda: list(islice(rows, batch_size)), []):
+                metrics.inc("hh_db_rows_total", len(batch), table="vacancies_stage")
+                cur.copy_expert(STAGE_COPY_QUERY, rows_to_copy_buffer(batch))
+
+
+def apply_stage(company_ids: list) -> Counter:
+    """
+    Переносит накопленные во временной таблице вакансии в 'vacancies' и удаляет снятые с публикации.
+
+    :param company_ids: Компании, вакансии которых полностью загружены во временную таблицу; их вакансии,
+        отсутствующие во временной таблице, удаляются.
+    :return: Счётчики 'inserted', 'updated', 'unchanged' и 'removed'.
+    """
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT COUNT(DISTINCT vacancy_id) FROM vacancies_stage;")
+            staged = cur.fetchone()[0]
+
+            cur.execute(VACANCIES_UPSERT_QUERY)
+            stats = _count_upserted(cur, staged)
+
+            cur.execute(VACANCIES_REMOVE_QUERY, (list(company_ids),))
+            stats["removed"] = cur.rowcount
+
+    return stats
+
+
+def remove_missing_companies(company_ids: list) -> Counter:
+    """
+    Удаляет компании, которых больше нет в списке отслеживаемых, вместе с их вакансиями.
+
+    Пустой список ничего не удаляет: он означает ошибку во входных данных, а не просьбу очистить базу.
+
+    :param company_ids: Идентификаторы компаний, которые должны остаться в базе.
+    :return: Счётчик 'removed' с количеством удалённых вакансий.
+    """
+
+    company_ids = list(company_ids)
+
+    if not company_ids:
+        return Counter(removed=0)
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM vacancies WHERE company_id <> ALL(%s);", (company_ids,))
+            stats = Counter(removed=cur.rowcount)
+
+            cur.execute("DELETE FROM companies WHERE company_id <> ALL(%s);", (company_ids,))
+
+    return stats
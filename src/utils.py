@@ -1,10 +1,61 @@
-import requests
+import asyncio
+import hashlib
+import html
+import io
 import psycopg2
-import configparser
 import re
-
-
-def get_data_from_hh(company_ids: list) -> dict:
+from itertools import islice
+from typing import Iterable
+
+from psycopg2.extras import execute_values
+
+from src import metrics
+from src.cache import ResponseCache
+from src.client import HHClient
+from src.currency import salary_midpoint
+from src.db import connection
+from src.fetcher import fetch_companies, MAX_CONCURRENCY, REQUESTS_PER_SECOND
+
+
+VACANCY_COLUMNS = "vacancy_id, company_id, vacancy_name, salary_min, salary_max, currency, url, salary_mid"
+VACANCIES_COPY_QUERY = f"COPY vacancies ({VACANCY_COLUMNS}, content_hash) FROM STDIN"
+VACANCIES_INSERT_QUERY = f"INSERT INTO vacancies ({VACANCY_COLUMNS}, content_hash) VALUES %s"
+COPY_BATCH_SIZE = 5000
+
+COMPANY_VACANCY_COUNTS_QUERY = (
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS company_vacancy_counts AS "
+    "SELECT companies.company_id, companies.company_name, COUNT(vacancies.id) AS vacancies_count "
+    "FROM companies JOIN vacancies ON companies.company_id = vacancies.company_id "
+    "GROUP BY companies.company_id, companies.company_name;"
+)
+SALARY_STATS_QUERY = (
+    "CREATE MATERIALIZED VIEW IF NOT EXISTS salary_stats AS "
+    "SELECT currency, GROUPING(currency) = 1 AS is_total, COUNT(*) AS vacancies_count, "
+    "AVG(salary_mid) AS avg_salary, "
+    "percentile_cont(0.25) WITHIN GROUP (ORDER BY salary_mid) AS p25, "
+    "percentile_cont(0.5) WITHIN GROUP (ORDER BY salary_mid) AS median, "
+    "percentile_cont(0.75) WITHIN GROUP (ORDER BY salary_mid) AS p75, "
+    "percentile_cont(0.9) WITHIN GROUP (ORDER BY salary_mid) AS p90 "
+    "FROM vacancies WHERE salary_mid IS NOT NULL GROUP BY GROUPING SETS ((currency), ());"
+)
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# Остаток тега после имени: атрибуты со значениями в кавычках (могут содержать '>') или, если кавычка не закрыта,
+# всё до ближайшего '>'. Ни одна из ветвей не выходит за следующий символ '<'.
+HTML_TAG_REST = r"""(?:(?:[^<>"']|"[^"<]*"|'[^'<]*')*>|[^<>]*>)"""
+HTML_BLOCK_TAG_RE = re.compile(
+    r"</?(?:address|article|aside|blockquote|br|dd|div|dl|dt|footer|h[1-6]|header|hr|li|ol|p|pre|section|table|td|"
+    r"th|tr|ul)\b" + HTML_TAG_REST, re.IGNORECASE
+)
+HTML_MARKUP_RE = re.compile(
+    r"<!--.*?(?:-->|\Z)|<(script|style)\b" + HTML_TAG_REST + r".*?(?:</\1\s*>|\Z)|</?[a-zA-Z]" + HTML_TAG_REST,
+    re.IGNORECASE | re.DOTALL
+)
+
+
+def get_data_from_hh(company_ids: list, max_concurrency: int = MAX_CONCURRENCY,
+                     requests_per_second: float = REQUESTS_PER_SECOND, cache: ResponseCache | None = None,
+                     client: HHClient | None = None, failures: dict | None = None) -> dict:
     """
     Получает данные о вакансиях компаний по их идентификаторам с использованием API сайта HeadHunter.
 
@@ -12,34 +63,55 @@ def get_data_from_hh(company_ids: list) -> dict:
     и собирает информацию о вакансиях данной компании. Информация возвращается в виде словаря, где ключом является
     идентификатор компании, а значением - данные о вакансиях в формате JSON.
 
+    Запросы выполняются конкурентно: вакансии (все страницы) и описание работодателя запрашиваются параллельно, число
+    одновременных запросов и их частота ограничены, чтобы не превышать квоты API. Если передан словарь failures,
+    компании, которые не удалось загрузить, записываются в него вместе с ошибкой и не прерывают загрузку остальных.
+
     :param company_ids: Список идентификаторов компаний для поиска вакансий.
+    :param max_concurrency: Максимальное число одновременных HTTP-запросов.
+    :param requests_per_second: Максимальная частота запросов к API.
+    :param cache: Кэш HTTP-ответов (src.cache.ResponseCache) или None.
+    :param client: HTTP-клиент (src.client.HHClient) или None для общего клиента.
+    :param failures: Словарь для отчёта об ошибках {идентификатор компании: исключение} или None.
     :return: Словарь, где ключ - идентификатор компании, значение - данные о вакансиях этой компании.
     """
 
-    base_url = "https://api.hh.ru/"
+    fetched = asyncio.run(fetch_companies(company_ids, max_concurrency=max_concurrency,
+                                          requests_per_second=requests_per_second, cache=cache, client=client,
+                                          failures=failures))
     companies_data = {}
 
-    for company_id in company_ids:
-        params = {'employer_id': company_id, "per_page": 100}
-        response = requests.get(f"{base_url}vacancies", params=params)
-        companies_data[company_id] = response.json()
-
-        company_data = requests.get(f"{base_url}employers/{company_id}")
-        companies_data[company_id]['company_name'] = company_data.json()['name']
-        companies_data[company_id]['company_description'] = remove_html_tags(company_data.json()['description'])
+    for company_id, (vacancies, employer) in fetched.items():
+        companies_data[company_id] = vacancies
+        companies_data[company_id]['company_name'] = employer.get('name')
+        companies_data[company_id]['company_description'] = remove_html_tags(employer.get('description') or '')
 
     return companies_data
 
 
-def remove_html_tags(text: str) -> str:
+@metrics.timed()
+def remove_html_tags(text: str, max_length: int | None = None) -> str:
     """
     Удаляет HTML теги из заданной строки.
 
+    Теги и комментарии удаляются, содержимое <script> и <style> отбрасывается, на месте блочных тегов (<p>, <br>,
+    <li> и т.п.) ставится пробел, HTML-сущности (&quot;, &nbsp;, &#8381; ...) декодируются, а последовательности
+    пробельных символов схлопываются в один пробел. Одиночные символы '<', не образующие тег, сохраняются как текст.
+    Регулярные выражения скомпилированы заранее и не выходят за следующий символ '<' (кроме комментариев, script
+    и style, которые без закрывающего тега отбрасываются до конца строки), поэтому время работы линейно по длине
+    строки, в том числе на некорректной разметке.
+
     :param text: Строка, из которой необходимо удалить HTML теги.
+    :param max_length: Максимальная длина результата; более длинный текст обрезается и завершается символом '…'
+        (при max_length <= 0 возвращается пустая строка).
     :return: Строка с удаленными HTML тегами.
     """
 
-    clean_text = re.sub('<.*?>', '', text)
+    text = HTML_MARKUP_RE.sub("", HTML_BLOCK_TAG_RE.sub(" ", text))
+    clean_text = " ".join(html.unescape(text).split())
+
+    if max_length is not None and len(clean_text) > max_length:
+        clean_text = clean_text[:max_length - 1].rstrip() + "…" if max_length > 0 else ""
 
     return clean_text
 
@@ -48,40 +120,48 @@ def create_tables() -> None:
     """
     Создание таблиц в базе данных.
 
-    Функция подключается к базе данных, настройки которой указаны в файле 'settings.ini'.
+    Функция берёт подключение из общего пула (см. src.db.connection).
     Выполняется создание таблиц 'companies' и 'vacancies', если они ещё не существуют.
 
     Таблица 'companies' содержит следующие поля:
         - id: серийный уникальный идентификатор записи (основной ключ),
         - company_id: уникальный идентификатор компании,
         - company_name: название компании (до 255 символов),
-        - description: текстовое описание компании.
+        - description: текстовое описание компании,
+        - content_hash: хэш содержимого записи для инкрементального обновления (см. src.sync).
 
     Таблица 'vacancies' включает в себя поля:
         - id: серийный уникальный идентификатор записи (основной ключ),
         - vacancy_id: уникальный идентификатор вакансии,
         - company_id: идентификатор компании, которой принадлежит вакансия,
         - vacancy_name: название вакансии (до 255 символов),
-        - salary_min: минимальный уровень зарплаты,
-        - salary_max: максимальный уровень зарплаты,
+        - salary_min: минимальный уровень зарплаты (NULL, если не указан),
+        - salary_max: максимальный уровень зарплаты (NULL, если не указан),
         - currency: валюта зарплаты (до 50 символов),
         - url: URL вакансии,
+        - content_hash: хэш содержимого записи для инкрементального обновления (см. src.sync),
+        - vacancy_name_tsv: вычисляемый полнотекстовый вектор названия вакансии (словарь 'russian'),
+        - salary_mid: середина вилки зарплаты, пересчитанная в базовую валюту при загрузке (NULL, если зарплата
+          не указана или курс валюты неизвестен),
         - FOREIGN KEY (company_id) REFERENCES companies(company_id): внешний ключ, связывающий с таблицей 'companies'.
 
+    Для таблицы 'vacancies' также создаются индексы: B-tree по company_id (используется во всех соединениях
+    с 'companies'), GIN по vacancy_name_tsv (полнотекстовый поиск по названию) и B-tree по salary_mid.
+
+    Таблица 'currency_rates' хранит коэффициенты пересчёта валют в базовую, использованные при последней загрузке.
+
+    Кроме того, создаются материализованные представления со статистикой, которые обновляются функцией
+    refresh_statistics() в конце каждой загрузки:
+        - company_vacancy_counts: количество вакансий каждой компании,
+        - salary_stats: средняя зарплата и перцентили середины вилки (в базовой валюте) по каждой валюте и в целом
+          (is_total).
+
     Функция не принимает аргументов и не возвращает значений. Использует контекстное управление подключением и курсором,
-    чтобы гарантировать закрытие соединений даже при возникновении ошибок.
+    чтобы гарантировать возврат подключения в пул даже при возникновении ошибок.
     :return:
     """
 
-    config = configparser.ConfigParser()
-    config.read("settings.ini")
-
-    with psycopg2.connect(
-            host=config.get("Open_db", "host"),
-            database=config.get("Open_db", "database"),
-            user=config.get("Open_db", "user"),
-            password=config.get("Open_db", "password")
-    ) as conn:
+    with connection() as conn:
         with conn.cursor() as cur:
             query = ("CREATE TABLE IF NOT EXISTS companies (id SERIAL PRIMARY KEY, company_id INTEGER UNIQUE, "
                      "company_name VARCHAR(255), description TEXT);")
@@ -93,46 +173,80 @@ def create_tables() -> None:
                      "REFERENCES companies(company_id));")
             cur.execute(query)
 
-    conn.close()
+            query = "ALTER TABLE companies ADD COLUMN IF NOT EXISTS content_hash CHAR(32);"
+            cur.execute(query)
+
+            query = "ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS content_hash CHAR(32);"
+            cur.execute(query)
+
+            query = ("ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS vacancy_name_tsv tsvector GENERATED ALWAYS AS "
+                     "(to_tsvector('russian', COALESCE(vacancy_name, ''))) STORED;")
+            cur.execute(query)
+
+            query = "CREATE INDEX IF NOT EXISTS vacancies_company_id_idx ON vacancies (company_id);"
+            cur.execute(query)
+
+            query = "CREATE INDEX IF NOT EXISTS vacancies_name_tsv_idx ON vacancies USING GIN (vacancy_name_tsv);"
+            cur.execute(query)
+
+            query = "ALTER TABLE vacancies ADD COLUMN IF NOT EXISTS salary_mid NUMERIC;"
+            cur.execute(query)
+
+            query = "ALTER TABLE vacancies ALTER COLUMN salary_mid DROP EXPRESSION IF EXISTS;"
+            cur.execute(query)
+
+            query = "CREATE INDEX IF NOT EXISTS vacancies_salary_mid_idx ON vacancies (salary_mid);"
+            cur.execute(query)
+
+            query = ("CREATE TABLE IF NOT EXISTS currency_rates (currency VARCHAR(50) PRIMARY KEY, "
+                     "rate NUMERIC NOT NULL, updated_at TIMESTAMPTZ NOT NULL DEFAULT now());")
+            cur.execute(query)
+
+            cur.execute(COMPANY_VACANCY_COUNTS_QUERY)
+            cur.execute(SALARY_STATS_QUERY)
+
+
+def refresh_statistics() -> None:
+    """
+    Пересчитывает материализованные представления со статистикой (company_vacancy_counts и salary_stats).
+
+    Вызывается в конце загрузки данных, после чего запросы DBManager к статистике не сканируют таблицу 'vacancies'.
+    """
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("REFRESH MATERIALIZED VIEW company_vacancy_counts;")
+            cur.execute("REFRESH MATERIALIZED VIEW salary_stats;")
 
 
 def clear_tables() -> None:
     """
     Очистка таблиц базы данных.
 
-    Функция осуществляет подключение к базе данных, указанной в файле 'settings.ini', и выполняет очистку таблиц
-    'vacancies' и 'companies'. Таблица 'vacancies' очищается с перезапуском идентификаторов, тогда как удаление записей
-    из 'companies' происходит с удалением всех зависимых записей (каскадное удаление).
+    Функция берёт подключение из общего пула и удаляет все записи из таблиц 'vacancies' и 'companies' (сначала
+    вакансии, ссылающиеся на компании).
 
     Функция не принимает аргументов и не возвращает значений. Использует контекстное управление подключением и курсором
-    для гарантии закрытия соединения и курсора даже в случае возникновения ошибок.
+    для гарантии возврата подключения в пул и закрытия курсора даже в случае возникновения ошибок. Внутри
+    src.db.transaction() очистка фиксируется только вместе с последующей загрузкой. Используется DELETE, а не TRUNCATE:
+    TRUNCATE удерживал бы исключительную блокировку таблиц до COMMIT, и читатели ждали бы всю загрузку из сети, а после
+    DELETE они продолжают видеть прежние данные до фиксации транзакции.
     """
 
-    config = configparser.ConfigParser()
-    config.read("settings.ini")
-
-    with psycopg2.connect(
-            host=config.get("Open_db", "host"),
-            database=config.get("Open_db", "database"),
-            user=config.get("Open_db", "user"),
-            password=config.get("Open_db", "password")
-    ) as conn:
+    with connection() as conn:
         with conn.cursor() as cur:
-            query = "TRUNCATE vacancies RESTART IDENTITY;"
+            query = "DELETE FROM vacancies;"
             cur.execute(query)
 
-            query = "DELETE FROM companies CASCADE;"
+            query = "DELETE FROM companies;"
             cur.execute(query)
 
-    conn.close()
-
 
 def insert_companies_into_db(company_id: str, company_data: dict) -> None:
     """
     Вставка данных о компании в таблицу 'companies'.
 
-    Функция подключается к базе данных PostgreSQL, используя параметры из 'settings.ini', и вставляет информацию
-    о компании в таблицу 'companies'.
+    Функция берёт подключение из общего пула и вставляет информацию о компании в таблицу 'companies'.
 
     Аргументы:
         company_id (str): Уникальный идентификатор компании.
@@ -140,42 +254,98 @@ def insert_companies_into_db(company_id: str, company_data: dict) -> None:
             - 'company_name': название компании (строка),
             - 'company_description': описание компании (строка).
 
+    Вместе с записью сохраняется хэш содержимого (см. content_hash), поэтому следующая инкрементальная синхронизация
+    не переписывает неизменившиеся компании.
+
     Функция не возвращает значений, но вносит изменения в базу данных, добавляя новую запись в таблицу. Используется
-    контекстное управление подключением и курсором для гарантии закрытия соединения, даже если в процессе выполнения
-    произойдет ошибка.
+    контекстное управление подключением и курсором для гарантии возврата подключения в пул, даже если в процессе
+    выполнения произойдет ошибка.
 
     Пример использования:
         insert_companies_into_db('123', {'company_name': 'XYZ Corp', 'company_description': 'Технологичная компания
         XYZ.'})
     """
 
-    config = configparser.ConfigParser()
-    config.read("settings.ini")
+    values = (company_id, company_data.get('company_name'), company_data.get('company_description'))
 
-    with psycopg2.connect(
-        host=config.get("Open_db", "host"),
-        database=config.get("Open_db", "database"),
-        user=config.get("Open_db", "user"),
-        password=config.get("Open_db", "password")
-    ) as conn:
+    with connection() as conn:
         with conn.cursor() as cur:
-            query = (f"INSERT INTO companies (company_id, company_name, description) VALUES ({company_id}, "
-                     f"\'{company_data.get('company_name')}\', \'{company_data.get('company_description')}\');")
-            cur.execute(query)
+            query = ("INSERT INTO companies (company_id, company_name, description, content_hash) "
+                     "VALUES (%s, %s, %s, %s);")
+            cur.execute(query, (*values, content_hash(values)))
+
+
+def content_hash(values: Iterable) -> str:
+    """
+    Вычисляет хэш содержимого строки таблицы.
+
+    :param values: Значения полей строки.
+    :return: MD5 в шестнадцатеричном виде (32 символа).
+    """
+
+    payload = "\x1f".join("" if value is None else str(value) for value in values)
+
+    return hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest()
+
+
+def normalize_vacancy(company_id, item: dict, rates: dict[str, float] | None = None) -> tuple:
+    """
+    Приводит вакансию из ответа API к строке таблицы 'vacancies'.
+
+    Неуказанные границы зарплаты и валюта сохраняются как NULL. Середина вилки пересчитывается в базовую валюту
+    по таблице коэффициентов rates (см. src.currency.load_rates).
+
+    :param company_id: Идентификатор компании, к которой относится вакансия.
+    :param item: Словарь вакансии из ответа API.
+    :param rates: Коэффициенты пересчёта валют в базовую или None (пересчитывается только базовая валюта).
+    :return: Кортеж (vacancy_id, company_id, vacancy_name, salary_min, salary_max, currency, url, salary_mid).
+    """
+
+    salary = item.get("salary") or {}
+    salary_min = salary.get("from")
+    salary_max = salary.get("to")
+    currency = salary.get("currency")
+
+    return (item.get("id"), company_id, item.get("name"), salary_min, salary_max, currency, item.get("url"),
+            salary_midpoint(salary_min, salary_max, currency, rates))
+
 
-    conn.close()
+def rows_to_copy_buffer(rows: list[tuple]) -> io.StringIO:
+    """
+    Сериализует строки в текстовый формат COPY в буфере в памяти.
 
+    Значения разделяются табуляцией, None записывается как \\N, а обратная косая черта, табуляция и переводы строк
+    экранируются, поэтому любые символы в названиях вакансий безопасны.
 
-def insert_vacancies_into_db(company_id, company_data):
+    :param rows: Список кортежей значений.
+    :return: Буфер, готовый к передаче в cursor.copy_expert.
+    """
+
+    buffer = io.StringIO()
+
+    for row in rows:
+        buffer.write("\t".join(r"\N" if value is None else str(value).translate(COPY_ESCAPES) for value in row))
+        buffer.write("\n")
+
+    buffer.seek(0)
+
+    return buffer
+
+
+def insert_vacancies_into_db(company_id, company_data, batch_size: int = COPY_BATCH_SIZE,
+                             method: str = "copy", rates: dict[str, float] | None = None) -> None:
     """
     Вставка данных о вакансиях компании в таблицу 'vacancies' базы данных.
 
-    Функция подключается к базе данных PostgreSQL, используя параметры из файла 'settings.ini', и вставляет информацию
-    о вакансиях в таблицу. Данные каждой вакансии из списка добавляются в таблицу.
+    Функция берёт подключение из общего пула и загружает вакансии в таблицу пачками по batch_size строк. Каждая пачка
+    передаётся одной командой COPY FROM STDIN через буфер в памяти, поэтому данные не собираются целиком и число
+    обращений к серверу не зависит от числа вакансий. Если сервер не поддерживает COPY, загрузка продолжается через
+    execute_values с параметризованными значениями.
 
     Параметры:
         company_id: Идентификатор компании, к которой относятся вакансии.
-        company_data: Список словарей, каждый из которых представляет вакансию с ключами:
+        company_data: Итерируемый объект (список или генератор, например src.fetcher.iter_vacancies) словарей,
+            каждый из которых представляет вакансию с ключами:
             - 'id': идентификатор вакансии,
             - 'name': название вакансии,
             - 'salary': словарь с информацией о заработной плате, содержащий:
@@ -184,7 +354,12 @@ def insert_vacancies_into_db(company_id, company_data):
                 - 'currency': валюта заработной платы,
             - 'url': URL-адрес страницы вакансии.
 
-    Каждая вакансия добавляется в базу с проверкой и адаптацией неуказанных или неполных данных о зарплате. Функция
+        batch_size: Количество строк в одной пачке.
+        method: Способ загрузки - 'copy' (COPY FROM STDIN) или 'values' (execute_values).
+        rates: Коэффициенты пересчёта валют в базовую для заполнения salary_mid (см. src.currency.load_rates).
+
+    Каждая вакансия добавляется в базу с проверкой и адаптацией неуказанных или неполных данных о зарплате: пересчёт
+    середины вилки в базовую валюту выполняется один раз при загрузке, а не при каждом запросе статистики. Функция
     не возвращает значений, но выполняет вставку данных в базу данных.
 
     Пример использования:
@@ -197,36 +372,48 @@ def insert_vacancies_into_db(company_id, company_data):
         insert_vacancies_into_db('123', vacancies_data)
     """
 
-    config = configparser.ConfigParser()
-    config.read("settings.ini")
+    insert_vacancy_rows((normalize_vacancy(company_id, item, rates) for item in company_data), batch_size, method)
 
-    with psycopg2.connect(
-        host=config.get("Open_db", "host"),
-        database=config.get("Open_db", "database"),
-        user=config.get("Open_db", "user"),
-        password=config.get("Open_db", "password")
-    ) as conn:
-        with conn.cursor() as cur:
-            for item in company_data:
-                salary = item.get("salary")
 
-                if salary is None:
-                    salary = {"currency": "Не задано", "from": 0, "to": 0}
+def insert_vacancy_rows(rows: Iterable[tuple], batch_size: int = COPY_BATCH_SIZE, method: str = "copy") -> None:
+    """
+    Загружает уже нормализованные строки вакансий (см. normalize_vacancy) в таблицу 'vacancies'.
+
+    Строки передаются пачками по batch_size: командой COPY FROM STDIN или, если сервер не поддерживает COPY,
+    через execute_values. К каждой строке добавляется хэш содержимого (см. content_hash), как и при инкрементальной
+    синхронизации, поэтому следующая синхронизация после полной загрузки не переписывает неизменившиеся вакансии.
+
+    :param rows: Итерируемый объект кортежей в порядке столбцов VACANCY_COLUMNS.
+    :param batch_size: Количество строк в одной пачке.
+    :param method: Способ загрузки - 'copy' (COPY FROM STDIN) или 'values' (execute_values).
+    """
+
+    if method not in ("copy", "values"):
+        raise ValueError(f"Неизвестный способ загрузки: {method}")
+
+    rows = ((*row, content_hash(row)) for row in rows)
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            batches = iter(lambda: list(islice(rows, batch_size)), [])
 
-                salary_min = salary.get("from")
+            for batch in batches:
+                metrics.inc("hh_db_rows_total", len(batch), table="vacancies")
 
-                if salary_min is None:
-                    salary_min = 0
+                if method == "copy":
+                    buffer = rows_to_copy_buffer(batch)
 
-                salary_max = salary.get("to")
+                    if metrics.is_enabled():
+                        metrics.inc("hh_db_copy_bytes_total", len(buffer.getvalue().encode()), table="vacancies")
 
-                if salary_max is None:
-                    salary_max = 0
+                    try:
+                        cur.execute("SAVEPOINT vacancies_copy;")
+                        cur.copy_expert(VACANCIES_COPY_QUERY, buffer)
+                        cur.execute("RELEASE SAVEPOINT vacancies_copy;")
 
-                query = (f"INSERT INTO vacancies (vacancy_id, company_id, vacancy_name, salary_min, salary_max, "
-                         f"currency, url) VALUES ({item.get("id")}, {company_id}, \'{item.get("name")}\', "
-                         f"{salary_min}, {salary_max}, \'{salary.get("currency", "Не задано")}\', "
-                         f"\'{item.get("url")}\');")
-                cur.execute(query)
+                        continue
+                    except psycopg2.NotSupportedError:
+                        cur.execute("ROLLBACK TO SAVEPOINT vacancies_copy;")
+                        method = "values"
 
-    conn.close()
+                execute_values(cur, VACANCIES_INSERT_QUERY, batch, page_size=batch_size)
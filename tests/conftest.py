@@ -0,0 +1,174 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+
+class MockHHServer:
+    """
+    Локальный HTTP-сервер, имитирующий API hh.ru (эндпоинты /vacancies, /employers и /employers/{id}).
+
+    Задержка ответов задаётся атрибутом delay, ошибки - методом fail. Как и настоящий API, /vacancies отдаёт
+    не более max_results элементов, сообщая в 'found' их полное количество.
+    """
+
+    def __init__(self) -> None:
+        self.vacancies = {}
+        self.employers = {}
+        self.delay = 0.0
+        self.max_results = 2000
+        self.faults = []
+        self.requests = []
+        self.statuses = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+                try:
+                    status, body = server.handle(self.path)
+                    time.sleep(server.delay)
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+                fault = server.take_fault(urlparse(self.path).path)
+
+                if fault is not None:
+                    status, body = fault[0], {"errors": [{"type": "injected"}]}
+
+                payload = json.dumps(body).encode()
+                etag = f'"{hashlib.md5(payload).hexdigest()}"'
+
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    server.statuses.append(304)
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+
+                    return
+
+                server.statuses.append(status)
+                self.send_response(status)
+
+                if fault is not None and fault[1] is not None:
+                    self.send_header("Retry-After", str(fault[1]))
+
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        # Потоки обработчиков дожидаются в stop, чтобы медленные ответы не переживали тест.
+        self.httpd.daemon_threads = False
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def handle(self, path: str) -> tuple[int, dict]:
+        """
+        Формирует ответ на запрос по его пути.
+        """
+
+        parsed = urlparse(path)
+        params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+
+        with self.lock:
+            self.requests.append((parsed.path, params))
+
+        if parsed.path == "/vacancies":
+            found = self.vacancies.get(int(params["employer_id"]), [])
+            items = found[:self.max_results]
+            per_page = int(params.get("per_page", 20))
+            page = int(params.get("page", 0))
+            pages = max(1, -(-len(items) // per_page))
+
+            return 200, {"items": items[page * per_page:(page + 1) * per_page], "found": len(found),
+                         "pages": pages, "page": page, "per_page": per_page}
+
+        if parsed.path == "/employers":
+            ids = sorted(self.employers)
+            per_page = int(params.get("per_page", 20))
+            page = int(params.get("page", 0))
+
+            return 200, {"items": [{"id": str(company_id), "name": self.employers[company_id].get("name")}
+                                   for company_id in ids[page * per_page:(page + 1) * per_page]],
+                         "found": len(ids), "pages": max(1, -(-len(ids) // per_page)), "page": page}
+
+        if parsed.path.startswith("/employers/"):
+            employer = self.employers.get(int(parsed.path.rsplit("/", 1)[1]))
+
+            if employer is None:
+                return 404, {"errors": [{"type": "not_found"}]}
+
+            return 200, employer
+
+        return 404, {}
+
+    def fail(self, path: str, status: int, times: int = 1, retry_after: int | None = None) -> None:
+        """
+        Заставляет сервер ответить times раз кодом status на запросы, путь которых начинается с path.
+        """
+
+        with self.lock:
+            self.faults.extend([(path, status, retry_after)] * times)
+
+    def take_fault(self, path: str) -> tuple[int, int | None] | None:
+        """
+        Извлекает первую ошибку, назначенную для пути запроса.
+        """
+
+        with self.lock:
+            for index, (prefix, status, retry_after) in enumerate(self.faults):
+                if path.startswith(prefix):
+                    del self.faults[index]
+
+                    return status, retry_after
+
+        return None
+
+    def start(self) -> None:
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def hh_server():
+    """
+    Запускает локальный mock-сервер API hh.ru на время теста.
+    """
+
+    server = MockHHServer()
+    server.start()
+
+    yield server
+
+    server.stop()
+
+
+@pytest.fixture
+def db_pool():
+    """
+    Подменяет общий пул подключений mock-объектом; курсор доступен как pool.getconn().cursor().__enter__().
+    """
+
+    with patch('src.db.get_pool') as mock_get_pool, patch('src.dbmanager.get_pool', mock_get_pool):
+        yield mock_get_pool.return_value
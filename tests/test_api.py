@@ -0,0 +1,230 @@
+import asyncio
+import json
+import socket
+from decimal import Decimal
+from http.client import HTTPConnection
+from configparser import ConfigParser
+from typing import Callable
+
+from benchmarks.load_test import load_test
+from src import api
+from src.api import QueryServer
+
+
+def serve(scenario: Callable[[int], object], workers: int = 4):
+    """
+    Запускает сервер API на свободном порту и выполняет в отдельном потоке сценарий, получающий номер порта.
+    """
+
+    async def main():
+        server = QueryServer(port=0, workers=workers)
+        await server.start()
+
+        try:
+            return await asyncio.to_thread(scenario, server.port)
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def get(connection: HTTPConnection, path: str, method: str = "GET") -> tuple[int, dict, bytes]:
+    connection.request(method, path)
+    response = connection.getresponse()
+
+    return response.status, dict(response.getheaders()), response.read()
+
+
+def test_api_returns_query_results_as_json(db_pool):
+    """
+    Тест проверяет ответы эндпоинтов и возврат подключений в пул после каждого запроса.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value
+    cur.fetchall.return_value = [("XYZ", 12)]
+    cur.fetchone.return_value = (Decimal("150000.50"),)
+
+    def scenario(port: int):
+        connection = HTTPConnection("127.0.0.1", port)
+
+        return get(connection, "/companies"), get(connection, "/salary/average")
+
+    (status, headers, body), (_, _, average) = serve(scenario)
+
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/json")
+    assert json.loads(body) == {"items": [{"company_name": "XYZ", "vacancies_count": 12}]}
+    assert json.loads(average) == {"avg_salary": 150000.5}
+    assert db_pool.putconn.call_count == db_pool.getconn.call_count == 2
+
+
+def test_api_paginates_vacancies(db_pool):
+    """
+    Тест проверяет постраничную выдачу по ключу: полная страница содержит next_after_id, неполная - нет.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value
+    cur.fetchall.side_effect = [
+        [(7, "XYZ", "Developer", 100, 200, "RUR", "url7"), (9, "XYZ", "Analyst", None, None, None, "url9")],
+        [(11, "XYZ", "Tester", 50, None, "RUR", "url11")],
+    ]
+
+    def scenario(port: int):
+        connection = HTTPConnection("127.0.0.1", port)
+
+        return get(connection, "/vacancies?limit=2"), get(connection, "/vacancies?limit=2&after_id=9")
+
+    (_, _, first), (_, _, second) = serve(scenario)
+
+    assert json.loads(first)["next_after_id"] == 9
+    assert json.loads(first)["items"][1] == {"id": 9, "company_name": "XYZ", "vacancy_name": "Analyst",
+                                             "salary_min": None, "salary_max": None, "currency": None, "url": "url9"}
+    assert json.loads(second)["next_after_id"] is None
+    assert cur.execute.call_args.args[1] == (9, 2)
+
+
+def test_api_paginates_vacancies_with_higher_salary(db_pool):
+    """
+    Тест проверяет постраничную выдачу вакансий с зарплатой выше средней по ключу after_id.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value
+    cur.fetchall.side_effect = [[(3, "Developer", Decimal("200000")), (5, "Analyst", Decimal("150000"))], []]
+
+    def scenario(port: int):
+        connection = HTTPConnection("127.0.0.1", port)
+
+        return (get(connection, "/vacancies/higher-salary?limit=2"),
+                get(connection, "/vacancies/higher-salary?limit=2&after_id=5"))
+
+    (_, _, first), (_, _, second) = serve(scenario)
+
+    assert json.loads(first) == {"items": [{"id": 3, "vacancy_name": "Developer", "average_salary": 200000},
+                                           {"id": 5, "vacancy_name": "Analyst", "average_salary": 150000}],
+                                 "next_after_id": 5}
+    assert json.loads(second) == {"items": [], "next_after_id": None}
+    assert cur.execute.call_args.args[1] == {"limit": 2, "after_id": 5}
+
+
+def test_api_streams_large_results(db_pool):
+    """
+    Тест проверяет потоковую выдачу в формате JSON Lines фрагментами и продолжение работы соединения после неё.
+    """
+
+    conn = db_pool.getconn.return_value
+    cur = conn.cursor.return_value
+    rows = [("XYZ", f"Vacancy {index}", 100, 200, "RUR", f"url{index}") for index in range(5)]
+    cur.__iter__.side_effect = lambda: iter(rows)
+    cur.fetchone.return_value = (None,)
+
+    def scenario(port: int):
+        connection = HTTPConnection("127.0.0.1", port)
+
+        return get(connection, "/vacancies?stream=1"), get(connection, "/salary/average")
+
+    (status, headers, body), (next_status, _, _) = serve(scenario)
+    lines = [json.loads(line) for line in body.decode().splitlines()]
+
+    assert status == 200 and next_status == 200
+    assert headers["Transfer-Encoding"] == "chunked"
+    assert [line["vacancy_name"] for line in lines] == [f"Vacancy {index}" for index in range(5)]
+    assert conn.cursor.call_args_list[0].kwargs["name"].startswith("dbmanager_cursor_")
+    cur.close.assert_called()
+    assert db_pool.putconn.call_count == 2
+
+
+def test_api_reports_errors(db_pool):
+    """
+    Тест проверяет коды ответов на некорректные запросы и ошибку базы данных.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value
+    cur.execute.side_effect = RuntimeError("connection lost")
+
+    def scenario(port: int):
+        connection = HTTPConnection("127.0.0.1", port)
+
+        return [get(connection, path, method)[0] for path, method in (
+            ("/vacancies?limit=abc", "GET"),
+            ("/vacancies?limit=100000", "GET"),
+            ("/vacancies/search", "GET"),
+            ("/unknown", "GET"),
+            ("/companies", "POST"),
+            ("/salary/statistics", "GET"),
+        )]
+
+    assert serve(scenario) == [400, 400, 400, 404, 405, 500]
+    assert db_pool.putconn.call_count == db_pool.getconn.call_count == 1
+
+
+def test_api_limits_request_size_and_read_time(db_pool, monkeypatch):
+    """
+    Тест проверяет отказ на запросы со слишком большим числом заголовков или телом и закрытие медленных соединений.
+    """
+
+    monkeypatch.setattr(api, "MAX_HEADERS", 3)
+    monkeypatch.setattr(api, "MAX_BODY_SIZE", 10)
+    monkeypatch.setattr(api, "KEEP_ALIVE_TIMEOUT", 0.2)
+    monkeypatch.setattr(api, "READ_TIMEOUT", 0.2)
+
+    def exchange(port: int, request: bytes) -> bytes:
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+            sock.sendall(request)
+
+            return sock.makefile("rb").read()
+
+    def scenario(port: int):
+        headers = b"".join(b"X-Header-%d: 1\r\n" % number for number in range(4))
+
+        return (
+            exchange(port, b"GET /companies HTTP/1.1\r\n" + headers + b"\r\n"),
+            exchange(port, b"GET /companies HTTP/1.1\r\nContent-Length: 11\r\n\r\n"),
+            exchange(port, b"GET /companies HTTP/1.1\r\nHost: localhost\r\n"),
+            exchange(port, b""),
+        )
+
+    too_many_headers, too_large_body, slow_headers, idle = serve(scenario)
+
+    assert too_many_headers.startswith(b"HTTP/1.1 431 ")
+    assert too_large_body.startswith(b"HTTP/1.1 413 ")
+    assert slow_headers == idle == b""
+    db_pool.getconn.assert_not_called()
+
+
+def test_load_test_reports_latency_percentiles(db_pool):
+    """
+    Тест проверяет, что нагрузочный тест выполняет заданное количество запросов и считает задержки по эндпоинтам.
+    """
+
+    db_pool.getconn.return_value.cursor.return_value.fetchall.return_value = []
+
+    async def main():
+        server = QueryServer(port=0, workers=2)
+        await server.start()
+
+        try:
+            return await load_test(f"http://127.0.0.1:{server.port}/", ["/companies", "/salary/statistics"],
+                                   concurrency=8, duration=0, requests=5)
+        finally:
+            await server.close()
+
+    report = asyncio.run(main())
+
+    assert report["total"]["requests"] == 40 and report["total"]["errors"] == 0
+    assert report["endpoints"]["/companies"]["requests"] == 20
+    assert report["total"]["p50_ms"] <= report["total"]["p99_ms"] <= report["total"]["max_ms"]
+
+
+def test_api_workers_do_not_exceed_pool_size():
+    """
+    Тест проверяет, что количество потоков запросов уменьшается до размера пула подключений.
+    """
+
+    config = ConfigParser()
+    config.read_dict({"Pool": {"maxconn": "4"}, "Api": {"workers": "16"}})
+
+    assert QueryServer.from_config(config).workers == 4
+
+    config.remove_option("Api", "workers")
+
+    assert QueryServer.from_config(config).workers == 4
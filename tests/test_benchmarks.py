@@ -0,0 +1,61 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks import run, synthetic
+from src.utils import normalize_vacancy
+
+
+def test_synthetic_pages_cover_all_vacancies():
+    """
+    Тест проверяет, что страницы синтетического ответа /vacancies содержат все вакансии компании без повторов
+    и нормализуются в строки таблицы.
+    """
+
+    total = synthetic.company_vacancies_count(1, 1005, 10)
+    pages = [synthetic.vacancies_page(1, page, 20, total) for page in range(6)]
+    ids = [item["id"] for page in pages for item in page["items"]]
+
+    assert total == 101 and pages[0]["pages"] == 6
+    assert len(ids) == len(set(ids)) == 101
+    assert sum(1 for _ in synthetic.iter_vacancies(1005, 10)) == 1005
+    assert all(len(normalize_vacancy(1, item)) == 8 for page in pages for item in page["items"])
+
+
+def test_benchmark_run_reports_stages(tmp_path, capsys):
+    """
+    Тест проверяет, что набор бенчмарков сохраняет результаты в JSON и находит замедление при сравнении.
+    """
+
+    output = tmp_path / "results.json"
+
+    assert run.main(["--vacancies", "300", "--companies", "3", "--stages", "fetch,transform",
+                     "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+
+    assert report["meta"]["vacancies"] == 300
+    assert report["results"]["fetch"]["items"] == 300
+    assert report["results"]["transform"]["items"] == 300
+
+    baseline = {"results": {"fetch": {"seconds": report["results"]["fetch"]["seconds"] / 10}}}
+
+    assert run.compare(report, baseline, 0.2) == ["fetch"]
+
+
+def test_benchmark_run_requires_opt_in_for_destructive_stages():
+    """
+    Тест проверяет, что по умолчанию выполняются только стадии без базы данных, а стадии, очищающие таблицы,
+    запускаются только с флагом --destructive.
+    """
+
+    assert run.DEFAULT_STAGES == ["fetch", "transform"]
+
+    with patch("benchmarks.run.clear_tables") as mock_clear, patch("benchmarks.run.run") as mock_run:
+        for stages in ("load", "fetch,pipeline", "snapshot"):
+            with pytest.raises(SystemExit):
+                run.main(["--stages", stages])
+
+        mock_run.assert_not_called()
+        mock_clear.assert_not_called()
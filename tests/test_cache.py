@@ -0,0 +1,129 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.cache import CacheMissError, ResponseCache, cached_get, revalidate
+from src.fetcher import iter_vacancies
+
+
+@pytest.fixture
+def cache():
+    """
+    Кэш ответов в памяти.
+    """
+
+    response_cache = ResponseCache(":memory:")
+
+    yield response_cache
+
+    response_cache.close()
+
+
+def test_cached_get_serves_fresh_response_from_cache(hh_server, cache):
+    """
+    Тест проверяет, что свежий ответ повторно отдаётся из кэша без обращения к серверу.
+    """
+
+    hh_server.employers = {1: {'name': 'XYZ'}}
+    url = f"{hh_server.base_url}employers/1"
+
+    assert cached_get(url, cache=cache) == {'name': 'XYZ'}
+    assert cached_get(url, cache=cache) == {'name': 'XYZ'}
+    assert len(hh_server.requests) == 1
+
+
+def test_cached_get_revalidates_stale_response(hh_server, cache):
+    """
+    Тест проверяет, что устаревший ответ перепроверяется по ETag и неизменный ресурс стоит ответа 304.
+    """
+
+    hh_server.employers = {1: {'name': 'XYZ'}}
+    url = f"{hh_server.base_url}employers/1"
+    cache.ttl = 0
+
+    cached_get(url, cache=cache)
+    assert cached_get(url, cache=cache) == {'name': 'XYZ'}
+
+    hh_server.employers = {1: {'name': 'New name'}}
+    assert cached_get(url, cache=cache) == {'name': 'New name'}
+
+    assert hh_server.statuses == [200, 304, 200]
+
+
+def test_cache_key_ignores_params_order(cache):
+    """
+    Тест проверяет, что ключ кэша не зависит от порядка параметров.
+    """
+
+    assert cache.make_key("u", {'a': 1, 'b': 2}) == cache.make_key("u", {'b': 2, 'a': 1})
+
+
+def test_cache_evicts_least_recently_used(cache):
+    """
+    Тест проверяет вытеснение давно не использованных записей при превышении размера кэша.
+    """
+
+    cache.max_size = 10
+    cache.put("first", b"12345")
+    cache.put("second", b"12345")
+    cache.get("first")
+    cache.put("third", b"12345")
+
+    assert cache.get("first") is not None
+    assert cache.get("second") is None
+    assert cache.get("third") is not None
+
+
+def test_offline_mode_uses_only_cache(hh_server, cache):
+    """
+    Тест проверяет, что в автономном режиме ответы берутся из кэша, а отсутствующие приводят к CacheMissError.
+    """
+
+    hh_server.vacancies = {1: [{'id': str(i)} for i in range(15)]}
+    list(iter_vacancies(1, base_url=hh_server.base_url, per_page=10, cache=cache))
+    hh_server.requests.clear()
+    cache.offline = True
+    cache.ttl = 0
+
+    assert len(list(iter_vacancies(1, base_url=hh_server.base_url, per_page=10, cache=cache))) == 15
+    assert hh_server.requests == []
+
+    with pytest.raises(CacheMissError):
+        cached_get(f"{hh_server.base_url}employers/2", cache=cache)
+
+
+def test_cache_tracks_total_size_without_scanning(cache):
+    """
+    Тест проверяет, что суммарный размер поддерживается при замене и вытеснении записей, а чтение не пишет в базу.
+    """
+
+    cache.max_size = 12
+    cache.put("first", b"12345")
+    cache.put("first", b"1234567")
+    cache.put("second", b"12345")
+    changes = cache.conn.total_changes
+
+    assert cache.get("first") is not None
+    assert cache.conn.total_changes == changes
+
+    cache.put("third", b"1")
+
+    assert cache.get("second") is None
+    assert cache.conn.execute("SELECT total FROM cache_size;").fetchone()[0] == \
+        cache.conn.execute("SELECT SUM(size) FROM responses;").fetchone()[0] == 8
+
+
+def test_revalidate_retries_unconditionally_after_304_without_entry(cache):
+    """
+    Тест проверяет, что ответ 304 при отсутствии сохранённого тела приводит к повторному безусловному запросу.
+    """
+
+    client = MagicMock()
+    not_modified = MagicMock(status_code=304)
+    ok = MagicMock(status_code=200, content=b'{"name": "XYZ"}', headers={})
+    ok.json.return_value = {"name": "XYZ"}
+    client.get.side_effect = [not_modified, ok]
+
+    assert revalidate("http://hh/employers/1", None, cache, client) == {"name": "XYZ"}
+    assert client.get.call_count == 2
+    assert cache.get("http://hh/employers/1")[0] == b'{"name": "XYZ"}'
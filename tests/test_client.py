@@ -0,0 +1,230 @@
+import asyncio
+import time
+from unittest.mock import call, patch
+
+import pytest
+
+from src.client import CircuitBreaker, CircuitOpenError, HHAPIError, HHClient, parse_retry_after
+from src.fetcher import fetch_companies
+from src.pipeline import Pipeline
+
+
+@pytest.fixture
+def client():
+    """
+    Клиент с короткими задержками повторов.
+    """
+
+    hh_client = HHClient(read_timeout=1.0, retries=3, backoff=0.01, max_backoff=2.0)
+
+    yield hh_client
+
+    hh_client.close()
+
+
+def test_client_retries_server_errors(hh_server, client):
+    """
+    Тест проверяет, что ответы 5xx повторяются, пока сервер не ответит успешно.
+    """
+
+    hh_server.employers = {1: {'name': 'XYZ'}}
+    hh_server.fail("/employers", 503, times=2)
+
+    assert client.get_json(f"{hh_server.base_url}employers/1") == {'name': 'XYZ'}
+    assert hh_server.statuses == [503, 503, 200]
+
+
+def test_client_honours_retry_after(hh_server, client):
+    """
+    Тест проверяет, что после ответа 429 повтор выполняется не раньше, чем указано в Retry-After.
+    """
+
+    hh_server.employers = {1: {'name': 'XYZ'}}
+    hh_server.fail("/employers", 429, retry_after=1)
+
+    with patch('src.client.time.sleep') as mock_sleep:
+        client.get_json(f"{hh_server.base_url}employers/1")
+
+    assert call(1.0) in mock_sleep.call_args_list
+    assert hh_server.statuses == [429, 200]
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+def test_client_gives_up_on_long_retry_after(hh_server, client):
+    """
+    Тест проверяет, что Retry-After больше max_backoff не приводит к ожиданию, а запрос завершается ошибкой.
+    """
+
+    hh_server.fail("/employers", 429, retry_after=3600)
+
+    with pytest.raises(HHAPIError) as exc_info:
+        client.get_json(f"{hh_server.base_url}employers/1")
+
+    assert exc_info.value.status == 429
+    assert len(hh_server.requests) == 1
+
+
+def test_client_does_not_retry_client_errors(hh_server, client):
+    """
+    Тест проверяет, что ответ 404 сразу завершается ошибкой с кодом ответа.
+    """
+
+    with pytest.raises(HHAPIError) as exc_info:
+        client.get_json(f"{hh_server.base_url}employers/404")
+
+    assert exc_info.value.status == 404
+    assert len(hh_server.requests) == 1
+
+
+def test_client_read_timeout(hh_server):
+    """
+    Тест проверяет, что медленный ответ прерывается по таймауту чтения, а не блокирует загрузку.
+    """
+
+    hh_server.employers = {1: {'name': 'XYZ'}}
+    hh_server.delay = 0.5
+    slow_client = HHClient(read_timeout=0.1, retries=1, backoff=0.01)
+    start = time.monotonic()
+
+    with pytest.raises(HHAPIError):
+        slow_client.get_json(f"{hh_server.base_url}employers/1")
+
+    assert time.monotonic() - start < 1.0
+    assert len(hh_server.requests) == 2
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """
+    Тест проверяет, что цепь размыкается после серии неудач и пропускает пробную попытку после reset_timeout.
+    """
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    time.sleep(0.06)
+    breaker.allow()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record_success()
+    breaker.allow()
+
+    assert not breaker.is_open
+
+
+def test_client_fails_fast_when_circuit_is_open(hh_server):
+    """
+    Тест проверяет, что при разомкнутой цепи запросы не отправляются на сервер.
+    """
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    hh_client = HHClient(retries=5, backoff=0.01, breaker=breaker)
+    hh_server.fail("/employers", 500, times=10)
+
+    with pytest.raises(CircuitOpenError):
+        hh_client.get_json(f"{hh_server.base_url}employers/1")
+
+    assert len(hh_server.requests) == 2
+
+
+def test_rate_limit_responses_do_not_open_circuit(hh_server):
+    """
+    Тест проверяет, что ответы 429 не размыкают цепь: сервер доступен, а ожидание задаёт Retry-After.
+    """
+
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    hh_client = HHClient(retries=5, backoff=0.01, breaker=breaker)
+    hh_server.employers = {1: {'name': 'XYZ'}}
+    hh_server.fail("/employers", 429, times=4, retry_after=0)
+
+    assert hh_client.get_json(f"{hh_server.base_url}employers/1") == {'name': 'XYZ'}
+    assert not breaker.is_open and breaker.failures == 0
+
+
+def test_pipeline_waits_for_open_circuit(hh_server):
+    """
+    Тест проверяет, что при разомкнутой цепи конвейер ждёт пробной попытки, а не записывает компании в ошибки.
+    """
+
+    hh_server.vacancies = {company_id: [{'id': str(company_id)}] for company_id in (1, 2, 3)}
+    hh_server.employers = {company_id: {'name': str(company_id)} for company_id in (1, 2, 3)}
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    hh_client = HHClient(retries=0, breaker=breaker)
+    breaker.record_failure()
+
+    with patch('src.pipeline.begin_stage'), patch('src.pipeline.stage_vacancy_rows'), \
+            patch('src.pipeline.sync_company', return_value={'unchanged': 1}), \
+            patch('src.pipeline.apply_stage', return_value={}) as mock_apply:
+        pipeline = Pipeline([1, 2, 3], client=hh_client, base_url=hh_server.base_url, requests_per_second=1000)
+        pipeline.run()
+
+    assert pipeline.failures == {}
+    assert sorted(mock_apply.call_args.args[0]) == [1, 2, 3]
+
+
+def test_pipeline_stops_waiting_after_failed_probes(hh_server, monkeypatch):
+    """
+    Тест проверяет, что после серии неудачных пробных попыток подряд конвейер перестаёт ждать восстановления API,
+    а оставшиеся компании сразу попадают в отчёт failures.
+    """
+
+    monkeypatch.setattr('src.pipeline.MAX_FAILED_PROBES', 2)
+    hh_server.employers = {company_id: {'name': str(company_id)} for company_id in range(1, 21)}
+    hh_server.fail("/employers", 500, times=100)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    hh_client = HHClient(retries=0, breaker=breaker)
+    breaker.record_failure()
+
+    with patch('src.pipeline.begin_stage'), patch('src.pipeline.stage_vacancy_rows'), \
+            patch('src.pipeline.sync_company'), patch('src.pipeline.apply_stage', return_value={}) as mock_apply:
+        pipeline = Pipeline(range(1, 21), client=hh_client, base_url=hh_server.base_url, requests_per_second=1000)
+        pipeline.run()
+
+    assert sorted(pipeline.failures) == list(range(1, 21))
+    assert breaker.failed_probes >= 2
+    assert len(hh_server.requests) < 5
+    assert mock_apply.call_args.args[0] == []
+
+
+def test_fetch_companies_reports_failed_companies(hh_server, client):
+    """
+    Тест проверяет, что ошибка одной компании попадает в отчёт и не мешает загрузке остальных.
+    """
+
+    hh_server.employers = {1: {'name': 'First'}}
+    failures = {}
+
+    result = asyncio.run(fetch_companies([1, 2], base_url=hh_server.base_url, requests_per_second=1000,
+                                         client=client, failures=failures))
+
+    assert list(result) == [1]
+    assert list(failures) == [2] and failures[2].status == 404
+
+
+def test_pipeline_reports_failed_companies(hh_server, client):
+    """
+    Тест проверяет, что конвейер продолжает работу после ошибки загрузки компании и не считает её вакансии
+    полностью загруженными.
+    """
+
+    hh_server.vacancies = {1: [{'id': '1'}], 2: [{'id': '2'}]}
+    hh_server.employers = {1: {'name': 'First'}, 2: {'name': 'Second'}}
+    hh_server.fail("/vacancies", 500, times=4)
+
+    with patch('src.pipeline.begin_stage'), patch('src.pipeline.stage_vacancy_rows'), \
+            patch('src.pipeline.sync_company', return_value={'unchanged': 1}), \
+            patch('src.pipeline.apply_stage', return_value={}) as mock_apply:
+        pipeline = Pipeline([1, 2], client=client, base_url=hh_server.base_url, fetch_workers=1,
+                            requests_per_second=1000)
+        pipeline.run()
+
+    assert list(pipeline.failures) == [1]
+    assert mock_apply.call_args.args[0] == [2]
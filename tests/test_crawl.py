@@ -0,0 +1,144 @@
+import argparse
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+
+from src.client import HHAPIError, HHClient
+from src.crawl import Shard, CrawlState, crawl, discover_employers, main, read_employer_ids
+from src.fetcher import iter_employer_ids
+
+
+class FakePipeline:
+    """
+    Конвейер-заглушка: запоминает пачки компаний, завершает загрузку failing с ошибкой и прерывается на пачке
+    с номером interrupt_at.
+    """
+
+    chunks = []
+    failing = set()
+    interrupt_at = None
+
+    def __init__(self, company_ids, full=False, **options) -> None:
+        self.company_ids = list(company_ids)
+        self.failures = {company_id: HHAPIError("HTTP 503", 503)
+                         for company_id in self.company_ids if company_id in self.failing}
+
+    def run(self) -> dict:
+        if len(self.chunks) == self.interrupt_at:
+            raise KeyboardInterrupt
+
+        self.chunks.append(self.company_ids)
+
+        return {"companies": Counter(inserted=len(self.company_ids)), "vacancies": Counter()}
+
+
+@pytest.fixture
+def fake_pipeline(db_pool):
+    FakePipeline.chunks, FakePipeline.failing, FakePipeline.interrupt_at = [], set(), None
+
+    with patch("src.crawl.Pipeline", FakePipeline):
+        yield FakePipeline
+
+
+def test_shard_parse_and_split():
+    """
+    Тест проверяет разбор шарда i/N и то, что деление шарда на части сохраняет его компании без пересечений.
+    """
+
+    shard = Shard.parse("1/3")
+    parts = shard.split(2)
+
+    assert [str(part) for part in parts] == ["1/6", "4/6"]
+    assert [company_id for company_id in range(20) if company_id in shard] == \
+        sorted(company_id for part in parts for company_id in range(20) if company_id in part)
+
+    for spec in ("3/3", "1", "a/2"):
+        with pytest.raises(ValueError):
+            Shard.parse(spec)
+
+
+def test_read_employer_ids_skips_comments(tmp_path):
+    """
+    Тест проверяет чтение идентификаторов из файла с комментариями, пустыми строками и дополнительными полями.
+    """
+
+    path = tmp_path / "employers.txt"
+    path.write_text("# банки\n1942330\n\n49357, Тинькофф\n  78638 Сбер\n", encoding="utf-8")
+
+    assert list(read_employer_ids(str(path))) == [1942330, 49357, 78638]
+
+
+def test_iter_employer_ids_pages_search(hh_server):
+    """
+    Тест проверяет постраничное получение идентификаторов работодателей из поиска /employers.
+    """
+
+    hh_server.employers = {company_id: {"name": f"Company {company_id}"} for company_id in (5, 3, 8, 1, 9)}
+    client = HHClient(retries=0)
+
+    ids = list(iter_employer_ids({"text": "банк"}, hh_server.base_url, per_page=2, client=client))
+
+    assert ids == [1, 3, 5, 8, 9]
+    assert [params["page"] for path, params in hh_server.requests] == ["0", "1", "2"]
+    assert all(params["text"] == "банк" for _, params in hh_server.requests)
+
+
+def test_crawl_resumes_from_checkpoint(tmp_path, fake_pipeline):
+    """
+    Тест проверяет, что после прерывания повторный обход пропускает загруженные пачки, а компании с ошибками
+    загружаются заново.
+    """
+
+    path = str(tmp_path / "state" / "shard-0-of-1.txt")
+    fake_pipeline.failing = {4}
+    fake_pipeline.interrupt_at = 2
+
+    with CrawlState(path) as state, pytest.raises(KeyboardInterrupt):
+        crawl(iter(range(1, 11)), state, chunk_size=3)
+
+    assert fake_pipeline.chunks == [[1, 2, 3], [4, 5, 6]]
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("7")  # незавершённая запись при аварийном завершении
+
+    fake_pipeline.failing, fake_pipeline.interrupt_at = set(), None
+
+    with CrawlState(path) as state:
+        assert sorted(state.done) == [1, 2, 3, 5, 6]
+
+        report = crawl(iter([1, 2, 3, 4, 5, 6, 7, 7, 8, 9, 10]), state, chunk_size=3)
+
+    assert fake_pipeline.chunks[2:] == [[4, 7, 8], [9, 10]]
+    assert report["done"] == 5 and report["skipped"] == 5 and report["failures"] == {}
+    assert report["companies"]["inserted"] == 5
+    assert sorted(CrawlState(path).done) == list(range(1, 11))
+
+
+def test_discover_employers_saves_shard_ids_once(tmp_path, hh_server):
+    """
+    Тест проверяет, что поиск работодателей выполняется один раз, а в файл попадают только компании шарда.
+    """
+
+    hh_server.employers = {company_id: {"name": f"Company {company_id}"} for company_id in range(1, 11)}
+    args = argparse.Namespace(employers_file=None, search="банк", area=None, base_url=hh_server.base_url,
+                              requests_per_second=1000)
+    path = str(tmp_path / "state" / "employers-1-of-2.txt")
+
+    discover_employers(args, Shard(1, 2), path, client=HHClient(retries=0))
+
+    assert list(read_employer_ids(path)) == [1, 3, 5, 7, 9]
+    assert len(hh_server.requests) == 1
+
+
+def test_crawl_rejects_empty_chunks(tmp_path):
+    """
+    Тест проверяет, что нулевой или отрицательный размер пачки отклоняется, а не приводит к пустому обходу.
+    """
+
+    with CrawlState(str(tmp_path / "shard-0-of-1.txt")) as state, pytest.raises(ValueError):
+        crawl(iter([1, 2]), state, chunk_size=0)
+
+    for option in ("--chunk-size", "--processes"):
+        with pytest.raises(SystemExit):
+            main(["--employers-file", "employers.txt", option, "0"])
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from src.currency import load_rates, rates_from_dictionaries, salary_midpoint
+
+
+DICTIONARIES = {'currency': [
+    {'code': 'RUR', 'abbr': '₽', 'name': 'Рубли', 'default': True, 'rate': 1.0},
+    {'code': 'USD', 'abbr': '$', 'name': 'Доллары', 'default': False, 'rate': 0.0125},
+    {'code': 'KZT', 'abbr': '₸', 'name': 'Тенге', 'default': False, 'rate': 5.0},
+]}
+
+
+def test_rates_from_dictionaries():
+    """
+    Тест проверяет пересчёт курсов справочника hh.ru (единиц валюты за рубль) в коэффициенты к базовой валюте.
+    """
+
+    rates = rates_from_dictionaries(DICTIONARIES)
+
+    assert rates == {'RUR': 1.0, 'USD': 80.0, 'KZT': 0.2}
+    assert rates_from_dictionaries(DICTIONARIES, base='USD')['RUR'] == pytest.approx(0.0125)
+
+
+def test_rates_from_dictionaries_without_base():
+    """
+    Тест проверяет, что отсутствие базовой валюты в справочнике приводит к ошибке.
+    """
+
+    with pytest.raises(ValueError):
+        rates_from_dictionaries(DICTIONARIES, base='EUR')
+
+
+def test_load_rates_from_file(tmp_path):
+    """
+    Тест проверяет загрузку курсов из сохранённого ответа /dictionaries.
+    """
+
+    path = tmp_path / "dictionaries.json"
+    path.write_text(json.dumps(DICTIONARIES), encoding="utf-8")
+
+    assert load_rates(str(path))['KZT'] == 0.2
+
+
+def test_load_rates_from_api(hh_server, monkeypatch):
+    """
+    Тест проверяет загрузку курсов из справочника API.
+    """
+
+    monkeypatch.setattr(hh_server, 'handle', lambda path: (200, DICTIONARIES))
+
+    assert load_rates(base_url=hh_server.base_url)['USD'] == 80.0
+
+
+def test_salary_midpoint():
+    """
+    Тест проверяет середину вилки: обе границы, одна граница, отсутствие зарплаты и неизвестная валюта.
+    """
+
+    rates = {'RUR': 1.0, 'KZT': 0.2}
+
+    assert salary_midpoint(100000, 200000, 'RUR', rates) == 150000
+    assert salary_midpoint(None, 500000, 'KZT', rates) == 100000
+    assert salary_midpoint(None, None, None, rates) is None
+    assert salary_midpoint(1000, 2000, 'EUR', rates) is None
+    assert salary_midpoint(1000, 2000, 'RUR', None) == 1500
@@ -0,0 +1,69 @@
+import pytest
+
+from src.db import connection, get_config, transaction
+from src.utils import clear_tables, insert_companies_into_db
+
+
+def test_get_config_is_cached():
+    """
+    Тест проверяет, что файл настроек разбирается один раз.
+    """
+
+    assert get_config() is get_config()
+    assert get_config().get("Open_db", "database") == "hh_information_db"
+
+
+def test_connection_returns_connection_to_pool(db_pool):
+    """
+    Тест проверяет, что вне транзакции подключение берётся из пула и возвращается обратно.
+    """
+
+    with connection() as conn:
+        assert conn is db_pool.getconn.return_value
+
+    db_pool.putconn.assert_called_once_with(conn)
+
+
+def test_transaction_shares_single_connection(db_pool):
+    """
+    Тест проверяет, что все функции загрузки внутри транзакции используют одно подключение и один COMMIT.
+    """
+
+    with transaction() as conn:
+        clear_tables()
+        insert_companies_into_db(1, {'company_name': 'XYZ', 'company_description': ''})
+
+        with connection() as inner:
+            assert inner is conn
+
+    assert db_pool.getconn.call_count == 1
+    db_pool.putconn.assert_called_once_with(conn)
+    conn.__exit__.assert_called_once_with(None, None, None)
+
+
+def test_clear_tables_does_not_lock_out_readers(db_pool):
+    """
+    Тест проверяет, что очистка таблиц выполняется через DELETE, а не TRUNCATE с исключительной блокировкой.
+    """
+
+    clear_tables()
+
+    cursor = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+    queries = [call.args[0] for call in cursor.execute.call_args_list]
+    assert queries == ["DELETE FROM vacancies;", "DELETE FROM companies;"]
+
+
+def test_transaction_is_not_reentrant(db_pool):
+    """
+    Тест проверяет, что вложенная транзакция в том же потоке запрещена, а состояние потока очищается после ошибки.
+    """
+
+    with transaction():
+        with pytest.raises(RuntimeError):
+            with transaction():
+                pass
+
+    with connection() as conn:
+        assert conn is db_pool.getconn.return_value
+
+    assert db_pool.getconn.call_count == 2
@@ -0,0 +1,84 @@
+from src.dbmanager import DBManager
+
+
+def test_get_vacancies_with_keyword_is_parameterised(db_pool):
+    """
+    Тест проверяет, что строка поиска передаётся параметром и разбивается на слова с поиском по префиксу.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value
+    cur.fetchall.return_value = [('Python-разработчик', 'https://example.com/1')]
+
+    result = DBManager().get_vacancies_with_keyword("python' OR 1=1; --разраб", limit=10, offset=20)
+
+    query, params = cur.execute.call_args.args
+
+    assert result == [('Python-разработчик', 'https://example.com/1')]
+    assert "python" not in query
+    assert params == {'query': "python:* & OR:* & 1:* & 1:* & разраб:*", 'limit': 10, 'offset': 20}
+
+
+def test_get_vacancies_with_keyword_empty_query(db_pool):
+    """
+    Тест проверяет, что строка без слов не приводит к запросу к базе данных.
+    """
+
+    assert DBManager().get_vacancies_with_keyword(" ;' ") == []
+    db_pool.getconn.return_value.cursor.assert_not_called()
+
+
+def test_get_vacancies_with_higher_salary_is_single_query(db_pool):
+    """
+    Тест проверяет, что выборка вакансий выше средней выполняется одним запросом по сохранённой середине вилки.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value
+
+    DBManager().get_vacancies_with_higher_salary(50, after_id=7)
+
+    assert cur.execute.call_count == 1
+    assert "salary_mid > (SELECT avg_salary FROM salary_stats" in cur.execute.call_args.args[0]
+    assert "id > %(after_id)s" in cur.execute.call_args.args[0] and "OFFSET" not in cur.execute.call_args.args[0]
+    assert cur.execute.call_args.args[1] == {'limit': 50, 'after_id': 7}
+
+
+def test_get_avg_salary_without_statistics(db_pool):
+    """
+    Тест проверяет, что при пустой статистике средняя зарплата равна None.
+    """
+
+    db_pool.getconn.return_value.cursor.return_value.fetchone.return_value = None
+
+    assert DBManager().get_avg_salary() is None
+
+
+def test_iter_all_vacancies_uses_server_side_cursor(db_pool):
+    """
+    Тест проверяет, что потоковый вариант использует именованный курсор с заданным itersize и закрывает его.
+    """
+
+    conn = db_pool.getconn.return_value
+    cur = conn.cursor.return_value
+    cur.__iter__.return_value = iter([('XYZ', 'Developer', 100, 200, 'RUR', 'url')])
+
+    result = list(DBManager(itersize=500).iter_all_vacancies())
+
+    assert result == [('XYZ', 'Developer', 100, 200, 'RUR', 'url')]
+    assert conn.cursor.call_args.kwargs['name'].startswith('dbmanager_cursor_')
+    assert cur.itersize == 500
+    cur.close.assert_called_once()
+
+
+def test_get_vacancies_page_uses_keyset_pagination(db_pool):
+    """
+    Тест проверяет постраничную выборку по ключу: следующая страница начинается после id последней вакансии.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value
+
+    DBManager().get_vacancies_page(limit=50, after_id=1200)
+
+    query, params = cur.execute.call_args.args
+
+    assert "WHERE vacancies.id > %s ORDER BY vacancies.id LIMIT %s" in query
+    assert params == (1200, 50)
@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+
+from src.fetcher import RateLimiter, fetch_companies, fetch_vacancies_page, iter_vacancies
+
+
+def test_fetch_companies_returns_data_for_each_company(hh_server):
+    """
+    Тест проверяет, что для каждой компании возвращаются вакансии и описание работодателя в исходном порядке.
+    """
+
+    hh_server.vacancies = {1: [{'id': '10', 'name': 'Developer'}], 2: [{'id': '20', 'name': 'Tester'}]}
+    hh_server.employers = {1: {'name': 'First', 'description': ''}, 2: {'name': 'Second', 'description': ''}}
+
+    result = asyncio.run(fetch_companies([2, 1], base_url=hh_server.base_url))
+
+    assert list(result) == [2, 1]
+    assert result[1][0]['items'] == [{'id': '10', 'name': 'Developer'}]
+    assert result[2][1]['name'] == 'Second'
+    assert len(hh_server.requests) == 4
+
+
+def test_fetch_companies_returns_all_pages(hh_server):
+    """
+    Тест проверяет, что для компании с несколькими страницами вакансий возвращаются вакансии со всех страниц.
+    """
+
+    hh_server.vacancies = {1: [{'id': str(i)} for i in range(250)]}
+    hh_server.employers = {1: {'name': 'First'}}
+
+    result = asyncio.run(fetch_companies([1], base_url=hh_server.base_url, requests_per_second=1000))
+
+    assert [item['id'] for item in result[1][0]['items']] == [str(i) for i in range(250)]
+
+
+def test_fetch_companies_respects_concurrency_limit(hh_server):
+    """
+    Тест проверяет, что число одновременных запросов не превышает max_concurrency, но запросы идут параллельно.
+    """
+
+    company_ids = list(range(1, 9))
+    hh_server.employers = {company_id: {'name': str(company_id)} for company_id in company_ids}
+    hh_server.delay = 0.05
+
+    asyncio.run(fetch_companies(company_ids, base_url=hh_server.base_url, max_concurrency=3,
+                                requests_per_second=1000))
+
+    assert 1 < hh_server.max_in_flight <= 3
+
+
+def test_rate_limiter_limits_request_rate():
+    """
+    Тест проверяет, что после исчерпания бакета токены выдаются не чаще заданной частоты.
+    """
+
+    async def acquire_many(limiter: RateLimiter, count: int) -> float:
+        start = time.monotonic()
+
+        for _ in range(count):
+            await limiter.acquire()
+
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(acquire_many(RateLimiter(20, capacity=1), 5))
+
+    assert elapsed >= 0.18
+
+
+def test_rate_limiter_rejects_non_positive_rate():
+    """
+    Тест проверяет, что нулевая частота запросов недопустима.
+    """
+
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_iter_vacancies_follows_all_pages(hh_server):
+    """
+    Тест проверяет, что генератор выдаёт вакансии со всех страниц, а не только с первой.
+    """
+
+    hh_server.vacancies = {1: [{'id': str(i)} for i in range(250)]}
+
+    items = list(iter_vacancies(1, base_url=hh_server.base_url, per_page=100))
+
+    assert [item['id'] for item in items] == [str(i) for i in range(250)]
+    assert [params['page'] for _, params in hh_server.requests] == ['0', '1', '2']
+
+
+def test_iter_vacancies_reuses_first_page(hh_server):
+    """
+    Тест проверяет, что уже полученная первая страница не запрашивается повторно.
+    """
+
+    hh_server.vacancies = {1: [{'id': str(i)} for i in range(15)]}
+    first_page = fetch_vacancies_page(1, 0, base_url=hh_server.base_url, per_page=10)
+    hh_server.requests.clear()
+
+    items = list(iter_vacancies(1, base_url=hh_server.base_url, per_page=10, first_page=first_page))
+
+    assert len(items) == 15
+    assert [params['page'] for _, params in hh_server.requests] == ['1']
+
+
+def test_iter_vacancies_prefetches_next_page(hh_server):
+    """
+    Тест проверяет, что следующая страница запрашивается, пока обрабатывается текущая.
+    """
+
+    hh_server.vacancies = {1: [{'id': str(i)} for i in range(20)]}
+    vacancies = iter_vacancies(1, base_url=hh_server.base_url, per_page=10)
+
+    next(vacancies)
+    deadline = time.monotonic() + 2
+
+    while len(hh_server.requests) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(hh_server.requests) == 2
+
+    vacancies.close()
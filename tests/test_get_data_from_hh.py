@@ -10,7 +10,8 @@ def test_get_data_from_hh_empty():
     Тест с пустым списком идентификаторов. Проверяет, что возвращается пустой словарь.
     """
 
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = {}
 
         assert get_data_from_hh([]) == {}
@@ -26,7 +27,8 @@ def test_get_data_from_hh_single_id():
             {'id': '1', 'title': 'Developer'}
         ]}
 
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value.status_code = 200
         mock_get.return_value.json.return_value = expected_data
         result = get_data_from_hh([company_id])
 
@@ -40,7 +42,7 @@ def test_get_data_from_hh_failed_request():
 
     company_ids = [123]
 
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         mock_get.side_effect = Exception("Network Failure")
 
         with pytest.raises(Exception) as exc_info:
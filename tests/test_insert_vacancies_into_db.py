@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import patch, call
+
+import psycopg2
+
+from src.utils import (content_hash, insert_vacancies_into_db, normalize_vacancy, rows_to_copy_buffer,
+                       VACANCIES_COPY_QUERY)
+
+
+def test_normalize_vacancy_without_salary():
+    """
+    Тест проверяет, что неуказанная зарплата сохраняется как NULL, а не как 0.
+    """
+
+    item = {'id': '1', 'name': 'Developer', 'salary': None, 'url': 'https://example.com/1'}
+
+    assert normalize_vacancy(5, item) == ('1', 5, 'Developer', None, None, None, 'https://example.com/1', None)
+
+
+def test_normalize_vacancy_converts_salary_midpoint():
+    """
+    Тест проверяет пересчёт середины вилки в базовую валюту, в том числе при одной указанной границе.
+    """
+
+    rates = {'RUR': 1.0, 'USD': 90.0}
+    item = {'id': '1', 'name': 'Developer', 'salary': {'from': 1000, 'to': 3000, 'currency': 'USD'}, 'url': ''}
+    one_bound = {'id': '2', 'name': 'Tester', 'salary': {'from': None, 'to': 50000, 'currency': 'RUR'}, 'url': ''}
+
+    assert normalize_vacancy(5, item, rates)[-1] == 180000
+    assert normalize_vacancy(5, one_bound, rates)[3:] == (None, 50000, 'RUR', '', 50000)
+
+
+def test_rows_to_copy_buffer_escapes_special_characters():
+    """
+    Тест проверяет экранирование кавычек, табуляции, переводов строк и обратной косой черты в формате COPY.
+    """
+
+    buffer = rows_to_copy_buffer([('1', "O'Reilly\tdev\nops\\", None)])
+
+    assert buffer.read() == "1\tO'Reilly\\tdev\\nops\\\\\t\\N\n"
+
+
+def test_insert_vacancies_into_db_uses_copy_in_batches(db_pool):
+    """
+    Тест проверяет, что вакансии загружаются пачками через COPY FROM STDIN вместе с хэшем содержимого.
+    """
+
+    items = ({'id': str(i), 'name': f'Vacancy {i}', 'url': ''} for i in range(5))
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+    insert_vacancies_into_db(7, items, batch_size=2)
+
+    copy_calls = cur.copy_expert.call_args_list
+    row_hash = content_hash(normalize_vacancy(7, {'id': '4', 'name': 'Vacancy 4', 'url': ''}))
+
+    assert len(copy_calls) == 3
+    assert all(args[0] == VACANCIES_COPY_QUERY for args, _ in copy_calls)
+    assert copy_calls[2][0][1].read() == f"4\t7\tVacancy 4\t\\N\t\\N\t\\N\t\t\\N\t{row_hash}\n"
+
+
+def test_insert_vacancies_into_db_falls_back_to_execute_values(db_pool):
+    """
+    Тест проверяет переход на execute_values, если сервер не поддерживает COPY.
+    """
+
+    items = [{'id': str(i), 'name': f'Vacancy {i}', 'url': ''} for i in range(3)]
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+
+    with patch('src.utils.execute_values') as mock_execute_values:
+        cur.copy_expert.side_effect = psycopg2.NotSupportedError
+        insert_vacancies_into_db(7, items, batch_size=2)
+
+    assert cur.copy_expert.call_count == 1
+    assert call("ROLLBACK TO SAVEPOINT vacancies_copy;") in cur.execute.call_args_list
+    rows = [(*normalize_vacancy(7, item), content_hash(normalize_vacancy(7, item))) for item in items]
+
+    assert [c.args[2] for c in mock_execute_values.call_args_list] == [rows[:2], rows[2:]]
+
+
+def test_insert_vacancies_into_db_unknown_method():
+    """
+    Тест проверяет, что неизвестный способ загрузки отклоняется.
+    """
+
+    with pytest.raises(ValueError):
+        insert_vacancies_into_db(7, [], method='insert')
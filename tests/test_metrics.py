@@ -0,0 +1,192 @@
+import io
+import pstats
+import threading
+from unittest.mock import patch
+from urllib.request import urlopen
+
+import pytest
+
+from src import metrics
+from src.client import HHClient
+from src.pipeline import Pipeline
+from src.utils import remove_html_tags
+
+
+@pytest.fixture
+def enabled_metrics():
+    """
+    Включает сбор метрик на время теста с пустыми значениями.
+    """
+
+    metrics.reset()
+    metrics.enable()
+
+    yield metrics
+
+    metrics.disable()
+    metrics.reset()
+
+
+def test_metrics_disabled_by_default():
+    """
+    Тест проверяет, что при выключенном сборе ничего не записывается, а таймер не создаётся.
+    """
+
+    metrics.inc("hh_test_total")
+
+    with metrics.timer("hh_test_seconds") as timer:
+        pass
+
+    assert timer is None
+    assert metrics.render() == ""
+
+
+def test_render_prometheus_text_format(enabled_metrics):
+    """
+    Тест проверяет формат счётчиков и гистограмм Prometheus, включая накопительные корзины и экранирование меток.
+    """
+
+    metrics.inc("hh_db_rows_total", 5, table="vacancies")
+    metrics.inc("hh_db_rows_total", 2, table="vacancies")
+    metrics.inc("hh_test_total", name='a "b"')
+    metrics.observe("hh_http_request_seconds", 0.003, endpoint="vacancies")
+    metrics.observe("hh_http_request_seconds", 0.2, endpoint="vacancies")
+
+    text = metrics.render()
+
+    assert "# TYPE hh_db_rows_total counter" in text
+    assert 'hh_db_rows_total{table="vacancies"} 7' in text
+    assert 'hh_test_total{name="a \\"b\\""} 1' in text
+    assert "# HELP hh_http_request_seconds" in text
+    assert 'hh_http_request_seconds_bucket{endpoint="vacancies",le="0.005"} 1' in text
+    assert 'hh_http_request_seconds_bucket{endpoint="vacancies",le="0.25"} 2' in text
+    assert 'hh_http_request_seconds_bucket{endpoint="vacancies",le="+Inf"} 2' in text
+    assert 'hh_http_request_seconds_count{endpoint="vacancies"} 2' in text
+
+
+def test_timed_decorator_and_stage(enabled_metrics):
+    """
+    Тест проверяет, что декоратор измеряет вызовы функции, а стадия задаётся отдельно для каждого потока.
+    """
+
+    remove_html_tags("<p>text</p>")
+    stages = []
+
+    def worker():
+        with metrics.stage("fetch"):
+            stages.append(metrics.current_stage())
+
+    with metrics.stage("write"):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        stages.append(metrics.current_stage())
+
+    assert 'hh_function_seconds_count{function="remove_html_tags"} 1' in metrics.render()
+    assert stages == ["fetch", "write"]
+    assert metrics.current_stage() == metrics.DEFAULT_STAGE
+
+
+def test_client_records_http_metrics(hh_server, enabled_metrics):
+    """
+    Тест проверяет учёт задержки, кодов ответа, объёма и повторов HTTP-запросов по эндпоинтам.
+    """
+
+    hh_server.employers = {1: {'name': 'XYZ'}}
+    hh_server.fail("/employers", 503)
+    client = HHClient(backoff=0.01)
+
+    client.get_json(f"{hh_server.base_url}employers/1")
+    text = metrics.render()
+
+    assert 'hh_http_retries_total{endpoint="employers",reason="503"} 1' in text
+    assert 'hh_http_responses_total{endpoint="employers",status="200"} 1' in text
+    assert 'hh_http_request_seconds_count{endpoint="employers"} 2' in text
+    assert 'hh_json_decode_seconds_count 1' in text
+    assert 'hh_http_response_bytes_total{endpoint="employers"}' in text
+
+
+def test_serve_metrics_endpoint(enabled_metrics):
+    """
+    Тест проверяет, что метрики отдаются по HTTP на /metrics.
+    """
+
+    metrics.inc("hh_pipeline_failures_total", reason="HHAPIError")
+    server = metrics.serve(0)
+
+    try:
+        with urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert 'hh_pipeline_failures_total{reason="HHAPIError"} 1' in body
+
+
+def test_dump_metrics_to_file(tmp_path, enabled_metrics):
+    """
+    Тест проверяет сохранение метрик в файл.
+    """
+
+    path = tmp_path / "metrics.prom"
+    metrics.inc("hh_db_rows_total", table="vacancies")
+    metrics.dump(str(path))
+
+    assert path.read_text(encoding="utf-8") == metrics.render()
+
+
+def test_profiling_captures_cpu_and_memory(tmp_path):
+    """
+    Тест проверяет, что режим профилирования сохраняет статистику cProfile и выводит отчёт о выделениях памяти.
+    """
+
+    path = tmp_path / "load.prof"
+    report = io.StringIO()
+
+    with metrics.profiling(str(path), trace_memory=True, stream=report):
+        remove_html_tags("<p>" * 1000)
+
+    assert any("remove_html_tags" in function[2] for function in pstats.Stats(str(path)).stats)
+    assert report.getvalue().startswith("Память:")
+
+
+def test_profiling_merges_worker_threads(tmp_path):
+    """
+    Тест проверяет, что статистика потоков, запущенных внутри блока профилирования, попадает в общий файл.
+    """
+
+    path = tmp_path / "load.prof"
+
+    with metrics.profiling(str(path)):
+        worker = threading.Thread(target=remove_html_tags, args=("<p>" * 1000,))
+        worker.start()
+        worker.join()
+
+    assert any("remove_html_tags" in function[2] for function in pstats.Stats(str(path)).stats)
+    assert threading.getprofile() is None
+
+
+def test_profiled_pipeline_finishes(tmp_path, hh_server):
+    """
+    Тест проверяет, что потоки конвейера запускаются и загрузка завершается при включённом профилировании.
+    """
+
+    hh_server.vacancies = {company_id: [{'id': str(company_id)}] for company_id in (1, 2, 3)}
+    hh_server.employers = {company_id: {'name': str(company_id)} for company_id in (1, 2, 3)}
+    path = tmp_path / "load.prof"
+    written = []
+
+    def load() -> None:
+        with metrics.profiling(str(path)):
+            Pipeline([1, 2, 3], full=True, base_url=hh_server.base_url, requests_per_second=1000).run()
+
+    with patch('src.pipeline.insert_companies_into_db'), \
+            patch('src.pipeline.insert_vacancy_rows', side_effect=lambda rows, _: written.extend(rows)):
+        loader = threading.Thread(target=load, daemon=True)
+        loader.start()
+        loader.join(timeout=10)
+
+    assert not loader.is_alive()
+    assert sorted(row[0] for row in written) == ['1', '2', '3']
+    assert any("_fetch_company" in function[2] for function in pstats.Stats(str(path)).stats)
@@ -0,0 +1,123 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.fetcher import TruncatedResultsError
+from src.pipeline import Pipeline
+
+
+def test_pipeline_full_load_writes_companies_before_vacancies(hh_server):
+    """
+    Тест проверяет, что конвейер загружает все страницы всех компаний, очищает описания и записывает компанию
+    раньше её вакансий.
+    """
+
+    hh_server.vacancies = {company_id: [{'id': f'{company_id}{i:03}', 'name': f'Vacancy {i}'} for i in range(25)]
+                           for company_id in (1, 2, 3)}
+    hh_server.employers = {company_id: {'name': f'Company {company_id}', 'description': '<p>Описание</p>'}
+                           for company_id in (1, 2, 3)}
+    written = []
+
+    with patch('src.pipeline.insert_companies_into_db') as mock_companies, \
+            patch('src.pipeline.insert_vacancy_rows', side_effect=lambda rows, _: written.extend(rows)):
+        mock_companies.side_effect = lambda company_id, data: written.append(('company', company_id, data))
+        Pipeline([1, 2, 3], full=True, base_url=hh_server.base_url, per_page=10, batch_size=7,
+                 fetch_workers=2, transform_workers=2, queue_size=2, requests_per_second=1000).run()
+
+    companies = [entry for entry in written if entry[0] == 'company']
+    vacancies = [entry for entry in written if entry[0] != 'company']
+
+    assert {entry[1] for entry in companies} == {1, 2, 3}
+    assert companies[0][2] == {'company_name': f'Company {companies[0][1]}', 'company_description': 'Описание'}
+    assert len(vacancies) == 75
+
+    for company in companies:
+        first_vacancy = next(i for i, entry in enumerate(written) if entry[0] != 'company' and entry[1] == company[1])
+
+        assert written.index(company) < first_vacancy
+
+
+def test_pipeline_incremental_sync_collects_stats(hh_server):
+    """
+    Тест проверяет, что в режиме синхронизации вакансии накапливаются во временной таблице и применяются
+    для всех полностью загруженных компаний.
+    """
+
+    hh_server.vacancies = {1: [{'id': '1'}], 2: [{'id': '2'}]}
+    hh_server.employers = {1: {'name': 'First'}, 2: {'name': 'Second'}}
+
+    with patch('src.pipeline.begin_stage'), patch('src.pipeline.stage_vacancy_rows') as mock_stage, \
+            patch('src.pipeline.sync_company', return_value={'unchanged': 1}), \
+            patch('src.pipeline.apply_stage', return_value={'inserted': 2}) as mock_apply:
+        stats = Pipeline([1, 2], base_url=hh_server.base_url, requests_per_second=1000).run()
+
+    assert sorted(mock_apply.call_args.args[0]) == [1, 2]
+    assert sum(len(c.args[0]) for c in mock_stage.call_args_list) == 2
+    assert stats == {'companies': {'unchanged': 2}, 'vacancies': {'inserted': 2}}
+
+
+def test_pipeline_stops_all_stages_on_error(hh_server):
+    """
+    Тест проверяет, что ошибка стадии останавливает конвейер, а исключение передаётся вызывающему коду.
+    """
+
+    hh_server.vacancies = {company_id: [{'id': str(company_id)}] for company_id in range(1, 20)}
+    hh_server.employers = {company_id: {'name': str(company_id)} for company_id in range(1, 20)}
+    threads_before = threading.active_count()
+
+    with patch('src.pipeline.insert_companies_into_db', side_effect=RuntimeError("DB failure")):
+        with pytest.raises(RuntimeError, match="DB failure"):
+            Pipeline(range(1, 20), full=True, base_url=hh_server.base_url, queue_size=1,
+                     requests_per_second=1000).run()
+
+    assert threading.active_count() == threads_before
+
+
+def test_pipeline_drops_vacancies_repeated_across_pages(hh_server):
+    """
+    Тест проверяет, что вакансия, повторно попавшая на следующую страницу ответа, записывается один раз.
+    """
+
+    hh_server.vacancies = {1: [{'id': str(i)} for i in (1, 2, 3, 3, 4, 1)]}
+    hh_server.employers = {1: {'name': 'First'}}
+    written = []
+
+    with patch('src.pipeline.insert_companies_into_db'), \
+            patch('src.pipeline.insert_vacancy_rows', side_effect=lambda rows, _: written.extend(rows)):
+        Pipeline([1], full=True, base_url=hh_server.base_url, per_page=3, requests_per_second=1000).run()
+
+    assert sorted(row[0] for row in written) == ['1', '2', '3', '4']
+
+
+def test_pipeline_reports_truncated_results(hh_server):
+    """
+    Тест проверяет, что компания, выдача которой урезана ограничением API, попадает в отчёт failures, а её вакансии
+    записываются, но не удаляются при синхронизации.
+    """
+
+    hh_server.max_results = 4
+    hh_server.vacancies = {1: [{'id': str(i)} for i in range(6)], 2: [{'id': '10'}]}
+    hh_server.employers = {1: {'name': 'First'}, 2: {'name': 'Second'}}
+
+    with patch('src.pipeline.begin_stage'), patch('src.pipeline.stage_vacancy_rows') as mock_stage, \
+            patch('src.pipeline.sync_company', return_value={}), \
+            patch('src.pipeline.apply_stage', return_value={}) as mock_apply:
+        pipeline = Pipeline([1, 2], base_url=hh_server.base_url, per_page=2, requests_per_second=1000)
+        pipeline.run()
+
+    assert mock_apply.call_args.args[0] == [2]
+    assert sum(len(c.args[0]) for c in mock_stage.call_args_list) == 5
+    assert list(pipeline.failures) == [1]
+    assert isinstance(pipeline.failures[1], TruncatedResultsError)
+    assert "4 из 6" in str(pipeline.failures[1])
+
+
+@pytest.mark.parametrize("option", ["fetch_workers", "transform_workers", "queue_size", "batch_size"])
+def test_pipeline_rejects_invalid_settings(option):
+    """
+    Тест проверяет, что нулевое количество потоков стадии или размер очереди отклоняются при создании конвейера.
+    """
+
+    with pytest.raises(ValueError, match=option):
+        Pipeline([1], **{option: 0})
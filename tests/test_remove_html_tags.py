@@ -0,0 +1,100 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from src.utils import remove_html_tags
+
+
+FIXTURES = Path(__file__).parent / "fixtures" / "employer_descriptions"
+
+
+@pytest.mark.parametrize("name", ["bank.html", "marketplace.html"])
+def test_remove_html_tags_fixtures(name):
+    """
+    Тест проверяет очистку сохранённых описаний работодателей: в результате нет разметки, скриптов, стилей,
+    комментариев и неразобранных HTML-сущностей.
+    """
+
+    text = remove_html_tags((FIXTURES / name).read_text(encoding="utf-8"))
+
+    assert text
+    assert "<p" not in text and "</" not in text
+    assert "&nbsp;" not in text and "&mdash;" not in text and "&laquo;" not in text
+    assert "function" not in text and "{" not in text
+    assert "  " not in text and text == text.strip()
+
+
+def test_remove_html_tags_entities_and_whitespace():
+    """
+    Тест проверяет декодирование HTML-сущностей и схлопывание пробельных символов.
+    """
+
+    text = "<p>Компания&nbsp;&laquo;Ромашка&raquo;&nbsp;&mdash; &quot;лидер&quot;\n\n\t рынка</p><p>от 100&#8239;000&#8381;</p>"
+
+    assert remove_html_tags(text) == "Компания «Ромашка» — \"лидер\" рынка от 100 000₽"
+
+
+def test_remove_html_tags_block_tags_separate_words():
+    """
+    Тест проверяет, что блочные теги разделяют слова, а строчные - нет.
+    """
+
+    assert remove_html_tags("<ul><li>один</li><li>два</li></ul>строка<br/>вторая") == "один два строка вторая"
+    assert remove_html_tags("<b>жир</b><i>ный</i>") == "жирный"
+
+
+def test_remove_html_tags_malformed_markup():
+    """
+    Тест проверяет обработку некорректной разметки: одиночные '<' сохраняются как текст, незакрытые script
+    и комментарий отбрасываются до конца строки.
+    """
+
+    assert remove_html_tags("зарплата < 100 и a<b, <p>текст") == "зарплата < 100 и a<b, текст"
+    assert remove_html_tags("&lt;script&gt;alert(1)&lt;/script&gt;") == "<script>alert(1)</script>"
+    assert remove_html_tags("до<script>var a = '<p>';</SCRIPT >после") == "допосле"
+    assert remove_html_tags("до<script>var a = 1;") == "до"
+    assert remove_html_tags("до<!-- <p>комментарий</p>") == "до"
+    assert remove_html_tags("") == ""
+
+
+def test_remove_html_tags_quoted_attributes():
+    """
+    Тест проверяет, что символ '>' внутри значения атрибута в кавычках не завершает тег, а тег с незакрытой
+    кавычкой удаляется до ближайшего '>'.
+    """
+
+    assert remove_html_tags("до<img src='a>b'>после") == "допосле"
+    assert remove_html_tags('<p title="1 > 0">один</p>два') == "один два"
+    assert remove_html_tags("<b class=x'>текст</b>") == "текст"
+
+
+def test_remove_html_tags_truncate():
+    """
+    Тест проверяет обрезку результата до max_length символов.
+    """
+
+    assert remove_html_tags("<p>Первое предложение.</p>", max_length=10) == "Первое пр…"
+    assert len(remove_html_tags("<p>Первое предложение.</p>", max_length=10)) <= 10
+    assert remove_html_tags("<p>Коротко</p>", max_length=10) == "Коротко"
+    assert remove_html_tags("<p>Коротко</p>", max_length=1) == "…"
+    assert remove_html_tags("<p>Коротко</p>", max_length=0) == ""
+    assert remove_html_tags("<p>Коротко</p>", max_length=-5) == ""
+
+
+def test_remove_html_tags_linear_time():
+    """
+    Тест проверяет, что время очистки растёт линейно: состязательный ввод из незакрытых '<' вдесятеро большего
+    размера обрабатывается не более чем в ~20 раз дольше.
+    """
+
+    def measure(size):
+        text = "<a" * size
+        start = time.perf_counter()
+        remove_html_tags(text)
+
+        return time.perf_counter() - start
+
+    small, large = measure(20_000), measure(200_000)
+
+    assert large < max(small, 0.001) * 20 + 0.05
@@ -0,0 +1,141 @@
+import math
+import os
+from decimal import Decimal
+
+import pytest
+
+from src.snapshot import (Snapshot, export_snapshot, import_snapshot, iter_snapshot_vacancies, COMPANIES_IMPORT_QUERY,
+                          EXPORT_TRANSACTION_QUERY)
+from src.sync import content_hash
+from src.utils import normalize_vacancy
+
+
+COMPANIES = [(1, 'Яндекс', 'Описание'), (2, "O'Reilly", None)]
+VACANCIES = [
+    (101, 2, 'Python-разработчик', 100000, 200000, 'RUR', 'https://hh.ru/vacancy/101', Decimal('150000.00')),
+    (102, 1, 'Аналитик\tданных', None, 3000, 'USD', 'https://hh.ru/vacancy/102', Decimal('270000.00')),
+    (103, 1, None, None, None, None, None, None),
+]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, db_pool):
+    """
+    Снимок, выгруженный из подменённой базы данных с компаниями COMPANIES и вакансиями VACANCIES.
+    """
+
+    conn = db_pool.getconn.return_value
+    conn.cursor.return_value.__enter__.return_value.fetchall.return_value = COMPANIES
+    conn.cursor.return_value.fetchmany.side_effect = [VACANCIES[:2], VACANCIES[2:], []]
+    path = tmp_path / "snapshot"
+
+    export_snapshot(str(path), batch_size=2)
+
+    return str(path)
+
+
+def test_export_snapshot_writes_columns(snapshot_path):
+    """
+    Тест проверяет столбцовое представление снимка: числовые столбцы, словарное кодирование компаний и валют,
+    NaN для неуказанной зарплаты и NULL в строковых столбцах.
+    """
+
+    with Snapshot(snapshot_path) as snapshot:
+        assert snapshot.rows("companies") == 2 and snapshot.rows("vacancies") == 3
+        assert snapshot.manifest["dictionaries"]["currency"] == ['RUR', 'USD']
+        assert list(snapshot.column("vacancies", "vacancy_id")) == [101, 102, 103]
+        assert list(snapshot.column("vacancies", "company")) == [1, 0, 0]
+        assert list(snapshot.column("vacancies", "currency")) == [0, 1, -1]
+        assert list(snapshot.column("companies", "company_name")) == ['Яндекс', "O'Reilly"]
+        assert list(snapshot.column("companies", "description")) == ['Описание', None]
+        assert snapshot.column("vacancies", "salary_mid")[0] == 150000.0
+        assert math.isnan(snapshot.column("vacancies", "salary_min")[1])
+        assert snapshot.column("vacancies", "vacancy_name")[1] == 'Аналитик\tданных'
+
+
+def test_export_snapshot_reads_one_snapshot_and_replaces_directory(snapshot_path, db_pool):
+    """
+    Тест проверяет, что таблицы читаются в одной транзакции REPEATABLE READ, READ ONLY, а новый снимок заменяет
+    прежний целиком; при ошибке выгрузки прежний снимок остаётся нетронутым.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+
+    assert cur.execute.call_args_list[0].args[0] == EXPORT_TRANSACTION_QUERY
+
+    with open(os.path.join(snapshot_path, "stale.npy"), "wb"):
+        pass
+
+    db_pool.getconn.return_value.cursor.return_value.fetchmany.side_effect = [VACANCIES[:1], []]
+    export_snapshot(snapshot_path)
+
+    assert "stale.npy" not in os.listdir(snapshot_path)
+    assert os.listdir(os.path.dirname(snapshot_path)) == ["snapshot"]
+
+    db_pool.getconn.return_value.cursor.return_value.fetchmany.side_effect = RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        export_snapshot(snapshot_path)
+
+    assert os.listdir(os.path.dirname(snapshot_path)) == ["snapshot"]
+
+    with Snapshot(snapshot_path) as snapshot:
+        assert snapshot.rows("vacancies") == 1
+
+
+def test_snapshot_columns_are_numpy_compatible(snapshot_path):
+    """
+    Тест проверяет, что файлы столбцов имеют формат .npy 1.0 с выровненным заголовком.
+    """
+
+    with open(f"{snapshot_path}/vacancies.salary_max.npy", "rb") as file:
+        data = file.read()
+
+    assert data[:8] == b"\x93NUMPY\x01\x00"
+    assert "'descr': '<f8'" in data[10:128].decode() and "'shape': (3,)" in data[10:128].decode()
+    assert len(data) == 128 + 3 * 8
+
+
+def test_snapshot_round_trip_restores_rows(snapshot_path):
+    """
+    Тест проверяет, что строки вакансий восстанавливаются из снимка без потерь.
+    """
+
+    with Snapshot(snapshot_path) as snapshot:
+        assert list(iter_snapshot_vacancies(snapshot)) == VACANCIES
+
+
+def test_import_snapshot_copies_rows_with_content_hash(snapshot_path, db_pool):
+    """
+    Тест проверяет загрузку снимка через COPY с хэшами, совпадающими с хэшами инкрементальной синхронизации.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = (False,)
+    buffers = []
+    cur.copy_expert.side_effect = lambda query, buffer: buffers.append((query, buffer.read()))
+
+    assert import_snapshot(snapshot_path, batch_size=2) == {'companies': 2, 'vacancies': 3}
+
+    queries = [query for query, _ in buffers]
+    first_vacancy = buffers[1][1].splitlines()[0].split("\t")
+    item = {'id': '101', 'name': 'Python-разработчик', 'url': 'https://hh.ru/vacancy/101',
+            'salary': {'from': 100000, 'to': 200000, 'currency': 'RUR'}}
+
+    assert queries[0] == COMPANIES_IMPORT_QUERY and len(queries) == 3
+    assert buffers[0][1].splitlines()[1].split("\t")[:3] == ['2', "O'Reilly", '\\N']
+    assert first_vacancy[-1] == content_hash(normalize_vacancy(2, item, {'RUR': 1.0}))
+
+
+def test_import_snapshot_requires_empty_tables(snapshot_path, db_pool):
+    """
+    Тест проверяет, что снимок не загружается поверх существующих данных.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = (True,)
+
+    with pytest.raises(ValueError):
+        import_snapshot(snapshot_path)
+
+    cur.copy_expert.assert_not_called()
@@ -0,0 +1,63 @@
+from src.sync import (content_hash, remove_missing_companies, sync_company, sync_vacancies, STAGE_COPY_QUERY,
+                      VACANCIES_UPSERT_QUERY)
+
+
+def test_content_hash_depends_on_content():
+    """
+    Тест проверяет, что хэш стабилен для одинаковых данных и меняется при изменении любого поля.
+    """
+
+    row = ('1', 7, 'Developer', 100, 200, 'RUR', 'https://example.com/1')
+
+    assert content_hash(row) == content_hash(list(row))
+    assert len(content_hash(row)) == 32
+    assert content_hash(row) != content_hash(row[:3] + (150,) + row[4:])
+    assert content_hash(('a', None)) != content_hash(('a', 'None'))
+
+
+def test_sync_company_reports_unchanged(db_pool):
+    """
+    Тест проверяет, что компания без изменений учитывается как неизменная.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+    cur.fetchall.return_value = []
+
+    stats = sync_company(1, {'company_name': 'XYZ', 'company_description': 'Описание'})
+
+    assert stats == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+
+
+def test_sync_vacancies_reports_counts(db_pool):
+    """
+    Тест проверяет, что вакансии загружаются во временную таблицу и подсчитываются вставленные, обновлённые,
+    неизменные и удалённые строки.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+    cur.fetchone.return_value = (4,)
+    cur.fetchall.return_value = [(True,), (False,)]
+    cur.rowcount = 3
+    items = ({'id': str(i), 'name': f'Vacancy {i}', 'url': ''} for i in range(4))
+
+    stats = sync_vacancies(7, items, batch_size=3)
+
+    assert stats == {'inserted': 1, 'updated': 1, 'unchanged': 2, 'removed': 3}
+    assert [c.args[0] for c in cur.copy_expert.call_args_list] == [STAGE_COPY_QUERY, STAGE_COPY_QUERY]
+    assert VACANCIES_UPSERT_QUERY in [c.args[0] for c in cur.execute.call_args_list]
+
+    staged_row = cur.copy_expert.call_args_list[0].args[1].readline().rstrip("\n").split("\t")
+
+    assert staged_row[:-1] == ['0', '7', 'Vacancy 0', '\\N', '\\N', '\\N', '', '\\N']
+    assert staged_row[-1] == content_hash(('0', 7, 'Vacancy 0', None, None, None, '', None))
+
+
+def test_remove_missing_companies_ignores_empty_list(db_pool):
+    """
+    Тест проверяет, что пустой список отслеживаемых компаний не приводит к удалению всех компаний.
+    """
+
+    cur = db_pool.getconn.return_value.cursor.return_value.__enter__.return_value
+
+    assert remove_missing_companies([]) == {'removed': 0}
+    cur.execute.assert_not_called()